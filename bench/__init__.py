@@ -0,0 +1,140 @@
+"""
+Benchmarks e testes de carga. Rodam a partir da raiz do repositório:
+
+    python -m bench.<script> [--help]
+
+Cada script compara o caminho antigo (reproduzido no próprio script) com o
+atual e imprime uma tabela; nenhum deles roda no pytest.
+"""
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+
+def melhor_de(fn: Callable[[], object], repeticoes: int = 3) -> float:
+    """
+    Menor tempo (segundos) de `repeticoes` execuções de fn().
+    """
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def percentil(valores: Sequence[float], p: float) -> float:
+    ordenados = sorted(valores)
+    if not ordenados:
+        return float("nan")
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def tabela(cabecalho: Sequence[str], linhas: Iterable[Sequence[object]]) -> None:
+    linhas: List[List[str]] = [[str(c) for c in linha] for linha in linhas]
+    larguras = [max(len(str(h)), *(len(l[i]) for l in linhas)) for i, h in enumerate(cabecalho)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(cabecalho, larguras)))
+    for linha in linhas:
+        print("  ".join(c.rjust(w) for c, w in zip(linha, larguras)))
+
+
+# ===========================
+# 🔹 Servidor e carga HTTP
+# ===========================
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def servidor(app: str, env: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Iterator[str]:
+    """
+    Sobe `app` ("modulo:atributo") num uvicorn separado (1 worker) e devolve
+    a URL base. Na saída manda SIGINT e espera o shutdown da app terminar.
+    """
+    porta = porta_livre()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(porta), "--log-level", "warning"],
+        env={**os.environ, **(env or {})},
+    )
+    url = f"http://127.0.0.1:{porta}"
+    try:
+        limite = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{app} saiu com código {proc.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", porta), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > limite:
+                    raise
+                time.sleep(0.1)
+        yield url
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+async def carga(
+    url: str,
+    conexoes: int,
+    duracao: float,
+    metodo: str = "POST",
+    corpo: Optional[Callable[[int], dict]] = None,
+) -> Tuple[List[float], Counter]:
+    """
+    `conexoes` clientes keep-alive em laço fechado por `duracao` segundos.
+    Devolve (latência em segundos de cada resposta 2xx, contagem por status).
+    """
+    latencias: List[float] = []
+    status: Counter = Counter()
+    fim = time.monotonic() + duracao
+    contador = 0
+
+    async def cliente(sessao: aiohttp.ClientSession) -> None:
+        nonlocal contador
+        while time.monotonic() < fim:
+            contador += 1
+            inicio = time.perf_counter()
+            async with sessao.request(metodo, url, json=corpo(contador) if corpo else None) as resp:
+                await resp.read()
+                status[resp.status] += 1
+                if resp.status < 300:
+                    latencias.append(time.perf_counter() - inicio)
+
+    conector = aiohttp.TCPConnector(limit=conexoes)
+    async with aiohttp.ClientSession(connector=conector) as sessao:
+        await asyncio.gather(*(cliente(sessao) for _ in range(conexoes)))
+    return latencias, status
+
+
+async def sondar(url: str, duracao: float, intervalo: float = 0.05) -> List[float]:
+    """
+    GET em `url` a cada `intervalo` segundos (uma requisição por vez, na
+    própria conexão) durante `duracao`; devolve as latências.
+    """
+    latencias: List[float] = []
+    fim = time.monotonic() + duracao
+    async with aiohttp.ClientSession() as sessao:
+        while time.monotonic() < fim:
+            inicio = time.perf_counter()
+            async with sessao.get(url) as resp:
+                await resp.read()
+            latencias.append(time.perf_counter() - inicio)
+            await asyncio.sleep(max(0.0, intervalo - (time.perf_counter() - inicio)))
+    return latencias
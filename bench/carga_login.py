@@ -0,0 +1,136 @@
+"""
+Rajada de logins: rota antiga (síncrona, psycopg2 por tentativa e
+bcrypt.checkpw no threadpool das requisições) contra a atual (asyncpg +
+executor dedicado do bcrypt), medindo também a latência de uma rota
+síncrona qualquer (/ping) consultada a cada 50 ms durante a rajada.
+
+    python -m bench.carga_login [--clientes 48] [--duracao 15]
+
+Cada variante sobe num uvicorn próprio (1 worker). O usuário do teste é
+criado com bcrypt custo 12, como os do seed. A rota antiga precisa de
+Postgres (NEON_DATABASE_URL); sem ele só a atual roda, no backend de
+STORAGE_BACKEND (com sqlite, num arquivo temporário).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+import bcrypt
+from fastapi import FastAPI, HTTPException
+
+from bench import carga, percentil, servidor, sondar, tabela
+from core.config import settings
+from core.security import create_access_token, shutdown_hash_executor
+from models.db import get_sync_conn
+from models.storage import create_storage, storage
+from routers import auth_router
+
+
+EMAIL = "carga@exemplo.com"
+SENHA = "Carga123!"
+
+
+# ===========================
+# 🔹 Apps (sobem no processo do uvicorn)
+# ===========================
+def ping():
+    return {"ok": True}
+
+
+app_antigo = FastAPI()
+app_antigo.get("/ping")(ping)
+
+
+@app_antigo.post("/auth/login")
+def login_antigo(payload: dict):
+    # Como era (com as colunas lidas por nome; o original indexava o
+    # RealDictCursor por posição e nunca chegava a logar)
+    conn = get_sync_conn()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, email, password_hash, role FROM users WHERE email = %s", (payload["email"],))
+    user = cursor.fetchone()
+    conn.close()
+
+    if not user or not bcrypt.checkpw(payload["password"].encode("utf-8"), user["password_hash"].encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Credenciais inválidas")
+
+    token = create_access_token({"sub": str(user["id"]), "email": user["email"], "role": user["role"]})
+    return {"access_token": token, "token_type": "bearer"}
+
+
+app_atual = FastAPI()
+app_atual.get("/ping")(ping)
+app_atual.include_router(auth_router.router)
+
+
+@app_atual.on_event("startup")
+async def _startup():
+    await storage.start()
+
+
+@app_atual.on_event("shutdown")
+async def _shutdown():
+    await storage.close()
+    shutdown_hash_executor()
+
+
+# ===========================
+# 🔹 Medição
+# ===========================
+async def _criar_usuario() -> None:
+    leitura = create_storage(settings.STORAGE_BACKEND)
+    await leitura.start()
+    try:
+        if not await leitura.get_user_by_email(EMAIL):
+            await leitura.create_user(EMAIL, bcrypt.hashpw(SENHA.encode(), bcrypt.gensalt(12)).decode())
+    finally:
+        await leitura.close()
+
+
+def _rodar(app: str, env: dict, clientes: int, duracao: float) -> tuple:
+    async def rajada(url: str):
+        return await asyncio.gather(
+            carga(f"{url}/auth/login", clientes, duracao, corpo=lambda _: {"email": EMAIL, "password": SENHA}),
+            sondar(f"{url}/ping", duracao),
+        )
+
+    with servidor(f"bench.carga_login:{app}", env) as url:
+        (logins, status), pings = asyncio.run(rajada(url))
+    assert set(status) <= {200, 503}, status
+    return logins, status, pings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=48)
+    parser.add_argument("--duracao", type=float, default=15.0)
+    args = parser.parse_args()
+
+    if settings.STORAGE_BACKEND == "sqlite":
+        settings.SQLITE_PATH = os.path.join(tempfile.mkdtemp(), "analytics.sqlite3")
+    env = {"STORAGE_BACKEND": settings.STORAGE_BACKEND, "SQLITE_PATH": settings.SQLITE_PATH}
+    asyncio.run(_criar_usuario())
+
+    variantes = [("atual", "app_atual")]
+    if settings.STORAGE_BACKEND == "postgres" and settings.NEON_DATABASE_URL:
+        variantes.insert(0, ("antigo", "app_antigo"))
+
+    linhas = []
+    for nome, app in variantes:
+        logins, status, pings = _rodar(app, env, args.clientes, args.duracao)
+        linhas.append((
+            nome,
+            f"{len(logins) / args.duracao:.1f}",
+            status.get(503, 0),
+            f"{percentil(pings, 50) * 1000:.1f}",
+            f"{percentil(pings, 99) * 1000:.1f}",
+            len(pings),
+        ))
+
+    print(f"{settings.STORAGE_BACKEND}, {args.clientes} clientes, {args.duracao:.0f}s, {os.cpu_count()} CPUs")
+    tabela(("login", "logins/s", "503", "/ping p50 (ms)", "/ping p99 (ms)", "pings"), linhas)
+
+
+if __name__ == "__main__":
+    main()
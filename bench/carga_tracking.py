@@ -0,0 +1,122 @@
+"""
+Carga em POST /api/v1/tracking/event: handler antigo (síncrono, uma conexão
+psycopg2 + INSERT + commit por requisição) contra o TrackingBuffer atual.
+
+    python -m bench.carga_tracking [--conexoes 32] [--duracao 10]
+
+Cada variante sobe num uvicorn próprio (1 worker). Depois do shutdown (que
+esvazia o buffer) o script confere no rollup quantos eventos do teste
+foram gravados. O handler antigo precisa de Postgres (NEON_DATABASE_URL);
+sem ele só a variante atual roda, no backend de STORAGE_BACKEND (com
+sqlite, num arquivo temporário).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import uuid
+
+from fastapi import FastAPI
+
+from bench import carga, percentil, servidor, tabela
+from core.config import settings
+from models.db import get_sync_conn
+from models.storage import create_storage, storage
+from models.tracking_schemas import EventPayload
+from routers import tracking_router
+from services.tracking_service import tracking_buffer
+
+
+# ===========================
+# 🔹 Apps (sobem no processo do uvicorn)
+# ===========================
+app_antigo = FastAPI()
+
+
+@app_antigo.post("/api/v1/tracking/event")
+def event_track_antigo(data: EventPayload):
+    # Como era: conexão nova, um INSERT e commit por evento (colunas
+    # ajustadas ao schema atual; o original gravava em colunas inexistentes)
+    conn = get_sync_conn()
+    cur = conn.cursor()
+    cur.execute("INSERT INTO events (event_type) VALUES (%s)", (data.event_type,))
+    conn.commit()
+    cur.close()
+    conn.close()
+    return {"ok": True}
+
+
+app_atual = FastAPI()
+app_atual.include_router(tracking_router.router)
+
+
+@app_atual.on_event("startup")
+async def _startup():
+    await storage.start()
+    await tracking_buffer.start()
+
+
+@app_atual.on_event("shutdown")
+async def _shutdown():
+    await tracking_buffer.stop()
+    await storage.close()
+
+
+# ===========================
+# 🔹 Medição
+# ===========================
+async def _gravados(event_type: str) -> int:
+    # Instância nova: a `storage` do módulo é a do servidor
+    leitura = create_storage(settings.STORAGE_BACKEND)
+    await leitura.start()
+    try:
+        contagens = await leitura.admin_counts()
+    finally:
+        await leitura.close()
+    return next((e["count"] for e in contagens["per_event"] if e["event_type"] == event_type), 0)
+
+
+def _rodar(app: str, env: dict, conexoes: int, duracao: float) -> tuple:
+    event_type = f"carga:{uuid.uuid4().hex[:8]}"
+    with servidor(f"bench.carga_tracking:{app}", env) as url:
+        latencias, status = asyncio.run(carga(
+            f"{url}/api/v1/tracking/event", conexoes, duracao,
+            corpo=lambda i: {"event_type": event_type, "meta": {"i": i}},
+        ))
+    assert set(status) == {200}, status
+    return latencias, asyncio.run(_gravados(event_type))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conexoes", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    if settings.STORAGE_BACKEND == "sqlite":
+        settings.SQLITE_PATH = os.path.join(pasta, "analytics.sqlite3")
+    env = {"STORAGE_BACKEND": settings.STORAGE_BACKEND, "SQLITE_PATH": settings.SQLITE_PATH}
+
+    variantes = [("atual", "app_atual")]
+    if settings.STORAGE_BACKEND == "postgres" and settings.NEON_DATABASE_URL:
+        variantes.insert(0, ("antigo", "app_antigo"))
+
+    linhas = []
+    for nome, app in variantes:
+        latencias, gravados = _rodar(app, env, args.conexoes, args.duracao)
+        linhas.append((
+            nome,
+            f"{len(latencias) / args.duracao:.0f}",
+            f"{percentil(latencias, 50) * 1000:.1f}",
+            f"{percentil(latencias, 99) * 1000:.1f}",
+            len(latencias),
+            gravados,
+        ))
+
+    print(f"{settings.STORAGE_BACKEND}, {args.conexoes} conexões, {args.duracao:.0f}s")
+    tabela(("handler", "req/s", "p50 (ms)", "p99 (ms)", "respostas", "gravados"), linhas)
+
+
+if __name__ == "__main__":
+    main()
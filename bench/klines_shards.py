@@ -0,0 +1,133 @@
+"""
+Download de klines: caminho antigo (python-binance, uma página de 1000
+candles por vez, em sequência) contra o BinanceKlineFetcher atual (shards
+em paralelo sobre aiohttp), os dois contra um stub local de
+/api/v3/klines com latência fixa por requisição.
+
+    python -m bench.klines_shards [--latencia 0.05] [--concorrencia 8]
+
+O stub roda em outro processo (aiohttp). O script confere que os dois
+caminhos devolvem o mesmo frame antes de comparar os tempos.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from datetime import datetime
+
+import numpy as np
+from aiohttp import web
+from binance.client import Client
+from binance.helpers import interval_to_milliseconds
+
+from bench import porta_livre, tabela
+from services.binance_klines import KLINES_PAGE_LIMIT, BinanceKlineFetcher, _em_ms
+from utils.candles import juntar_colunas, klines_para_colunas
+from utils.concurrency import RateLimiter
+
+
+CASOS = [
+    ("1m", datetime(2024, 1, 1), datetime(2025, 1, 1)),
+    ("1h", datetime(2023, 1, 1), datetime(2024, 6, 1)),
+    ("5m", datetime(2024, 3, 1), datetime(2024, 3, 9)),
+]
+
+
+# ===========================
+# 🔹 Stub de /api/v3/klines (processo separado)
+# ===========================
+def _stub(porta: int, latencia: float) -> None:
+    async def klines(request):
+        await asyncio.sleep(latencia)
+        q = request.query
+        intervalo = interval_to_milliseconds(q["interval"])
+        inicio, fim = int(q["startTime"]), int(q["endTime"])
+        limite = int(q.get("limit", 500))
+
+        ot = np.arange(-(-inicio // intervalo) * intervalo, fim + 1, intervalo, dtype=np.int64)[:limite]
+        preco = 1 + (ot // intervalo % 97) / 1000
+        return web.json_response([
+            [int(t), str(p), str(p + 0.01), str(p - 0.01), str(p), "10", int(t) + intervalo - 1, "0", 1, "0", "0", "0"]
+            for t, p in zip(ot, preco)
+        ])
+
+    app = web.Application()
+    app.router.add_get("/api/v3/klines", klines)
+    web.run_app(app, host="127.0.0.1", port=porta, print=None, access_log=None)
+
+
+# ===========================
+# 🔹 Caminhos
+# ===========================
+def antigo(client: Client, symbol: str, interval: str, inicio: datetime, fim: datetime):
+    # Como era o _iterar_colunas_klines antes dos shards
+    cursor, fim_ms = _em_ms(inicio), _em_ms(fim)
+    paginas = []
+    while cursor < fim_ms:
+        pagina = client.get_klines(
+            symbol=symbol, interval=interval, startTime=cursor, endTime=fim_ms - 1, limit=KLINES_PAGE_LIMIT
+        )
+        if not pagina:
+            break
+        paginas.append(klines_para_colunas(pagina))
+        if len(pagina) < KLINES_PAGE_LIMIT:
+            break
+        cursor = pagina[-1][6] + 1
+    return juntar_colunas(paginas)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos por requisição no stub")
+    parser.add_argument("--concorrencia", type=int, default=8, help="BINANCE_SHARD_CONCURRENCY")
+    args = parser.parse_args()
+
+    porta = porta_livre()
+    stub = multiprocessing.Process(target=_stub, args=(porta, args.latencia), daemon=True)
+    stub.start()
+    url = f"http://127.0.0.1:{porta}"
+
+    client = Client(None, None, ping=False)
+    client.API_URL = f"{url}/api"
+    fetcher = BinanceKlineFetcher(url, RateLimiter(10**9), args.concorrencia, timeout=60, max_retries=3)
+
+    try:
+        # Espera o stub subir
+        for _ in range(100):
+            try:
+                antigo(client, "BTCUSDT", "1d", datetime(2024, 1, 1), datetime(2024, 1, 2))
+                break
+            except Exception:
+                time.sleep(0.1)
+
+        linhas = []
+        for interval, inicio, fim in CASOS:
+            t0 = time.perf_counter()
+            df_antigo = antigo(client, "BTCUSDT", interval, inicio, fim)
+            t_antigo = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            df_atual = fetcher.baixar("BTCUSDT", interval, inicio, fim)
+            t_atual = time.perf_counter() - t0
+
+            assert df_antigo.equals(df_atual), interval
+            linhas.append((
+                f"{interval} {inicio:%Y-%m-%d}..{fim:%Y-%m-%d}",
+                len(df_atual),
+                -(-len(df_atual) // KLINES_PAGE_LIMIT),
+                f"{t_antigo:.2f}",
+                f"{t_atual:.2f}",
+                f"{t_antigo / t_atual:.1f}x",
+            ))
+    finally:
+        fetcher.close()
+        client.close_connection()
+        stub.terminate()
+        stub.join()
+
+    print(f"stub com {args.latencia * 1000:.0f} ms por requisição, {args.concorrencia} shards em paralelo")
+    tabela(("caso", "candles", "páginas", "sequencial (s)", "shards (s)", "ganho"), linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Normalização dos payloads de cada provedor: caminho antigo (DataFrame +
+apply linha a linha, como os fetchers faziam) contra utils/candles.
+
+    python -m bench.normalizacao_candles [--linhas 100000] [--repeticoes 3]
+
+Os payloads são sintéticos, no formato de cada API:
+  - Binance: lista de klines [open_time, "open", ..., "volume", ...]
+  - Polygon: "results" cru de /v2/aggs ({"t", "o", "h", "l", "c", "v"}); o
+    caminho antigo inclui o Agg.from_dict que o RESTClient fazia por linha
+  - Alpha Vantage: DataFrame da biblioteca (índice de datas, "1. open", ...)
+  - TradingView: não tem candles (nunca teve apply); compara um TA_Handler
+    por símbolo (antigo) com o lote colunar atual sobre a mesma resposta
+    de /scan, sem rede
+
+Para Binance, Polygon e Alpha Vantage o script confere que os dois caminhos
+produzem o mesmo frame antes de medir.
+"""
+import argparse
+import json as _json
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from polygon.rest.models import Agg
+from tradingview_ta import TA_Handler, TradingView
+
+import services.tradingview_service as tradingview_service
+from bench import melhor_de, tabela
+from models.forex_schemas import TVForexBatchQuery
+from utils.candles import aggs_para_colunas, juntar_colunas, klines_para_colunas, normalizar_alphavantage
+from utils.concurrency import TTLCache
+
+
+COLUNAS = ["Open_Time", "Open", "High", "Low", "Close", "Volume", "Resultado"]
+
+
+# ===========================
+# 🔹 Payloads sintéticos
+# ===========================
+def _precos(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    open_ = rng.normal(1.1, 0.01, n).round(5)
+    close = (open_ + rng.normal(0, 0.001, n)).round(5)
+    high = np.maximum(open_, close) + 0.0005
+    low = np.minimum(open_, close) - 0.0005
+    volume = rng.integers(1, 1000, n).astype(float)
+    open_time = 1_704_067_200_000 + 60_000 * np.arange(n, dtype=np.int64)
+    return open_time, open_, high, low, close, volume
+
+
+def payload_binance(n: int) -> list:
+    ot, o, h, l, c, v = _precos(n)
+    return [
+        [int(t), repr(a), repr(b), repr(d), repr(e), repr(f), int(t) + 59_999, "0", 1, "0", "0", "0"]
+        for t, a, b, d, e, f in zip(ot, o, h, l, c, v)
+    ]
+
+
+def payload_polygon(n: int) -> list:
+    ot, o, h, l, c, v = _precos(n)
+    return [
+        {"t": int(t), "o": float(a), "h": float(b), "l": float(d), "c": float(e), "v": float(f), "vw": 1.1, "n": 1}
+        for t, a, b, d, e, f in zip(ot, o, h, l, c, v)
+    ]
+
+
+def payload_alphavantage(n: int) -> pd.DataFrame:
+    ot, o, h, l, c, v = _precos(n)
+    # O antigo quebrava sem volume (forex não tem); aqui vai com volume
+    # para os dois caminhos rodarem
+    indice = pd.to_datetime(ot, unit="ms").strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame(
+        {"1. open": o, "2. high": h, "3. low": l, "4. close": c, "5. volume": v},
+        index=pd.Index(indice, name="date"),
+    )
+
+
+# ===========================
+# 🔹 Caminhos antigos (como estavam nos fetchers)
+# ===========================
+def antigo_binance(klines: list) -> pd.DataFrame:
+    columns = [
+        'Open_Time', 'Open', 'High', 'Low', 'Close', 'Volume',
+        'Close_Time', 'Quote_Asset_Volume', 'Number_of_Trades',
+        'Taker_Buy_Base_Asset_Volume', 'Taker_Buy_Quote_Asset_Volume',
+        'Ignore'
+    ]
+    df = pd.DataFrame(klines, columns=columns)
+    df['Open_Time'] = pd.to_datetime(df['Open_Time'], unit='ms')
+
+    numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, axis=1)
+
+    df['Resultado'] = df.apply(lambda row: 'Call' if row['Close'] >= row['Open'] else 'Put', axis=1)
+    return df[COLUNAS]
+
+
+def antigo_polygon(resultados: list) -> pd.DataFrame:
+    aggs = [Agg.from_dict(r) for r in resultados]
+    df = pd.DataFrame(aggs)
+    df.rename(columns={
+        "open": "Open",
+        "high": "High",
+        "low": "Low",
+        "close": "Close",
+        "volume": "Volume",
+        "timestamp": "Open_Time",
+    }, inplace=True)
+
+    df["Open_Time"] = pd.to_datetime(df["Open_Time"], unit="ms")
+    df["Resultado"] = df.apply(lambda r: "Call" if r["Close"] >= r["Open"] else "Put", axis=1)
+    return df[COLUNAS]
+
+
+def antigo_alphavantage(data: pd.DataFrame) -> pd.DataFrame:
+    df = data.copy()
+    df.rename(columns={
+        "1. open": "Open",
+        "2. high": "High",
+        "3. low": "Low",
+        "4. close": "Close",
+        "5. volume": "Volume",
+    }, inplace=True)
+
+    df.index.name = "Open_Time"
+    df.reset_index(inplace=True)
+    df["Resultado"] = df.apply(lambda r: "Call" if r["Close"] >= r["Open"] else "Put", axis=1)
+    return df[COLUNAS]
+
+
+# ===========================
+# 🔹 Caminhos atuais
+# ===========================
+def atual_binance(klines: list) -> pd.DataFrame:
+    return juntar_colunas([klines_para_colunas(klines)])
+
+
+def atual_polygon(resultados: list) -> pd.DataFrame:
+    return juntar_colunas([aggs_para_colunas(resultados)])
+
+
+def _conferir(nome: str, antigo: pd.DataFrame, atual: pd.DataFrame) -> None:
+    antigo = antigo.astype({"Resultado": str, "Open_Time": "datetime64[ns]"}).reset_index(drop=True)
+    atual = atual.astype({"Resultado": str}).reset_index(drop=True)
+    pd.testing.assert_frame_equal(antigo, atual, check_dtype=False, obj=nome)
+
+
+# ===========================
+# 🔹 TradingView (resposta de /scan)
+# ===========================
+class _Resposta:
+    status_code = 200
+
+    def __init__(self, corpo: dict):
+        self._corpo = corpo
+        # O TA_Handler lê .text; o lote atual, .json()
+        self.text = _json.dumps(corpo)
+
+    def json(self) -> dict:
+        return self._corpo
+
+
+def _scan(json=None, data=None, **_):
+    """
+    /scan falso: uma linha de indicadores por ticker pedido. O TA_Handler
+    manda o corpo em `data` (string), o lote atual em `json`.
+    """
+    corpo = json if json is not None else _json.loads(data)
+    rng = np.random.default_rng(len(corpo["symbols"]["tickers"]))
+    return _Resposta({"data": [
+        {"s": ticker, "d": list(rng.normal(50, 20, len(corpo["columns"])))}
+        for ticker in corpo["symbols"]["tickers"]
+    ]})
+
+
+def antigo_tradingview(simbolos: list) -> list:
+    with mock.patch("tradingview_ta.main.requests.post", side_effect=lambda url, **kw: _scan(**kw)):
+        payloads = []
+        for simbolo in simbolos:
+            analysis = TA_Handler(
+                symbol=simbolo, exchange="FX_IDC", screener="forex", interval="1m"
+            ).get_analysis()
+            payloads.append({
+                "symbol": simbolo,
+                "summary": analysis.summary,
+                "oscillators": analysis.oscillators,
+                "moving_averages": analysis.moving_averages,
+            })
+        return payloads
+
+
+def atual_tradingview(simbolos: list) -> dict:
+    sessao = mock.Mock(post=lambda url, **kw: _scan(**kw))
+    with mock.patch.object(tradingview_service.provider_clients, "tradingview", return_value=sessao), \
+            mock.patch.object(tradingview_service, "tv_cache", TTLCache(0)):
+        return tradingview_service.get_forex_batch(
+            TVForexBatchQuery(symbols=simbolos, intervals=["1m"], exchange="FX_IDC")
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000, help="candles por payload")
+    parser.add_argument("--simbolos", type=int, default=100, help="símbolos no caso TradingView (máx. 100 por lote)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    n = args.linhas
+    casos = [
+        ("binance", payload_binance(n), antigo_binance, atual_binance),
+        ("polygon", payload_polygon(n), antigo_polygon, atual_polygon),
+        ("alphavantage", payload_alphavantage(n), antigo_alphavantage, normalizar_alphavantage),
+    ]
+
+    linhas = []
+    for nome, payload, antigo, atual in casos:
+        _conferir(nome, antigo(payload), atual(payload))
+        t_antigo = melhor_de(lambda: antigo(payload), args.repeticoes)
+        t_atual = melhor_de(lambda: atual(payload), args.repeticoes)
+        linhas.append((nome, n, f"{t_antigo:.3f}", f"{t_atual:.3f}", f"{t_antigo / t_atual:.1f}x"))
+
+    simbolos = [f"P{i:04d}" for i in range(args.simbolos)]
+    assert len(antigo_tradingview(simbolos)) == atual_tradingview(simbolos)["rows"] == len(simbolos)
+    t_antigo = melhor_de(lambda: antigo_tradingview(simbolos), args.repeticoes)
+    t_atual = melhor_de(lambda: atual_tradingview(simbolos), args.repeticoes)
+    linhas.append(("tradingview", len(simbolos), f"{t_antigo:.3f}", f"{t_atual:.3f}", f"{t_antigo / t_atual:.1f}x"))
+
+    tabela(("provedor", "linhas", "antigo (s)", "atual (s)", "ganho"), linhas)
+
+
+if __name__ == "__main__":
+    main()
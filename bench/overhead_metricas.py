@@ -0,0 +1,159 @@
+"""
+Custo das métricas: latência por requisição com e sem MetricsMiddleware,
+e custo por chamada de track_upstream / db_timed.
+
+    python -m bench.overhead_metricas [--iteracoes 100000] [--conexoes 16] [--duracao 5]
+
+Três medições:
+  - ASGI em processo: a app chamada direto (sem rede) N vezes, melhor de 5,
+    para uma app ASGI mínima e para uma rota FastAPI mínima
+  - decorators: track_upstream e db_timed em volta de uma chamada vazia
+  - HTTP: a mesma rota FastAPI num uvicorn (1 worker) com e sem o
+    middleware, sob carga keep-alive; p50/p99 (use --duracao 0 para pular)
+"""
+import argparse
+import asyncio
+
+from fastapi import FastAPI
+
+from bench import carga, melhor_de, percentil, servidor, tabela
+from core.metrics import MetricsMiddleware, db_timed, track_upstream
+
+
+# ===========================
+# 🔹 Apps
+# ===========================
+async def asgi_minima(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _fastapi(com_metricas: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if com_metricas:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+# Sobem no uvicorn da medição HTTP
+app_sem = _fastapi(False)
+app_com = _fastapi(True)
+
+
+# ===========================
+# 🔹 Medição em processo
+# ===========================
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+    "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+    "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _por_requisicao(app, iteracoes: int) -> float:
+    """
+    Microssegundos por requisição, melhor de 5.
+    """
+    async def laco():
+        for _ in range(iteracoes):
+            await app(dict(SCOPE), _receive, _send)
+
+    async def preparar():
+        # FastAPI monta a pilha de middlewares na primeira chamada
+        await app(dict(SCOPE), _receive, _send)
+
+    asyncio.run(preparar())
+    return melhor_de(lambda: asyncio.run(laco()), 5) / iteracoes * 1e6
+
+
+class _Storage:
+    name = "bench"
+
+    @db_timed("noop")
+    async def noop(self):
+        pass
+
+
+def _decorators(iteracoes: int) -> tuple:
+    async def vazio():
+        for _ in range(iteracoes):
+            pass
+
+    async def upstream():
+        for _ in range(iteracoes):
+            with track_upstream("bench", "noop"):
+                pass
+
+    async def db():
+        storage = _Storage()
+        for _ in range(iteracoes):
+            await storage.noop()
+
+    async def db_sem():
+        noop = _Storage.noop.__wrapped__
+        storage = _Storage()
+        for _ in range(iteracoes):
+            await noop(storage)
+
+    base = melhor_de(lambda: asyncio.run(vazio()), 5)
+    base_db = melhor_de(lambda: asyncio.run(db_sem()), 5)
+    return (
+        (melhor_de(lambda: asyncio.run(upstream()), 5) - base) / iteracoes * 1e6,
+        (melhor_de(lambda: asyncio.run(db()), 5) - base_db) / iteracoes * 1e6,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteracoes", type=int, default=100_000)
+    parser.add_argument("--conexoes", type=int, default=16)
+    parser.add_argument("--duracao", type=float, default=5.0)
+    args = parser.parse_args()
+    n = args.iteracoes
+
+    linhas = []
+    for nome, sem, com in (
+        ("ASGI mínima", asgi_minima, MetricsMiddleware(asgi_minima)),
+        ("rota FastAPI", _fastapi(False), _fastapi(True)),
+    ):
+        t_sem, t_com = _por_requisicao(sem, n), _por_requisicao(com, n)
+        linhas.append((nome, f"{t_sem:.1f}", f"{t_com:.1f}", f"{t_com - t_sem:.1f}", f"{(t_com / t_sem - 1) * 100:.1f}%"))
+    print(f"Em processo, {n} requisições (µs por requisição)")
+    tabela(("app", "sem", "com", "diferença", "acréscimo"), linhas)
+
+    upstream, db = _decorators(n)
+    print(f"\ntrack_upstream: {upstream:.1f} µs/chamada; db_timed: {db:.1f} µs/chamada")
+
+    if args.duracao <= 0:
+        return
+
+    linhas = []
+    for nome, app in (("sem", "app_sem"), ("com", "app_com")):
+        with servidor(f"bench.overhead_metricas:{app}") as url:
+            latencias, status = asyncio.run(carga(f"{url}/ping", args.conexoes, args.duracao, metodo="GET"))
+        assert set(status) == {200}, status
+        linhas.append((
+            nome,
+            f"{len(latencias) / args.duracao:.0f}",
+            f"{percentil(latencias, 50) * 1000:.2f}",
+            f"{percentil(latencias, 99) * 1000:.2f}",
+        ))
+    print(f"\nHTTP (uvicorn, {args.conexoes} conexões, {args.duracao:.0f}s)")
+    tabela(("middleware", "req/s", "p50 (ms)", "p99 (ms)"), linhas)
+
+
+if __name__ == "__main__":
+    main()
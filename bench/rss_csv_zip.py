@@ -0,0 +1,108 @@
+"""
+Pico de memória (RSS) ao gravar um CSV de candles dentro do ZIP: caminho
+antigo (to_csv num StringIO + writestr do getvalue()) contra
+reports_service.write_csv_to_zip.
+
+    python -m bench.rss_csv_zip [--linhas 500000 2000000]
+
+Cada medição roda num processo novo: o frame é montado antes, o pico
+(ru_maxrss) é lido antes e depois da gravação e o script reporta a
+diferença, isto é, quanto a gravação subiu o pico acima do frame já em
+memória. Só roda em Linux/macOS (módulo resource).
+"""
+import argparse
+import hashlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from bench import tabela
+from services.reports_service import write_csv_to_zip
+
+
+def _pico_mb() -> float:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KiB; macOS, bytes
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _candles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    open_ = rng.normal(1.1, 0.01, n).round(5)
+    close = (open_ + rng.normal(0, 0.001, n)).round(5)
+    return pd.DataFrame({
+        "Open_Time": pd.date_range("2024-01-01", periods=n, freq="min"),
+        "Open": open_,
+        "High": np.maximum(open_, close) + 0.0005,
+        "Low": np.minimum(open_, close) - 0.0005,
+        "Close": close,
+        "Volume": rng.integers(1, 1000, n).astype(float),
+        "Resultado": np.where(close >= open_, "Call", "Put"),
+    })
+
+
+def antigo(zipf: zipfile.ZipFile, nome: str, df: pd.DataFrame) -> None:
+    buff = io.StringIO()
+    df.to_csv(buff, index=False)
+    zipf.writestr(nome, buff.getvalue())
+
+
+def atual(zipf: zipfile.ZipFile, nome: str, df: pd.DataFrame) -> None:
+    write_csv_to_zip(zipf, nome, df)
+
+
+def _medir(modo: str, linhas: int) -> None:
+    """
+    Roda no processo filho: imprime "<pico acima do frame em MB> <sha256 do CSV>".
+    """
+    df = _candles(linhas)
+    gravar = antigo if modo == "antigo" else atual
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "saida.zip")
+        antes = _pico_mb()
+        with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as zipf:
+            gravar(zipf, "EURUSDT_1m.csv", df)
+        pico = _pico_mb() - antes
+
+        sha = hashlib.sha256()
+        with zipfile.ZipFile(caminho) as zipf, zipf.open("EURUSDT_1m.csv") as entrada:
+            for bloco in iter(lambda: entrada.read(1 << 20), b""):
+                sha.update(bloco)
+        print(f"{pico:.1f} {sha.hexdigest()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[500_000, 2_000_000])
+    parser.add_argument("--medir", choices=["antigo", "atual"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        _medir(args.medir, args.linhas[0])
+        return
+
+    linhas = []
+    for n in args.linhas:
+        resultado = {}
+        for modo in ("antigo", "atual"):
+            saida = subprocess.run(
+                [sys.executable, "-m", "bench.rss_csv_zip", "--medir", modo, "--linhas", str(n)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            resultado[modo] = (float(saida[0]), saida[1])
+        # Os dois caminhos têm que gravar o mesmo CSV
+        assert resultado["antigo"][1] == resultado["atual"][1], resultado
+        linhas.append((n, f"{resultado['antigo'][0]:.1f}", f"{resultado['atual'][0]:.1f}"))
+
+    tabela(("linhas", "antigo (MB)", "atual (MB)"), linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Vazão dos backends de Storage com a mesma carga: ingestão de eventos em
+lotes (como o TrackingBuffer grava), admin_counts e timeseries horária.
+
+    python -m bench.vazao_storage [--eventos 100000] [--lote 500] [--consultas 50]
+
+SQLite roda sempre (arquivo temporário). Postgres roda quando
+TEST_NEON_DATABASE_URL aponta para um banco criado pelo db_init.py; como
+nos testes, as tabelas são esvaziadas antes (use um banco descartável).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from bench import percentil, tabela
+from core.config import settings
+from models.db import acquire
+from models.storage import PostgresStorage, SQLiteStorage
+from models.storage.base import Storage
+from utils.date_utils import alinhar_bucket
+
+
+TEST_PG_URL = os.getenv("TEST_NEON_DATABASE_URL")
+
+TABELAS_PG = "events, sessions, users, event_counts_daily, event_counts_hourly, event_counts_user_hourly"
+
+DIAS = 14
+TIPOS = [f"page:{i}" for i in range(15)] + ["click", "login", "logout", "download", "extract"]
+
+
+def _eventos(n: int, usuarios: list, fim: datetime) -> list:
+    """
+    n eventos espalhados nos últimos DIAS dias; um terço por uuid, um terço
+    por email e o resto anônimo.
+    """
+    rng = np.random.default_rng(0)
+    segundos = rng.uniform(0, DIAS * 86400, n)
+    tipos = rng.integers(0, len(TIPOS), n)
+    quem = rng.integers(0, len(usuarios), n)
+    linhas = []
+    for i in range(n):
+        uid, email = usuarios[quem[i]]
+        ref = (uid, None) if i % 3 == 0 else (None, email) if i % 3 == 1 else (None, None)
+        linhas.append((*ref, TIPOS[tipos[i]], None, fim - timedelta(seconds=float(segundos[i]))))
+    return linhas
+
+
+async def _medir(storage: Storage, eventos: int, lote: int, consultas: int) -> tuple:
+    await storage.start()
+    try:
+        if storage.name == "postgres":
+            async with acquire() as conn:
+                await conn.execute(f"TRUNCATE {TABELAS_PG}")
+
+        usuarios = []
+        for i in range(50):
+            email = f"carga{i}@exemplo.com"
+            await storage.create_user(email, "hash")
+            usuarios.append((uuid.UUID((await storage.get_user_by_email(email))["id"]), email))
+
+        agora = datetime.now(timezone.utc)
+        linhas = _eventos(eventos, usuarios, agora)
+
+        inicio = time.perf_counter()
+        for i in range(0, len(linhas), lote):
+            await storage.insert_batch(linhas[i:i + lote], [])
+        ingestao = eventos / (time.perf_counter() - inicio)
+
+        admin = []
+        for _ in range(consultas):
+            inicio = time.perf_counter()
+            await storage.admin_counts()
+            admin.append(time.perf_counter() - inicio)
+
+        fim = alinhar_bucket(agora, "hour") + timedelta(hours=1)
+        serie = []
+        for _ in range(consultas):
+            inicio = time.perf_counter()
+            await storage.timeseries_counts("hour", fim - timedelta(days=DIAS), fim, None, None, None, timeout=30)
+            serie.append(time.perf_counter() - inicio)
+
+        return ingestao, percentil(admin, 50), percentil(serie, 50)
+    finally:
+        await storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=100_000)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--consultas", type=int, default=50)
+    args = parser.parse_args()
+
+    backends = [("sqlite", SQLiteStorage(os.path.join(tempfile.mkdtemp(), "analytics.sqlite3")))]
+    if TEST_PG_URL:
+        settings.NEON_DATABASE_URL = TEST_PG_URL
+        backends.insert(0, ("postgres", PostgresStorage()))
+
+    linhas = []
+    for nome, storage in backends:
+        ingestao, admin, serie = asyncio.run(_medir(storage, args.eventos, args.lote, args.consultas))
+        linhas.append((nome, f"{ingestao / 1000:.1f}k", f"{admin * 1000:.2f}", f"{serie * 1000:.1f}"))
+
+    print(f"{args.eventos} eventos em lotes de {args.lote}; timeseries horária de {DIAS} dias")
+    tabela(("backend", "ingestão (ev/s)", "admin_counts p50 (ms)", "timeseries p50 (ms)"), linhas)
+
+
+if __name__ == "__main__":
+    main()
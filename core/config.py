@@ -7,23 +7,103 @@ class Settings(BaseSettings):
     # === BINANCE ===
     BINANCE_API_KEY: str | None = None
     BINANCE_API_SECRET: str | None = None
+    BINANCE_MAX_WORKERS: int = 8
+    BINANCE_WEIGHT_PER_MINUTE: int = 1200
+    # Conexões keep-alive mantidas no pool e timeout (s) de cada chamada
+    BINANCE_POOL_SIZE: int = 8
+    BINANCE_TIMEOUT: float = 15.0
+    BINANCE_BASE_URL: str = "https://api.binance.com"
+    # Páginas de klines (shards) baixadas em paralelo, somando todos os jobs
+    BINANCE_SHARD_CONCURRENCY: int = 8
+    BINANCE_MAX_RETRIES: int = 3
 
     # === POLYGON ===
     POLYGON_API_KEY: str | None = None
+    POLYGON_MAX_WORKERS: int = 4
+    POLYGON_CALLS_PER_MINUTE: int = 5
+    # Candles por janela (shard) e janelas baixadas em paralelo por ativo
+    POLYGON_SHARD_BARS: int = 50_000
+    POLYGON_SHARD_WORKERS: int = 4
+    POLYGON_POOL_SIZE: int = 8
+    POLYGON_TIMEOUT: float = 15.0
 
     # === ALPHA VANTAGE ===
     ALPHA_VANTAGE_API_KEY: str | None = None
+    ALPHA_VANTAGE_MAX_WORKERS: int = 2
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = 5
+    ALPHA_VANTAGE_POOL_SIZE: int = 2
+    ALPHA_VANTAGE_TIMEOUT: float = 30.0
+    # Histórico local por par (semeado com "full", atualizado com "compact")
+    AV_HISTORY_DIR: str = "cache/alphavantage"
+    AV_HISTORY_REFRESH_SECONDS: float = 60.0
 
     # === TRADINGVIEW ===
     TV_USERNAME: str | None = None
     TV_PASSWORD: str | None = None
+    TV_POOL_SIZE: int = 4
+    TV_TIMEOUT: float = 10.0
+    # Resumos de 1 minuto: curto o bastante para não ficar defasado
+    TV_CACHE_TTL: float = 30.0
 
     # === CORS ===
     ALLOWED_ORIGINS: List[str] = Field(default_factory=lambda: ["*"])
 
     # === AUTH / DB ===
     SECRET_KEY: str | None = None
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_MAX_PENDING: int = 64
     NEON_DATABASE_URL: str | None = None
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float = 10.0
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300.0
+    # 0 quando usar o endpoint "-pooler" do Neon (PgBouncer em transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # "postgres" (Neon) | "sqlite" (arquivo local, para desenvolvimento)
+    STORAGE_BACKEND: str = "postgres"
+    SQLITE_PATH: str = "data/analytics.sqlite3"
+
+    # === ANALYTICS ===
+    ADMIN_STATS_CACHE_TTL: float = 10.0
+    TIMESERIES_MAX_POINTS: int = 1000
+    TIMESERIES_TIMEOUT: float = 2.0
+
+    # === TRACKING (ingestão em lote) ===
+    TRACKING_QUEUE_MAX: int = 10_000
+    TRACKING_BATCH_SIZE: int = 500
+    TRACKING_FLUSH_INTERVAL: float = 1.0
+    # "drop" | "drop_oldest" | "block"
+    TRACKING_OVERFLOW: str = "drop"
+    # Lote que falha é regravado até N vezes (espera dobra a cada tentativa)
+    TRACKING_FLUSH_RETRIES: int = 3
+    TRACKING_RETRY_BACKOFF: float = 0.5
+
+    # === PRESENÇA (heartbeat) ===
+    ACTIVE_SESSION_WINDOW: float = 900.0
+    PRESENCE_FLUSH_INTERVAL: float = 30.0
+    # Teto de sessões em memória (as mais antigas saem primeiro)
+    PRESENCE_MAX_SESSIONS: int = 100_000
+
+    # === EVENTS (particionamento e retenção) ===
+    # "month" | "day"
+    EVENTS_PARTITION_UNIT: str = "month"
+    EVENTS_PARTITIONS_AHEAD: int = 2
+    # Partições mais antigas que isso vão para Parquet; 0 = nunca arquivar
+    EVENTS_RETENTION_DAYS: int = 365
+    EVENTS_ARCHIVE_DIR: str = "archive/events"
+    EVENTS_MAINTENANCE_INTERVAL: float = 6 * 3600
+
+    # === CACHE DE CANDLES ===
+    CANDLE_CACHE_DIR: str = "cache/candles"
+    CANDLE_CACHE_MAX_MB: int = 1024
+
+    # === JOBS ===
+    JOBS_MAX_CONCURRENT: int = 2
+    JOBS_PROCESS_WORKERS: int | None = None
+    JOBS_HISTORY: int = 200
+    # Jobs esperando vaga; além disso a API responde 503 (Retry-After em s)
+    JOBS_MAX_PENDING: int = 20
+    JOBS_RETRY_AFTER: int = 30
 
     # === ADMIN SEED ===
     ADMIN_EMAIL: str | None = None
@@ -18,6 +18,8 @@ def add_exception_handlers(app: FastAPI) -> None:
                 "status_code": exc.status_code,
                 "path": request.url.path,
             },
+            # Retry-After do 503 do login, WWW-Authenticate etc.
+            headers=getattr(exc, "headers", None),
         )
 
     @app.exception_handler(Exception)
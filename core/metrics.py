@@ -0,0 +1,260 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+# Limites (segundos) dos histogramas de latência: de 5ms (query/rota leve)
+# a 30s (download paginado de provedor)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry: List["_Metric"] = []
+
+# Funções chamadas antes de cada render, para gauges lidos na hora da
+# coleta (ex.: tamanho do pool) em vez de atualizados a cada operação
+_coletores: List[Callable[[], None]] = []
+
+
+def _escape(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_labels(nomes: Sequence[str], valores: Sequence[str]) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(nomes, valores)) + "}"
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+# ===========================
+# 🔹 Métricas (formato texto do Prometheus)
+# ===========================
+class _Metric:
+    """
+    Uma família de métricas com labels fixos. Os valores dos labels vão
+    como tupla na ordem de `labelnames`; thread-safe (os downloads de
+    provedores rodam em threads).
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def _amostras(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            itens = list(self._values.items())
+        for labels, valor in sorted(itens):
+            yield self.name, _formatar_labels(self.labelnames, labels), valor
+
+    def render(self) -> str:
+        linhas = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        linhas += [f"{nome}{labels} {_numero(valor)}" for nome, labels, valor in self._amostras()]
+        return "\n".join(linhas)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), valor: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + valor
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, labels: Tuple[str, ...] = (), valor: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + valor
+
+    def dec(self, labels: Tuple[str, ...] = (), valor: float = 1) -> None:
+        self.inc(labels, -valor)
+
+    def set(self, labels: Tuple[str, ...] = (), valor: float = 0) -> None:
+        with self._lock:
+            self._values[labels] = valor
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket (+Inf no fim), soma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], valor: float) -> None:
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][i] += 1
+            serie[1] += valor
+
+    def _amostras(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            itens = [(labels, list(contagens), soma) for labels, (contagens, soma) in self._series.items()]
+
+        nomes_le = self.labelnames + ("le",)
+        for labels, contagens, soma in sorted(itens):
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += n
+                le = "+Inf" if limite == float("inf") else _numero(limite)
+                yield f"{self.name}_bucket", _formatar_labels(nomes_le, labels + (le,)), acumulado
+            yield f"{self.name}_sum", _formatar_labels(self.labelnames, labels), soma
+            yield f"{self.name}_count", _formatar_labels(self.labelnames, labels), acumulado
+
+
+def registrar_coletor(fn: Callable[[], None]) -> Callable[[], None]:
+    _coletores.append(fn)
+    return fn
+
+
+def render_metrics() -> str:
+    for coletor in _coletores:
+        try:
+            coletor()
+        except Exception as e:
+            print(f"[METRICS ERROR] Coletor {getattr(coletor, '__name__', coletor)}: {e}")
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# ===========================
+# 🔹 Métricas da aplicação
+# ===========================
+http_requests = Counter("http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "Latência das requisições HTTP.", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "Requisições HTTP em andamento.")
+
+db_latency = Histogram("db_query_duration_seconds", "Latência das operações de banco.", ("backend", "op"))
+db_in_flight = Gauge("db_queries_in_flight", "Operações de banco em andamento.", ("backend",))
+db_errors = Counter("db_query_errors_total", "Operações de banco que falharam.", ("backend", "op", "error"))
+
+db_pool_size = Gauge("db_pool_connections", "Conexões abertas no pool asyncpg.")
+db_pool_in_use = Gauge("db_pool_connections_in_use", "Conexões do pool emprestadas no momento.")
+db_pool_idle = Gauge("db_pool_connections_idle", "Conexões ociosas no pool.")
+db_pool_max_size = Gauge("db_pool_max_connections", "Tamanho máximo configurado do pool.")
+db_pool_acquire_wait = Histogram("db_pool_acquire_wait_seconds", "Espera para obter uma conexão do pool.")
+db_pool_acquire_timeouts = Counter(
+    "db_pool_acquire_timeouts_total", "Esperas por conexão do pool que passaram do timeout."
+)
+
+upstream_latency = Histogram(
+    "upstream_request_duration_seconds", "Latência das chamadas a provedores externos.", ("provider", "op")
+)
+upstream_in_flight = Gauge("upstream_requests_in_flight", "Chamadas a provedores em andamento.", ("provider",))
+upstream_errors = Counter(
+    "upstream_request_errors_total", "Chamadas a provedores que falharam.", ("provider", "op", "error")
+)
+
+
+# ===========================
+# 🔹 Instrumentação
+# ===========================
+class _Medir:
+    """
+    Context manager de latência + em andamento + erros (classe em vez de
+    @contextmanager: metade do custo por chamada).
+    """
+
+    __slots__ = ("latency", "in_flight", "errors", "grupo", "op", "inicio")
+
+    def __init__(self, latency: Histogram, in_flight: Gauge, errors: Counter, grupo: str, op: str):
+        self.latency = latency
+        self.in_flight = in_flight
+        self.errors = errors
+        self.grupo = grupo
+        self.op = op
+
+    def __enter__(self):
+        self.in_flight.inc((self.grupo,))
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.latency.observe((self.grupo, self.op), time.perf_counter() - self.inicio)
+        self.in_flight.dec((self.grupo,))
+        if exc_type is not None:
+            self.errors.inc((self.grupo, self.op, exc_type.__name__))
+        return False
+
+
+def track_db(backend: str, op: str):
+    """
+    `with track_db("postgres", "insert_batch"): ...`
+    """
+    return _Medir(db_latency, db_in_flight, db_errors, backend, op)
+
+
+def track_upstream(provider: str, op: str):
+    """
+    `with track_upstream("binance", "klines"): ...` — só a chamada de rede
+    (a espera do rate limiter fica de fora).
+    """
+    return _Medir(upstream_latency, upstream_in_flight, upstream_errors, provider, op)
+
+
+def db_timed(op: str):
+    """
+    Decorator para métodos async de Storage (o backend vem de self.name).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            with track_db(self.name, op):
+                return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sem BaseHTTPMiddleware, que custa uma task por
+    requisição): latência, status e requisições em andamento por rota.
+    A rota é o template ("/api/v1/tracking/event"), não a URL, para
+    manter a cardinalidade baixa; sem rota = "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_com_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            duracao = time.perf_counter() - inicio
+            http_in_flight.dec()
+
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_latency.observe((method, path), duracao)
+            http_requests.inc((method, path, str(status[0])))
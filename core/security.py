@@ -1,52 +1,69 @@
-from datetime import timedelta
-from fastapi import APIRouter, HTTPException
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
 import bcrypt
+from jose import jwt
+
+from core.config import settings
+
+
+ALGORITHM = "HS256"
+
+
+class HashBusy(Exception):
+    """
+    Fila de verificação de senha cheia: o login deve responder 503.
+    """
+
+
+# ===========================
+# 🔹 Token
+# ===========================
+def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=8)) -> str:
+    if not settings.SECRET_KEY:
+        raise RuntimeError("SECRET_KEY não está definido!")
+
+    claims = dict(data)
+    claims["exp"] = datetime.now(timezone.utc) + expires_delta
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+# ===========================
+# 🔹 Senha (bcrypt fora do threadpool das rotas)
+# ===========================
+# bcrypt libera o GIL, então um pool pequeno e dedicado limita o custo de
+# CPU do login sem ocupar as threads que servem as rotas síncronas.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.AUTH_HASH_WORKERS),
+    thread_name_prefix="bcrypt",
+)
+_hash_pending = 0
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """
+    bcrypt.checkpw no executor dedicado. Com AUTH_HASH_MAX_PENDING
+    verificações já em andamento/na fila, levanta HashBusy.
+    """
+    global _hash_pending
+
+    if _hash_pending >= settings.AUTH_HASH_MAX_PENDING:
+        raise HashBusy()
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _hash_executor, bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8")
+        )
+    finally:
+        _hash_pending -= 1
+
+
+def hash_pending() -> int:
+    return _hash_pending
+
 
-from models.db import get_sync_conn
-from core.security import create_access_token
-
-router = APIRouter(prefix="/auth", tags=["Auth"])
-
-@router.post("/login")
-def login(payload: dict):
-    email = payload.get("email")
-    password = payload.get("password")
-
-    if not email or not password:
-        raise HTTPException(status_code=400, detail="Dados inválidos")
-
-    conn = get_sync_conn()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT id, email, password_hash, role FROM users WHERE email = %s",
-        (email,)
-    )
-    user = cursor.fetchone()
-
-    conn.close()
-
-    if not user or not bcrypt.checkpw(
-        password.encode(),
-        user[2].encode()
-    ):
-        raise HTTPException(status_code=401, detail="Credenciais inválidas")
-
-    token = create_access_token(
-        {
-            "sub": str(user[0]),
-            "email": user[1],
-            "role": user[3],
-        },
-        expires_delta=timedelta(hours=8),
-    )
-
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "user": {
-            "id": user[0],
-            "email": user[1],
-            "role": user[3],
-        },
-    }
+def shutdown_hash_executor() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
@@ -5,6 +5,9 @@ import asyncpg
 import bcrypt
 from dotenv import load_dotenv
 
+from core.config import settings
+from services.partition_service import ensure_partitions
+
 load_dotenv()
 
 NEON_URL = os.getenv("NEON_DATABASE_URL")
@@ -38,23 +41,166 @@ CREATE TABLE IF NOT EXISTS sessions (
 );
 
 CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id);
+-- Sessões ativas (carga do mapa de presença no startup, histórico por período)
+CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions(last_active);
+"""
 
+# events é particionada por created_at (partições criadas/arquivadas por
+# services/partition_service.py). A PK precisa incluir a chave de partição.
+EVENTS_SQL = """
 CREATE TABLE IF NOT EXISTS events (
-  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  id uuid NOT NULL DEFAULT gen_random_uuid(),
   user_id uuid NULL REFERENCES users(id) ON DELETE SET NULL,
   event_type text NOT NULL,
   meta jsonb NULL,
-  created_at timestamptz DEFAULT now()
-);
+  created_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Rede de segurança para eventos fora das partições existentes
+CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_events_event_type ON events(event_type);
 CREATE INDEX IF NOT EXISTS idx_events_created_at ON events(created_at);
 """
 
+ROLLUP_SQL = """
+-- Rollup por dia (UTC) e tipo de evento, mantido pelo trigger abaixo:
+-- o painel admin lê daqui em vez de varrer a tabela events.
+CREATE TABLE IF NOT EXISTS event_counts_daily (
+  day date NOT NULL,
+  event_type text NOT NULL,
+  count bigint NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, event_type)
+);
+
+-- Rollups horários para as séries temporais (/api/v1/analytics/timeseries):
+-- geral por tipo e por usuário (só eventos com user_id).
+CREATE TABLE IF NOT EXISTS event_counts_hourly (
+  bucket timestamptz NOT NULL,
+  event_type text NOT NULL,
+  count bigint NOT NULL DEFAULT 0,
+  PRIMARY KEY (bucket, event_type)
+);
+
+CREATE TABLE IF NOT EXISTS event_counts_user_hourly (
+  user_id uuid NOT NULL,
+  bucket timestamptz NOT NULL,
+  event_type text NOT NULL,
+  count bigint NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, bucket, event_type)
+);
+
+-- Trigger por statement: um INSERT com N eventos vira um upsert agregado por rollup
+CREATE OR REPLACE FUNCTION events_rollup_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO event_counts_daily AS r (day, event_type, count)
+  SELECT (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date, event_type, count(*)
+  FROM new_events
+  GROUP BY 1, 2
+  ORDER BY 1, 2
+  ON CONFLICT (day, event_type) DO UPDATE SET count = r.count + EXCLUDED.count;
+
+  INSERT INTO event_counts_hourly AS r (bucket, event_type, count)
+  SELECT date_trunc('hour', created_at, 'UTC'), event_type, count(*)
+  FROM new_events
+  GROUP BY 1, 2
+  ORDER BY 1, 2
+  ON CONFLICT (bucket, event_type) DO UPDATE SET count = r.count + EXCLUDED.count;
+
+  INSERT INTO event_counts_user_hourly AS r (user_id, bucket, event_type, count)
+  SELECT user_id, date_trunc('hour', created_at, 'UTC'), event_type, count(*)
+  FROM new_events
+  WHERE user_id IS NOT NULL
+  GROUP BY 1, 2, 3
+  ORDER BY 1, 2, 3
+  ON CONFLICT (user_id, bucket, event_type) DO UPDATE SET count = r.count + EXCLUDED.count;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_events_rollup ON events;
+CREATE TRIGGER trg_events_rollup
+  AFTER INSERT ON events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION events_rollup_insert();
+
+-- Backfill único para bancos que já tinham eventos antes dos rollups
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM event_counts_daily) THEN
+    INSERT INTO event_counts_daily (day, event_type, count)
+    SELECT (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date, event_type, count(*)
+    FROM events
+    GROUP BY 1, 2;
+  END IF;
+
+  IF NOT EXISTS (SELECT 1 FROM event_counts_hourly) THEN
+    INSERT INTO event_counts_hourly (bucket, event_type, count)
+    SELECT date_trunc('hour', created_at, 'UTC'), event_type, count(*)
+    FROM events
+    GROUP BY 1, 2;
+
+    INSERT INTO event_counts_user_hourly (user_id, bucket, event_type, count)
+    SELECT user_id, date_trunc('hour', created_at, 'UTC'), event_type, count(*)
+    FROM events
+    WHERE user_id IS NOT NULL
+    GROUP BY 1, 2, 3;
+  END IF;
+END $$;
+"""
+
+
+async def renomear_events_legado(conn) -> bool:
+    """
+    Bancos criados antes do particionamento: a tabela events antiga vira
+    events_legacy (PK renomeada e índices removidos para liberar os nomes).
+    """
+    relkind = await conn.fetchval("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('events')")
+    if relkind != "r":
+        return False
+
+    await conn.execute("""
+        DROP TRIGGER IF EXISTS trg_events_rollup ON events;
+        ALTER TABLE events RENAME TO events_legacy;
+        ALTER TABLE events_legacy RENAME CONSTRAINT events_pkey TO events_legacy_pkey;
+        DROP INDEX IF EXISTS idx_events_event_type;
+        DROP INDEX IF EXISTS idx_events_created_at;
+    """)
+    return True
+
+
 async def main():
     conn = await asyncpg.connect(NEON_URL)
     try:
         await conn.execute(SQL)
+
+        async with conn.transaction():
+            legado = await renomear_events_legado(conn)
+            await conn.execute(EVENTS_SQL)
+
+            desde = None
+            if legado:
+                primeiro = await conn.fetchval("SELECT min(created_at) FROM events_legacy")
+                desde = primeiro.date() if primeiro else None
+
+            criadas = await ensure_partitions(
+                conn, settings.EVENTS_PARTITION_UNIT, settings.EVENTS_PARTITIONS_AHEAD, desde
+            )
+            print(f"Partitions created: {', '.join(criadas) or 'none'}")
+
+            # Copiado antes do trigger do rollup existir: os contadores já incluem esses eventos
+            if legado:
+                status = await conn.execute("""
+                    INSERT INTO events (id, user_id, event_type, meta, created_at)
+                    SELECT id, user_id, event_type, meta, coalesce(created_at, now())
+                    FROM events_legacy
+                """)
+                await conn.execute("DROP TABLE events_legacy")
+                print(f"Legacy events migrated: {status.split()[-1]}")
+
+        await conn.execute(ROLLUP_SQL)
         print("Schemas created/checked")
 
         for email, plain in USERS:
@@ -1,3 +1,27 @@
 # healthcheck.py
+from models.storage import storage
+from services.auth_service import login_stats
+from services.av_history_service import av_history
+from services.binance_service import binance_fetcher
+from services.jobs_service import job_manager
+from services.partition_service import event_partitions
+from services.presence_service import presence
+from services.provider_clients import provider_clients
+from services.tracking_service import tracking_buffer
+from services.tradingview_service import tv_cache
+
+
 def healthcheck():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "storage": storage.stats(),
+        "tracking": tracking_buffer.stats(),
+        "presence": presence.stats(),
+        "event_partitions": event_partitions.stats(),
+        "login": login_stats(),
+        "provider_clients": provider_clients.stats(),
+        "jobs": job_manager.stats(),
+        "binance_klines": binance_fetcher.stats(),
+        "av_history": av_history.stats(),
+        "tradingview_cache": tv_cache.stats(),
+    }
@@ -1,9 +1,19 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
 from core.exceptions import add_exception_handlers
+from core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from core.security import shutdown_hash_executor
 from healthcheck import healthcheck
+from models.storage import storage
+from services.binance_service import binance_fetcher
+from services.jobs_service import job_manager
+from services.partition_service import event_partitions
+from services.presence_service import presence
+from services.provider_clients import provider_clients
+from services.tracking_service import tracking_buffer
 from utils.admin_seed import seed_admin
 
 from routers import (
@@ -15,6 +25,7 @@ from routers import (
     reports_router,
     tracking_router,
     analytics_router,
+    jobs_router,
 )
 
 app = FastAPI(
@@ -30,12 +41,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 add_exception_handlers(app)
 
 
 @app.on_event("startup")
-def startup():
-    seed_admin()
+async def startup_db():
+    await storage.start()
+    await seed_admin()
+    await tracking_buffer.start()
+    await presence.start()
+    # Partições e arquivamento só existem no Postgres
+    if storage.name == "postgres":
+        await event_partitions.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_db():
+    await event_partitions.stop()
+    await tracking_buffer.stop()
+    await presence.stop()
+    await storage.close()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    job_manager.shutdown()
+    provider_clients.close()
+    binance_fetcher.close()
+    shutdown_hash_executor()
 
 
 @app.get("/")
@@ -48,6 +83,11 @@ def health():
     return healthcheck()
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 app.include_router(auth_router.router)
 app.include_router(binance_router.router)
 app.include_router(polygon_router.router)
@@ -56,3 +96,4 @@ app.include_router(tradingview_router.router)
 app.include_router(reports_router.router)
 app.include_router(tracking_router.router)
 app.include_router(analytics_router.router)
+app.include_router(jobs_router.router)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 from typing import List
 
@@ -14,3 +16,21 @@ class AdminStats(BaseModel):
     tool_usage: int
     users_total: int
     per_event: List[EventStats]
+
+
+class TimeseriesPoint(BaseModel):
+    bucket: datetime
+    count: int
+
+
+class TimeseriesSeries(BaseModel):
+    event_type: str
+    total: int
+    points: List[TimeseriesPoint]
+
+
+class Timeseries(BaseModel):
+    interval: str
+    start: datetime
+    end: datetime
+    series: List[TimeseriesSeries]
@@ -1,9 +1,24 @@
 # models/db.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional
+
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
 import asyncpg
 from core.config import settings
+from core.metrics import (
+    db_pool_acquire_timeouts,
+    db_pool_acquire_wait,
+    db_pool_idle,
+    db_pool_in_use,
+    db_pool_max_size,
+    db_pool_size,
+    registrar_coletor,
+)
 
 
 # ===========================
@@ -30,38 +45,146 @@ def get_sync_conn():
 
 
 # ===========================
-# 🔹 Conexão Assíncrona (asyncpg)
+# 🔹 Pool Assíncrono (asyncpg) — um por processo, criado no startup
 # ===========================
-async def get_async_conn():
+_pool: asyncpg.Pool | None = None
+
+# Conexão da requisição atual (get_db): acquire() dentro da mesma
+# requisição reaproveita ela em vez de emprestar outra do pool
+_conexao_requisicao: ContextVar[Optional[List[asyncpg.Connection]]] = ContextVar(
+    "conexao_requisicao", default=None
+)
+
+_pool_acquires = 0
+_pool_wait_total = 0.0
+_pool_wait_max = 0.0
+_pool_timeouts = 0
+
+
+async def init_async_pool() -> asyncpg.Pool | None:
     """
-    Conexão assíncrona com Neon.
+    Cria o pool de conexões da aplicação (chamado no startup).
     """
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    if not settings.NEON_DATABASE_URL:
+        print("[DB] NEON_DATABASE_URL não definido — pool assíncrono desativado")
+        return None
+
     try:
-        conn = await asyncpg.connect(
+        _pool = await asyncpg.create_pool(
             settings.NEON_DATABASE_URL,
             ssl="require",
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
         )
-        return conn
+        return _pool
     except Exception as e:
-        print(f"[DB ERROR] Async connection failed: {e}")
+        print(f"[DB ERROR] Failed to create async pool: {e}")
         raise
 
 
-# ===========================
-# 🔹 Pool Assíncrono (recomendado)
-# ===========================
-async def get_async_pool():
+async def close_async_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_async_pool() -> asyncpg.Pool:
+    if _pool is None:
+        raise RuntimeError("Pool assíncrono não inicializado (init_async_pool no startup).")
+    return _pool
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
     """
-    Pool de conexões assíncronas para alta performance.
+    Empresta uma conexão do pool, medindo o tempo de espera. Dentro de uma
+    rota com Depends(get_db), devolve a conexão da requisição.
     """
+    global _pool_acquires, _pool_wait_total, _pool_wait_max, _pool_timeouts
+
+    da_requisicao = _conexao_requisicao.get()
+    if da_requisicao:
+        yield da_requisicao[0]
+        return
+
+    pool = get_async_pool()
+    start = time.perf_counter()
     try:
-        pool = await asyncpg.create_pool(
-            settings.NEON_DATABASE_URL,
-            ssl="require",
-            min_size=1,
-            max_size=5,
-        )
-        return pool
-    except Exception as e:
-        print(f"[DB ERROR] Failed to create async pool: {e}")
+        conn = await pool.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _pool_timeouts += 1
+        db_pool_acquire_timeouts.inc()
         raise
+
+    wait = time.perf_counter() - start
+    db_pool_acquire_wait.observe((), wait)
+    _pool_acquires += 1
+    _pool_wait_total += wait
+    _pool_wait_max = max(_pool_wait_max, wait)
+
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def get_db() -> AsyncIterator[Optional[asyncpg.Connection]]:
+    """
+    Dependency do FastAPI: `conn = Depends(get_db)`. Uma conexão por
+    requisição, também usada pelo storage (via acquire()) até a resposta.
+    Sem pool (backend SQLite) entrega None.
+    """
+    if _pool is None:
+        yield None
+        return
+
+    async with acquire() as conn:
+        # Lista em vez de reset(token): a saída da dependency pode rodar em
+        # outro contexto; esvaziada, tarefas que herdaram o contexto voltam ao pool
+        da_requisicao = [conn]
+        _conexao_requisicao.set(da_requisicao)
+        try:
+            yield conn
+        finally:
+            da_requisicao.clear()
+
+
+def pool_stats() -> dict:
+    if _pool is None:
+        return {"enabled": False}
+
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        "enabled": True,
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "acquires": _pool_acquires,
+        "acquire_timeouts": _pool_timeouts,
+        "wait_avg_ms": round(1000 * _pool_wait_total / _pool_acquires, 3) if _pool_acquires else 0.0,
+        "wait_max_ms": round(1000 * _pool_wait_max, 3),
+    }
+
+
+@registrar_coletor
+def _coletar_pool() -> None:
+    """
+    Ocupação do pool para o /metrics (zerada com o pool desligado).
+    """
+    stats = pool_stats()
+    db_pool_size.set(valor=stats.get("size", 0))
+    db_pool_in_use.set(valor=stats.get("in_use", 0))
+    db_pool_idle.set(valor=stats.get("idle", 0))
+    db_pool_max_size.set(valor=stats.get("max_size", 0))
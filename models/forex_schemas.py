@@ -12,6 +12,18 @@ class RequestData(BaseModel):
     end_date: str
 
 
+class TVForexBatchQuery(BaseModel):
+    """
+    Consulta em lote para TradingView Forex (símbolos × intervalos)
+    """
+    symbols: List[str] = Field(..., min_length=1, max_length=100, description="Pares como 'EURUSD' ou 'OANDA:EURUSD'")
+    intervals: List[str] = Field(default=["1m"], min_length=1, max_length=10, description="'1m', '5m', ..., '1d', '1W', '1M'")
+    exchange: Optional[str] = Field(
+        default=None,
+        description="Exchange para os símbolos sem prefixo; sem ela tenta FX_IDC e depois OANDA"
+    )
+
+
 class TVForexQuery(BaseModel):
     """
     Consulta para TradingView Forex
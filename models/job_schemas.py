@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class JobInfo(BaseModel):
+    """
+    Estado de um job de extração/análise
+    """
+    id: str
+    kind: str
+    status: str
+    stage: str
+    percent: float
+    candles_fetched: int
+    filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobCreated(BaseModel):
+    message: str
+    job_id: str
@@ -1,9 +1,27 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+
+class ReportInfo(BaseModel):
+    filename: str
+    kind: Optional[str] = None
+    provider: Optional[str] = None
+    assets: List[str] = []
+    intervals: List[str] = []
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    rows: Optional[int] = None
+    size: int
+    sha256: str
+    created_at: float
 
 
 class ReportList(BaseModel):
     files: List[str]
+    items: List[ReportInfo] = []
+    total: int = 0
+    page: int = 1
+    page_size: int = 50
 
 
 class ReportDownload(BaseModel):
@@ -0,0 +1,18 @@
+from core.config import settings
+from models.storage.base import EventRow, SessionRow, Storage
+from models.storage.postgres import PostgresStorage
+from models.storage.sqlite import SQLiteStorage
+
+
+STORAGE_BACKENDS = ("postgres", "sqlite")
+
+
+def create_storage(backend: str) -> Storage:
+    if backend == "postgres":
+        return PostgresStorage()
+    if backend == "sqlite":
+        return SQLiteStorage(settings.SQLITE_PATH)
+    raise ValueError(f"STORAGE_BACKEND inválido: {backend} (use {', '.join(STORAGE_BACKENDS)})")
+
+
+storage = create_storage(settings.STORAGE_BACKEND)
@@ -0,0 +1,100 @@
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Linhas que o buffer de tracking entrega ao storage:
+#   evento: (user_uuid, user_email, event_type, meta_json, created_at)
+#   sessão: (session_id, user_uuid, user_email, ip, user_agent, created_at)
+# O usuário vem por uuid ou email; desconhecidos são gravados como NULL.
+EventRow = Tuple[Optional[uuid.UUID], Optional[str], str, Optional[str], datetime]
+SessionRow = Tuple[uuid.UUID, Optional[uuid.UUID], Optional[str], Optional[str], Optional[str], datetime]
+
+
+class Storage(ABC):
+    """
+    Operações de banco usadas por tracking, presença, analytics, login e
+    seed do admin. Cada backend implementa todas com a mesma semântica:
+    horários em UTC e rollups (diário, horário, horário por usuário)
+    atualizados na mesma transação da ingestão. Um backend sem alguma
+    delas falha ao ser instanciado (TypeError), não na primeira chamada.
+    """
+
+    name = "base"
+
+    # --- ciclo de vida ---
+    @abstractmethod
+    async def start(self) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    # --- usuários ---
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        {"id": str, "email", "password_hash", "role"} ou None.
+        """
+        ...
+
+    @abstractmethod
+    async def create_user(self, email: str, password_hash: str, role: str = "user") -> None:
+        ...
+
+    # --- ingestão ---
+    @abstractmethod
+    async def insert_batch(self, events: Sequence[EventRow], sessions: Sequence[SessionRow]) -> None:
+        """
+        Grava eventos e sessões numa única transação.
+        """
+        ...
+
+    # --- presença ---
+    @abstractmethod
+    async def update_last_active(self, last_active: Dict[uuid.UUID, datetime]) -> None:
+        """
+        Avança last_active das sessões (nunca volta no tempo).
+        """
+        ...
+
+    @abstractmethod
+    async def active_sessions(self, window: float) -> List[Tuple[uuid.UUID, datetime]]:
+        """
+        Sessões com last_active nos últimos `window` segundos, da mais antiga
+        para a mais recente.
+        """
+        ...
+
+    # --- analytics ---
+    @abstractmethod
+    async def admin_counts(self) -> Dict[str, Any]:
+        """
+        {"visits_today", "users_total", "per_event": [{"event_type", "count"}]}
+        com per_event em ordem decrescente de count.
+        """
+        ...
+
+    @abstractmethod
+    async def timeseries_counts(
+        self,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        event_types: Optional[List[str]],
+        prefix: Optional[str],
+        user_id: Optional[uuid.UUID],
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[datetime, str, int]]:
+        """
+        (início do bucket em UTC, event_type, count) para buckets de
+        `interval` ("hour" | "day" | "week") em [start, end), já alinhados.
+        Levanta asyncio.TimeoutError se passar de `timeout` segundos.
+        """
+        ...
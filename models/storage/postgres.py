@@ -0,0 +1,191 @@
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.db import acquire, close_async_pool, init_async_pool, pool_stats
+from core.metrics import db_timed
+from models.storage.base import EventRow, SessionRow, Storage
+
+
+# ===========================
+# 🔹 SQL
+# ===========================
+USER_BY_EMAIL_SQL = "SELECT id, email, password_hash, role FROM users WHERE email = $1"
+
+INSERT_USER_SQL = "INSERT INTO users (email, password_hash, role) VALUES ($1, $2, $3)"
+
+# Referência ao usuário: o frontend manda o id (uuid) ou o email.
+# Usuários desconhecidos viram NULL em vez de derrubar o lote na FK.
+INSERT_EVENTS_SQL = """
+INSERT INTO events (user_id, event_type, meta, created_at)
+SELECT coalesce(ui.id, ue.id), e.event_type, e.meta::jsonb, e.created_at
+FROM unnest($1::uuid[], $2::text[], $3::text[], $4::text[], $5::timestamptz[])
+     AS e(user_uuid, user_email, event_type, meta, created_at)
+LEFT JOIN users ui ON ui.id = e.user_uuid
+LEFT JOIN users ue ON ue.email = e.user_email
+"""
+
+INSERT_SESSIONS_SQL = """
+INSERT INTO sessions (id, user_id, ip, user_agent, started_at, last_active)
+SELECT s.id, coalesce(ui.id, ue.id), s.ip, s.user_agent, s.created_at, s.created_at
+FROM unnest($1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::text[], $6::timestamptz[])
+     AS s(id, user_uuid, user_email, ip, user_agent, created_at)
+LEFT JOIN users ui ON ui.id = s.user_uuid
+LEFT JOIN users ue ON ue.email = s.user_email
+"""
+
+# Só avança last_active: um lote atrasado nunca "volta no tempo".
+UPDATE_LAST_ACTIVE_SQL = """
+UPDATE sessions AS s
+SET last_active = v.last_active
+FROM unnest($1::uuid[], $2::timestamptz[]) AS v(id, last_active)
+WHERE s.id = v.id AND s.last_active < v.last_active
+"""
+
+LOAD_ACTIVE_SQL = """
+SELECT id, last_active FROM sessions
+WHERE last_active > now() - make_interval(secs => $1)
+ORDER BY last_active
+"""
+
+# Uma ida ao banco: contadores de eventos vêm do rollup event_counts_daily
+# (mantido por trigger no INSERT em events, ver db_init.py).
+ADMIN_STATS_SQL = """
+SELECT
+  (SELECT coalesce(sum(count), 0)::bigint FROM event_counts_daily
+    WHERE day = (now() AT TIME ZONE 'UTC')::date AND event_type LIKE 'page:%') AS visits_today,
+  (SELECT count(*) FROM users) AS users_total,
+  (SELECT coalesce(json_agg(t ORDER BY t.count DESC), '[]')
+     FROM (SELECT event_type, sum(count)::bigint AS count
+             FROM event_counts_daily GROUP BY event_type) t) AS per_event
+"""
+
+# Filtros opcionais: lista de tipos, prefixo (ex.: "page:") e usuário
+_FILTROS_SQL = """
+  AND ($4::text[] IS NULL OR event_type = ANY($4::text[]))
+  AND ($5::text IS NULL OR left(event_type, length($5::text)) = $5::text)
+"""
+
+TIMESERIES_HOURLY_SQL = """
+SELECT date_trunc($1, bucket, 'UTC') AS t, event_type, sum(count)::bigint AS count
+FROM event_counts_hourly
+WHERE bucket >= $2 AND bucket < $3
+""" + _FILTROS_SQL + """
+GROUP BY 1, 2
+"""
+
+TIMESERIES_DAILY_SQL = """
+SELECT date_trunc($1, day::timestamp) AT TIME ZONE 'UTC' AS t, event_type, sum(count)::bigint AS count
+FROM event_counts_daily
+WHERE day >= ($2 AT TIME ZONE 'UTC')::date AND day < ($3 AT TIME ZONE 'UTC')::date
+""" + _FILTROS_SQL + """
+GROUP BY 1, 2
+"""
+
+TIMESERIES_USER_SQL = """
+SELECT date_trunc($1, bucket, 'UTC') AS t, event_type, sum(count)::bigint AS count
+FROM event_counts_user_hourly
+WHERE user_id = $6 AND bucket >= $2 AND bucket < $3
+""" + _FILTROS_SQL + """
+GROUP BY 1, 2
+"""
+
+
+# ===========================
+# 🔹 Backend Postgres (Neon)
+# ===========================
+class PostgresStorage(Storage):
+    """
+    Pool asyncpg da aplicação (models/db.py). Schema, partições e triggers
+    dos rollups são criados por db_init.py.
+    """
+
+    name = "postgres"
+
+    async def start(self) -> None:
+        await init_async_pool()
+
+    async def close(self) -> None:
+        await close_async_pool()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "pool": pool_stats()}
+
+    # --- usuários ---
+    @db_timed("get_user_by_email")
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        async with acquire() as conn:
+            row = await conn.fetchrow(USER_BY_EMAIL_SQL, email)
+        if not row:
+            return None
+        return {
+            "id": str(row["id"]),
+            "email": row["email"],
+            "password_hash": row["password_hash"],
+            "role": row["role"],
+        }
+
+    @db_timed("create_user")
+    async def create_user(self, email: str, password_hash: str, role: str = "user") -> None:
+        async with acquire() as conn:
+            await conn.execute(INSERT_USER_SQL, email, password_hash, role)
+
+    # --- ingestão ---
+    @db_timed("insert_batch")
+    async def insert_batch(self, events: Sequence[EventRow], sessions: Sequence[SessionRow]) -> None:
+        async with acquire() as conn:
+            async with conn.transaction():
+                if events:
+                    await conn.execute(INSERT_EVENTS_SQL, *zip(*events))
+                if sessions:
+                    await conn.execute(INSERT_SESSIONS_SQL, *zip(*sessions))
+
+    # --- presença ---
+    @db_timed("update_last_active")
+    async def update_last_active(self, last_active: Dict[uuid.UUID, datetime]) -> None:
+        async with acquire() as conn:
+            await conn.execute(UPDATE_LAST_ACTIVE_SQL, list(last_active), list(last_active.values()))
+
+    @db_timed("active_sessions")
+    async def active_sessions(self, window: float) -> List[Tuple[uuid.UUID, datetime]]:
+        async with acquire() as conn:
+            rows = await conn.fetch(LOAD_ACTIVE_SQL, float(window))
+        return [(row["id"], row["last_active"]) for row in rows]
+
+    # --- analytics ---
+    @db_timed("admin_counts")
+    async def admin_counts(self) -> Dict[str, Any]:
+        async with acquire() as conn:
+            row = await conn.fetchrow(ADMIN_STATS_SQL)
+        return {
+            "visits_today": row["visits_today"],
+            "users_total": row["users_total"],
+            "per_event": json.loads(row["per_event"]),
+        }
+
+    @db_timed("timeseries_counts")
+    async def timeseries_counts(
+        self,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        event_types: Optional[List[str]],
+        prefix: Optional[str],
+        user_id: Optional[uuid.UUID],
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[datetime, str, int]]:
+        if user_id is not None:
+            sql = TIMESERIES_USER_SQL
+        elif interval == "hour":
+            sql = TIMESERIES_HOURLY_SQL
+        else:
+            sql = TIMESERIES_DAILY_SQL
+
+        args = [interval, start, end, event_types or None, prefix or None]
+        if user_id is not None:
+            args.append(user_id)
+
+        async with acquire() as conn:
+            rows = await conn.fetch(sql, *args, timeout=timeout)
+        return [(row["t"], row["event_type"], row["count"]) for row in rows]
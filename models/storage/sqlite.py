@@ -0,0 +1,370 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.metrics import db_timed
+from models.storage.base import EventRow, SessionRow, Storage
+from utils.date_utils import alinhar_bucket
+
+
+# Horários em epoch (segundos, UTC); dia do rollup diário em 'YYYY-MM-DD'
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  email TEXT UNIQUE NOT NULL,
+  password_hash TEXT NOT NULL,
+  role TEXT NOT NULL DEFAULT 'user',
+  created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NULL,
+  started_at REAL NOT NULL,
+  last_active REAL NOT NULL,
+  ip TEXT,
+  user_agent TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions(last_active);
+
+CREATE TABLE IF NOT EXISTS events (
+  id INTEGER PRIMARY KEY,
+  user_id TEXT NULL,
+  event_type TEXT NOT NULL,
+  meta TEXT NULL,
+  created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_created_at ON events(created_at);
+
+CREATE TABLE IF NOT EXISTS event_counts_daily (
+  day TEXT NOT NULL,
+  event_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, event_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS event_counts_hourly (
+  bucket INTEGER NOT NULL,
+  event_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (bucket, event_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS event_counts_user_hourly (
+  user_id TEXT NOT NULL,
+  bucket INTEGER NOT NULL,
+  event_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, bucket, event_type)
+) WITHOUT ROWID;
+"""
+
+UPSERT_DAILY_SQL = """
+INSERT INTO event_counts_daily (day, event_type, count) VALUES (?, ?, ?)
+ON CONFLICT (day, event_type) DO UPDATE SET count = count + excluded.count
+"""
+
+UPSERT_HOURLY_SQL = """
+INSERT INTO event_counts_hourly (bucket, event_type, count) VALUES (?, ?, ?)
+ON CONFLICT (bucket, event_type) DO UPDATE SET count = count + excluded.count
+"""
+
+UPSERT_USER_HOURLY_SQL = """
+INSERT INTO event_counts_user_hourly (user_id, bucket, event_type, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id, bucket, event_type) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _epoch(instante: datetime) -> float:
+    return instante.timestamp()
+
+
+def _utc(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+# ===========================
+# 🔹 Backend SQLite (WAL) — desenvolvimento e benchmarks offline
+# ===========================
+class SQLiteStorage(Storage):
+    """
+    Arquivo SQLite local em modo WAL. Escritas passam por uma única thread
+    (um escritor por vez, como o SQLite exige) e leituras por outra, que
+    não bloqueia durante as escritas graças ao WAL. Os rollups são
+    atualizados na mesma transação do lote, como o trigger do Postgres.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._reader: Optional[ThreadPoolExecutor] = None
+
+        self.writes = 0
+        self.reads = 0
+
+    # --- conexões (uma por thread) ---
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _fechar_conn(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _transacao(self, fn: Callable, *args):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn, *args)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _write(self, fn: Callable, *args):
+        if self._writer is None:
+            raise RuntimeError("SQLiteStorage não iniciado (start no startup).")
+        self.writes += 1
+        return await asyncio.get_running_loop().run_in_executor(self._writer, self._transacao, fn, *args)
+
+    async def _read(self, fn: Callable, *args, timeout: Optional[float] = None):
+        if self._reader is None:
+            raise RuntimeError("SQLiteStorage não iniciado (start no startup).")
+        self.reads += 1
+        futuro = asyncio.get_running_loop().run_in_executor(self._reader, lambda: fn(self._conn(), *args))
+        return await asyncio.wait_for(futuro, timeout)
+
+    # --- ciclo de vida ---
+    async def start(self) -> None:
+        if self._writer is not None:
+            return
+
+        pasta = os.path.dirname(self.path)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-w")
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-r")
+        await asyncio.get_running_loop().run_in_executor(
+            self._writer, lambda: self._conn().executescript(SCHEMA_SQL)
+        )
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        for executor in (self._writer, self._reader):
+            if executor is not None:
+                await loop.run_in_executor(executor, self._fechar_conn)
+                executor.shutdown(wait=True)
+        self._writer = self._reader = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "writes": self.writes,
+            "reads": self.reads,
+        }
+
+    # --- usuários ---
+    @db_timed("get_user_by_email")
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        def consulta(conn):
+            return conn.execute(
+                "SELECT id, email, password_hash, role FROM users WHERE email = ?", (email,)
+            ).fetchone()
+
+        row = await self._read(consulta)
+        if not row:
+            return None
+        return {"id": row[0], "email": row[1], "password_hash": row[2], "role": row[3]}
+
+    @db_timed("create_user")
+    async def create_user(self, email: str, password_hash: str, role: str = "user") -> None:
+        def inserir(conn):
+            conn.execute(
+                "INSERT INTO users (id, email, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), email, password_hash, role, time.time()),
+            )
+
+        await self._write(inserir)
+
+    # --- ingestão ---
+    @staticmethod
+    def _resolver_usuarios(conn: sqlite3.Connection, refs) -> Dict[Any, str]:
+        """
+        uuid/email -> id dos usuários existentes (desconhecidos ficam de fora).
+        """
+        ids = sorted({str(u) for u, _ in refs if u is not None})
+        emails = sorted({e for _, e in refs if e})
+        mapa: Dict[Any, str] = {}
+
+        for i in range(0, len(ids), 500):
+            parte = ids[i:i + 500]
+            for (user_id,) in conn.execute(
+                f"SELECT id FROM users WHERE id IN ({','.join('?' * len(parte))})", parte
+            ):
+                mapa[uuid.UUID(user_id)] = user_id
+
+        for i in range(0, len(emails), 500):
+            parte = emails[i:i + 500]
+            for user_id, email in conn.execute(
+                f"SELECT id, email FROM users WHERE email IN ({','.join('?' * len(parte))})", parte
+            ):
+                mapa[email] = user_id
+
+        return mapa
+
+    def _gravar_lote(self, conn: sqlite3.Connection, events: Sequence[EventRow], sessions: Sequence[SessionRow]) -> None:
+        usuarios = self._resolver_usuarios(
+            conn, [(r[0], r[1]) for r in events] + [(r[1], r[2]) for r in sessions]
+        )
+
+        def usuario(user_uuid, user_email):
+            return usuarios.get(user_uuid) or usuarios.get(user_email)
+
+        if events:
+            linhas = [
+                (usuario(u, e), event_type, meta, _epoch(created_at))
+                for u, e, event_type, meta, created_at in events
+            ]
+            conn.executemany(
+                "INSERT INTO events (user_id, event_type, meta, created_at) VALUES (?, ?, ?, ?)", linhas
+            )
+
+            diario, horario, por_usuario = Counter(), Counter(), Counter()
+            for user_id, event_type, _, created_at in linhas:
+                hora = int(created_at // 3600 * 3600)
+                diario[(_utc(created_at).date().isoformat(), event_type)] += 1
+                horario[(hora, event_type)] += 1
+                if user_id is not None:
+                    por_usuario[(user_id, hora, event_type)] += 1
+
+            conn.executemany(UPSERT_DAILY_SQL, [(*k, n) for k, n in sorted(diario.items())])
+            conn.executemany(UPSERT_HOURLY_SQL, [(*k, n) for k, n in sorted(horario.items())])
+            conn.executemany(UPSERT_USER_HOURLY_SQL, [(*k, n) for k, n in sorted(por_usuario.items())])
+
+        if sessions:
+            conn.executemany(
+                "INSERT INTO sessions (id, user_id, ip, user_agent, started_at, last_active) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (str(sid), usuario(u, e), ip, ua, _epoch(created_at), _epoch(created_at))
+                    for sid, u, e, ip, ua, created_at in sessions
+                ],
+            )
+
+    @db_timed("insert_batch")
+    async def insert_batch(self, events: Sequence[EventRow], sessions: Sequence[SessionRow]) -> None:
+        await self._write(self._gravar_lote, events, sessions)
+
+    # --- presença ---
+    @db_timed("update_last_active")
+    async def update_last_active(self, last_active: Dict[uuid.UUID, datetime]) -> None:
+        linhas = [(_epoch(t), str(sid), _epoch(t)) for sid, t in last_active.items()]
+        await self._write(lambda conn: conn.executemany(
+            "UPDATE sessions SET last_active = ? WHERE id = ? AND last_active < ?", linhas
+        ))
+
+    @db_timed("active_sessions")
+    async def active_sessions(self, window: float) -> List[Tuple[uuid.UUID, datetime]]:
+        rows = await self._read(lambda conn: conn.execute(
+            "SELECT id, last_active FROM sessions WHERE last_active > ? ORDER BY last_active",
+            (time.time() - window,),
+        ).fetchall())
+        return [(uuid.UUID(sid), _utc(t)) for sid, t in rows]
+
+    # --- analytics ---
+    @db_timed("admin_counts")
+    async def admin_counts(self) -> Dict[str, Any]:
+        hoje = datetime.now(timezone.utc).date().isoformat()
+
+        def consulta(conn):
+            visits = conn.execute(
+                "SELECT coalesce(sum(count), 0) FROM event_counts_daily "
+                "WHERE day = ? AND substr(event_type, 1, 5) = 'page:'",
+                (hoje,),
+            ).fetchone()[0]
+            users = conn.execute("SELECT count(*) FROM users").fetchone()[0]
+            per_event = conn.execute(
+                "SELECT event_type, sum(count) AS c FROM event_counts_daily "
+                "GROUP BY event_type ORDER BY c DESC"
+            ).fetchall()
+            return visits, users, per_event
+
+        visits, users, per_event = await self._read(consulta)
+        return {
+            "visits_today": visits,
+            "users_total": users,
+            "per_event": [{"event_type": t, "count": c} for t, c in per_event],
+        }
+
+    @db_timed("timeseries_counts")
+    async def timeseries_counts(
+        self,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        event_types: Optional[List[str]],
+        prefix: Optional[str],
+        user_id: Optional[uuid.UUID],
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[datetime, str, int]]:
+        filtros, args = [], []
+        if user_id is not None:
+            tabela, coluna = "event_counts_user_hourly", "bucket"
+            filtros.append("user_id = ?")
+            args.append(str(user_id))
+        elif interval == "hour":
+            tabela, coluna = "event_counts_hourly", "bucket"
+        else:
+            tabela, coluna = "event_counts_daily", "day"
+
+        if coluna == "day":
+            args += [start.astimezone(timezone.utc).date().isoformat(), end.astimezone(timezone.utc).date().isoformat()]
+        else:
+            args += [int(_epoch(start)), int(_epoch(end))]
+        filtros.append(f"{coluna} >= ? AND {coluna} < ?")
+
+        if event_types:
+            filtros.append(f"event_type IN ({','.join('?' * len(event_types))})")
+            args += list(event_types)
+        if prefix:
+            filtros.append("substr(event_type, 1, ?) = ?")
+            args += [len(prefix), prefix]
+
+        sql = (
+            f"SELECT {coluna}, event_type, sum(count) FROM {tabela} "
+            f"WHERE {' AND '.join(filtros)} GROUP BY {coluna}, event_type"
+        )
+        rows = await self._read(lambda conn: conn.execute(sql, args).fetchall(), timeout=timeout)
+
+        # Agrega para o intervalo pedido (o SQLite não tem date_trunc)
+        contagens: Counter = Counter()
+        for base, event_type, count in rows:
+            if coluna == "day":
+                instante = datetime.fromisoformat(base).replace(tzinfo=timezone.utc)
+            else:
+                instante = _utc(base)
+            contagens[(alinhar_bucket(instante, interval), event_type)] += count
+
+        return [(t, event_type, count) for (t, event_type), count in contagens.items()]
+
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
@@ -12,3 +14,7 @@ class EventPayload(BaseModel):
     user_id: Optional[str] = None
     event_type: str
     meta: Optional[Dict[str, Any]] = None
+
+
+class HeartbeatPayload(BaseModel):
+    session_id: UUID
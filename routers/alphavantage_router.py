@@ -1,5 +1,7 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 from models.forex_schemas import RequestData
+from models.job_schemas import JobCreated
+from services.jobs_service import job_manager
 from services.alphavantage_service import run_extraction, run_analysis
 
 router = APIRouter(
@@ -8,13 +10,13 @@ router = APIRouter(
 )
 
 
-@router.post("/extract")
-async def av_extract(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_extraction, data)
-    return {"message": "Extração AlphaVantage iniciada."}
+@router.post("/extract", response_model=JobCreated)
+async def av_extract(data: RequestData):
+    job = job_manager.submit("alphavantage_extraction", run_extraction, data)
+    return {"message": "Extração AlphaVantage iniciada.", "job_id": job.id}
 
 
-@router.post("/analysis")
-async def av_analysis(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_analysis, data)
-    return {"message": f"Análise AlphaVantage iniciada para {data.assets[0]}."}
+@router.post("/analysis", response_model=JobCreated)
+async def av_analysis(data: RequestData):
+    job = job_manager.submit("alphavantage_analysis", run_analysis, data)
+    return {"message": f"Análise AlphaVantage iniciada para {', '.join(data.assets)}.", "job_id": job.id}
@@ -1,12 +1,50 @@
-from fastapi import APIRouter
-from services.analytics_service import admin_stats
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.analytics_schemas import AdminStats, Timeseries
+from models.db import get_db
+from services.analytics_service import admin_stats, timeseries
 
 router = APIRouter(
     prefix="/api/v1/analytics",
-    tags=["Analytics"]
+    tags=["Analytics"],
+    # Uma conexão do pool por requisição, reaproveitada pelo storage
+    dependencies=[Depends(get_db)],
 )
 
 
-@router.get("/admin/stats")
+@router.get("/admin/stats", response_model=AdminStats)
 async def stats_admin():
     return await admin_stats()
+
+
+@router.get("/timeseries", response_model=Timeseries)
+async def get_timeseries(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    interval: Literal["hour", "day", "week"] | None = None,
+    event_type: List[str] | None = Query(None),
+    prefix: str | None = None,
+    user_id: UUID | None = None,
+):
+    """
+    Eventos por hora/dia/semana (UTC). Sem datas: últimos 7 dias.
+    Períodos longos sobem de intervalo automaticamente (veja "interval" na resposta).
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start deve ser anterior a end.")
+
+    try:
+        return await timeseries(start, end, interval, event_type, prefix, user_id)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Consulta excedeu o tempo limite.")
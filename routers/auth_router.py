@@ -1,52 +1,36 @@
-from datetime import timedelta
-from fastapi import APIRouter, HTTPException
-import bcrypt
+from fastapi import APIRouter, HTTPException, Response
 
-from models.db import get_sync_conn
-from core.security import create_access_token
+from core.security import HashBusy
+from services.auth_service import authenticate, server_timing
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# Sem Depends(get_db): a conexão ficaria presa durante o bcrypt (~250ms);
+# o storage empresta uma só para a consulta do usuário
 @router.post("/login")
-def login(payload: dict):
+async def login(payload: dict, response: Response):
     email = payload.get("email")
     password = payload.get("password")
 
     if not email or not password:
         raise HTTPException(status_code=400, detail="Dados inválidos")
 
-    conn = get_sync_conn()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT id, email, password_hash, role FROM users WHERE email = %s",
-        (email,)
-    )
-    user = cursor.fetchone()
-    conn.close()
-
-    if not user or not bcrypt.checkpw(
-        password.encode("utf-8"),
-        user[2].encode("utf-8")
-    ):
+    try:
+        result, timings = await authenticate(email, password)
+    except HashBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Muitos logins simultâneos, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+
+    # Sem Server-Timing no 401: as etapas presentes diriam se o email existe
+    if result is None:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
 
-    token = create_access_token(
-        {
-            "sub": str(user[0]),
-            "email": user[1],
-            "role": user[3],
-        },
-        expires_delta=timedelta(hours=8),
-    )
-
+    response.headers["Server-Timing"] = server_timing(timings)
     return {
-        "access_token": token,
+        "access_token": result["access_token"],
         "token_type": "bearer",
-        "user": {
-            "id": user[0],
-            "email": user[1],
-            "role": user[3],
-        },
+        "user": result["user"],
     }
-
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 from models.forex_schemas import RequestData
+from models.job_schemas import JobCreated
+from services.jobs_service import job_manager
 from services.binance_service import run_extraction, run_analysis
 
 router = APIRouter(
@@ -8,13 +10,13 @@ router = APIRouter(
 )
 
 
-@router.post("/download-data")
-async def download_binance(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_extraction, data)
-    return {"message": f"Extração para {len(data.assets)} ativo(s) iniciada."}
+@router.post("/download-data", response_model=JobCreated)
+async def download_binance(data: RequestData):
+    job = job_manager.submit("binance_extraction", run_extraction, data)
+    return {"message": f"Extração para {len(data.assets)} ativo(s) iniciada.", "job_id": job.id}
 
 
-@router.post("/analysis")
-async def analysis_binance(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_analysis, data)
-    return {"message": f"Análise iniciada para {data.assets[0]}."}
+@router.post("/analysis", response_model=JobCreated)
+async def analysis_binance(data: RequestData):
+    job = job_manager.submit("binance_analysis", run_analysis, data)
+    return {"message": f"Análise iniciada para {', '.join(data.assets)}.", "job_id": job.id}
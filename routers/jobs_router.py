@@ -0,0 +1,30 @@
+from typing import List
+from fastapi import APIRouter, HTTPException
+from models.job_schemas import JobInfo
+from services.jobs_service import job_manager
+
+router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["Jobs"]
+)
+
+
+@router.get("/", response_model=List[JobInfo])
+def list_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return job.to_dict()
+
+
+@router.delete("/{job_id}", response_model=JobInfo)
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return job.to_dict()
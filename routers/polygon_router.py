@@ -1,5 +1,7 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 from models.forex_schemas import RequestData
+from models.job_schemas import JobCreated
+from services.jobs_service import job_manager
 from services.polygon_service import run_extraction, run_analysis
 
 router = APIRouter(
@@ -8,13 +10,13 @@ router = APIRouter(
 )
 
 
-@router.post("/extract")
-async def polygon_extract(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_extraction, data)
-    return {"message": f"Extração Polygon iniciada para {len(data.assets)} ativos."}
+@router.post("/extract", response_model=JobCreated)
+async def polygon_extract(data: RequestData):
+    job = job_manager.submit("polygon_extraction", run_extraction, data)
+    return {"message": f"Extração Polygon iniciada para {len(data.assets)} ativos.", "job_id": job.id}
 
 
-@router.post("/analysis")
-async def polygon_analysis(data: RequestData, bg: BackgroundTasks):
-    bg.add_task(run_analysis, data)
-    return {"message": f"Análise Polygon iniciada para {data.assets[0]}."}
+@router.post("/analysis", response_model=JobCreated)
+async def polygon_analysis(data: RequestData):
+    job = job_manager.submit("polygon_analysis", run_analysis, data)
+    return {"message": f"Análise Polygon iniciada para {', '.join(data.assets)}.", "job_id": job.id}
@@ -1,7 +1,8 @@
 import os
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import FileResponse
-from services.reports_service import list_reports
+from models.report_schemas import ReportList
+from services.reports_service import REPORTS_DIR, get_report, list_reports, query_reports
 
 router = APIRouter(
     prefix="/api/v1/reports",
@@ -9,16 +10,45 @@ router = APIRouter(
 )
 
 
-@router.get("/")
-def get_reports():
-    return {"files": list_reports()}
+@router.get("/", response_model=ReportList)
+def get_reports(
+    page: int = 1,
+    page_size: int = 50,
+    provider: str | None = None,
+    kind: str | None = None,
+    asset: str | None = None,
+    all_files: bool = False,
+):
+    """
+    Catálogo paginado e filtrado em "items". "files" traz os nomes da mesma
+    página; com all_files=true, todos os ZIPs (formato antigo, sem paginação).
+    """
+    result = query_reports(page, page_size, provider, kind, asset)
+    if all_files:
+        result["files"] = list_reports()
+    else:
+        result["files"] = [item["filename"] for item in result["items"]]
+    return result
 
 
 @router.get("/{filename}")
-def download_file(filename: str):
-    path = os.path.join("reports", filename)
+def download_file(filename: str, request: Request):
+    if os.path.basename(filename) != filename or not filename.endswith(".zip"):
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado.")
 
-    if not os.path.exists(path):
+    report = get_report(filename)
+    if report is None:
         raise HTTPException(status_code=404, detail="Arquivo não encontrado.")
 
-    return FileResponse(path, filename=filename, media_type="application/zip")
+    etag = f'"{report["sha256"]}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # FileResponse trata Range / If-Range (206 Partial Content) usando este ETag
+    return FileResponse(
+        os.path.join(REPORTS_DIR, filename),
+        filename=filename,
+        media_type="application/zip",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"},
+    )
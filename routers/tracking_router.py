@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
-from models.tracking_schemas import SessionPayload, EventPayload
+from models.tracking_schemas import SessionPayload, EventPayload, HeartbeatPayload
+from services.presence_service import presence
 from services.tracking_service import track_session, track_event
 
 router = APIRouter(
@@ -9,14 +10,21 @@ router = APIRouter(
 
 
 @router.post("/session")
-def session_track(data: SessionPayload, request: Request):
-    email = data.user_id
+async def session_track(data: SessionPayload, request: Request):
     ip = data.ip or request.client.host
-    track_session(email, ip)
-    return {"ok": True}
+    user_agent = data.user_agent or request.headers.get("user-agent")
+    session_id, accepted = await track_session(data.user_id, ip, user_agent)
+    return {"ok": True, "accepted": accepted, "session_id": session_id}
+
+
+@router.post("/heartbeat")
+async def heartbeat(data: HeartbeatPayload):
+    # Sessão desconhecida/expirada: accepted=False (o cliente abre outra)
+    accepted = presence.touch(data.session_id)
+    return {"ok": True, "accepted": accepted}
 
 
 @router.post("/event")
-def event_track(data: EventPayload):
-    track_event(data.user_id, data.event_type)
-    return {"ok": True}
+async def event_track(data: EventPayload):
+    accepted = await track_event(data.user_id, data.event_type, data.meta)
+    return {"ok": True, "accepted": accepted}
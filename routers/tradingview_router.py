@@ -1,6 +1,6 @@
 from fastapi import APIRouter
-from models.forex_schemas import TVForexQuery
-from services.tradingview_service import search_forex, get_forex_summary
+from models.forex_schemas import TVForexBatchQuery, TVForexQuery
+from services.tradingview_service import get_forex_batch, get_forex_summary, search_forex
 
 router = APIRouter(
     prefix="/api/v1/tradingview",
@@ -16,3 +16,13 @@ def tv_search(q: str):
 @router.post("/forex/summary")
 def tv_summary(data: TVForexQuery):
     return get_forex_summary(data)
+
+
+@router.post("/forex/batch")
+def tv_batch(data: TVForexBatchQuery):
+    """
+    Vários pares × intervalos numa chamada. Resposta colunar: cada chave de
+    "columns" é uma lista com uma posição por linha; símbolos que falharem
+    vão em "errors" sem derrubar o lote.
+    """
+    return get_forex_batch(data)
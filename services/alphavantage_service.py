@@ -1,55 +1,68 @@
-import io
 import os
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
 from alpha_vantage.foreignexchange import ForeignExchange
 from core.config import settings
+from core.metrics import track_upstream
 from models.forex_schemas import RequestData
-from utils.gatilho_4e9 import analisar_tecnica_gatilho_universal
+from services.analysis_service import run_multi_asset_analysis
+from services.av_history_service import av_history
+from services.jobs_service import NULL_JOB, JobContext
+from services.provider_clients import provider_clients
+from services.reports_service import register_report, write_csv_to_zip
+from utils.candles import normalizar_alphavantage
+from utils.concurrency import RateLimiter, executar_em_paralelo
+from utils.date_utils import parse_date
 
 
-API_KEY = settings.ALPHA_VANTAGE_API_KEY
 REPORTS_DIR = "reports"
 
+av_limiter = RateLimiter(settings.ALPHA_VANTAGE_CALLS_PER_MINUTE)
+
+
+# Intervalos do extrator -> intervalos da Alpha Vantage ("D" usa FX_DAILY)
+AV_INTERVAL_MAP = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min"}
+
+
+def _baixar_serie(fx: ForeignExchange, from_symbol: str, to_symbol: str, interval: str, outputsize: str) -> pd.DataFrame:
+    av_limiter.acquire()
+    if interval == "D":
+        with track_upstream("alphavantage", "fx_daily"):
+            data, _ = fx.get_currency_exchange_daily(from_symbol, to_symbol, outputsize=outputsize)
+    else:
+        with track_upstream("alphavantage", "fx_intraday"):
+            data, _ = fx.get_currency_exchange_intraday(
+                from_symbol, to_symbol, interval=AV_INTERVAL_MAP[interval], outputsize=outputsize
+            )
+
+    return normalizar_alphavantage(data)
+
 
 # ---------------------------------------------------------
 # FUNÇÃO ORIGINAL: fetch de Alpha Vantage
 # ---------------------------------------------------------
-def fetch_av(asset: str, interval: str) -> pd.DataFrame:
-    if not API_KEY:
-        raise Exception("ALPHA_VANTAGE_API_KEY não configurada.")
+def fetch_av(asset: str, interval: str, start: str, end: str) -> pd.DataFrame:
+    fx = provider_clients.alphavantage()
 
     if len(asset) != 6:
         return pd.DataFrame()
 
-    fx = ForeignExchange(key=API_KEY, output_format="pandas")
-
     from_symbol = asset[:3].upper()
     to_symbol = asset[3:].upper()
 
     try:
-        if interval == "D":
-            data, _ = fx.get_fx_daily(from_symbol, to_symbol, outputsize="full")
-        else:
-            data, _ = fx.get_fx_intraday(
-                from_symbol, to_symbol, interval=interval, outputsize="full"
-            )
+        inicio = parse_date(start)
+        fim = datetime.combine(parse_date(end).date() + timedelta(days=1), datetime.min.time())
 
-        df = data.copy()
-        df.rename(columns={
-            "1. open": "Open",
-            "2. high": "High",
-            "3. low": "Low",
-            "4. close": "Close",
-            "5. volume": "Volume",
-        }, inplace=True)
+        df = av_history.carregar(
+            asset, interval, inicio, fim,
+            lambda outputsize: _baixar_serie(fx, from_symbol, to_symbol, interval, outputsize),
+        )
+        if df.empty:
+            return pd.DataFrame()
 
-        df.index.name = "Open_Time"
-        df.reset_index(inplace=True)
-        df["Resultado"] = df.apply(lambda r: "Call" if r["Close"] >= r["Open"] else "Put", axis=1)
-
-        return df[["Open_Time", "Open", "High", "Low", "Close", "Volume", "Resultado"]]
+        return df
 
     except Exception as e:
         print("Erro AlphaVantage:", e)
@@ -57,52 +70,47 @@ def fetch_av(asset: str, interval: str) -> pd.DataFrame:
 
 
 # ---------------------------------------------------------
-def run_extraction(data: RequestData):
+def run_extraction(data: RequestData, job: JobContext = NULL_JOB):
     os.makedirs(REPORTS_DIR, exist_ok=True)
 
     zip_filename = f"extrator_alphavantage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
     zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
 
-    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for asset in data.assets:
-            for interval in data.intervals:
-                df = fetch_av(asset, interval)
-                if df.empty:
-                    continue
-                buff = io.StringIO()
-                df.to_csv(buff, index=False)
-                zipf.writestr(f"{asset}_{interval}.csv", buff.getvalue())
-
-    print("AlphaVantage ZIP criado:", zip_filepath)
-
+    tarefas = [(asset, interval) for asset in data.assets for interval in data.intervals]
 
-# ---------------------------------------------------------
-def run_analysis(data: RequestData):
-    os.makedirs(REPORTS_DIR, exist_ok=True)
-    asset = data.assets[0]
+    def baixar(tarefa):
+        asset, interval = tarefa
+        job.check_cancelled()
+        return fetch_av(asset, interval, data.start_date, data.end_date)
 
-    df = fetch_av(asset, "1m")
-    if df.empty:
-        print("Sem dados para análise AV (provavelmente plano gratuito).")
-        return
+    rows = 0
+    job.set_stage("fetching", 0)
+    job.set_output(zip_filepath)
 
-    analise = analisar_tecnica_gatilho_universal(df)
-    if analise.empty:
-        print("Nenhuma oportunidade detectada.")
-        return
+    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for n, ((asset, interval), df) in enumerate(
+            executar_em_paralelo(tarefas, baixar, settings.ALPHA_VANTAGE_MAX_WORKERS), start=1
+        ):
+            job.check_cancelled()
+            job.set_progress(100 * n / len(tarefas))
+            if df.empty:
+                continue
+            rows += len(df)
+            job.add_candles(len(df))
+            write_csv_to_zip(zipf, f"{asset}_{interval}.csv", df)
+
+    register_report(zip_filepath, "extraction", "alphavantage", data.assets, data.intervals, rows=rows)
+    print("AlphaVantage ZIP criado:", zip_filepath)
 
-    zip_filename = f"analise_4e9_av_{asset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
 
-    stats = analise["Resultado_Final"].value_counts(normalize=True).mul(100).round(2).to_dict()
-    html = (
-        f"<html><body><h1>Análise {asset}</h1>"
-        f"<pre>{pd.Series(stats).to_string()}</pre>"
-        f"{analise.to_html(index=False)}</body></html>"
+# ---------------------------------------------------------
+def run_analysis(data: RequestData, job: JobContext = NULL_JOB):
+    run_multi_asset_analysis(
+        "av",
+        data.assets,
+        lambda asset, interval: fetch_av(asset, interval, data.start_date, data.end_date),
+        settings.ALPHA_VANTAGE_MAX_WORKERS,
+        job,
+        data.start_date,
+        data.end_date,
     )
-
-    with zipfile.ZipFile(zip_filepath, "w") as zipf:
-        zipf.writestr("resultado.csv", analise.to_csv(index=False))
-        zipf.writestr("relatorio.html", html)
-
-    print("Análise AV gerada:", zip_filepath)
@@ -0,0 +1,169 @@
+import os
+import time
+import zipfile
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from services.jobs_service import NULL_JOB, JobContext
+from services.reports_service import register_report, write_csv_to_zip
+from utils.concurrency import executar_em_paralelo
+from utils.gatilho_4e9 import analisar_tecnica_gatilho_universal
+
+
+REPORTS_DIR = "reports"
+
+# Acima disso a tabela detalhada fica só no resultado.csv (to_html é lento e pesado)
+HTML_DETAIL_MAX_ROWS = 20_000
+
+# Timeframe dos candles da análise 4e9
+ANALYSIS_INTERVAL = "1m"
+
+
+def _analisar_ativo(item: Tuple[str, pd.DataFrame]) -> Tuple[str, pd.DataFrame, float]:
+    """
+    Roda no pool de processos: devolve (ativo, análise, segundos de CPU gastos).
+    """
+    asset, df = item
+    inicio = time.perf_counter()
+    analise = analisar_tecnica_gatilho_universal(df)
+    return asset, analise, time.perf_counter() - inicio
+
+
+def _estatisticas(resultado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Percentual de cada Resultado_Final por ativo, mais a linha TOTAL.
+    """
+    por_ativo = pd.crosstab(resultado["Ativo"], resultado["Resultado_Final"], normalize="index")
+    total = resultado["Resultado_Final"].value_counts(normalize=True).rename("TOTAL").to_frame().T
+
+    stats = pd.concat([por_ativo, total]).fillna(0).mul(100).round(2)
+    contagem = resultado["Ativo"].value_counts()
+    stats.insert(0, "Gatilhos", contagem.reindex(stats.index).fillna(len(resultado)).astype(int))
+    stats.index.name = "Ativo"
+    return stats
+
+
+def _sem_repetidos(assets: List[str]) -> List[str]:
+    """
+    Ativos na ordem pedida, sem repetição (ignorando caixa e espaços: os
+    fetchers normalizam o símbolo, então "eurusd" e "EURUSD" são o mesmo).
+    """
+    vistos: Dict[str, str] = {}
+    for asset in assets:
+        vistos.setdefault(asset.strip().upper(), asset)
+    return list(vistos.values())
+
+
+def run_multi_asset_analysis(
+    provider: str,
+    assets: List[str],
+    fetch: Callable[[str, str], pd.DataFrame],
+    max_workers: int,
+    job: JobContext = NULL_JOB,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    interval: str = ANALYSIS_INTERVAL,
+) -> str | None:
+    """
+    Análise 4e9 para vários ativos: downloads concorrentes (limitados por
+    max_workers), análise de cada ativo no pool de processos e um único
+    relatório com estatísticas por ativo e agregadas.
+
+    fetch(asset, interval) baixa os candles; o mesmo `interval` vai para o
+    catálogo de relatórios.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    # Ativo repetido baixaria e analisaria duas vezes e duplicaria as linhas
+    assets = _sem_repetidos(assets)
+
+    # --- 1. Download concorrente ---
+    job.set_stage("fetching", 0)
+    candles: Dict[str, pd.DataFrame] = {}
+
+    def baixar(asset):
+        job.check_cancelled()
+        return fetch(asset, interval)
+
+    for n, (asset, df) in enumerate(executar_em_paralelo(assets, baixar, max_workers), start=1):
+        job.check_cancelled()
+        job.set_progress(50 * n / len(assets))
+        if df.empty:
+            print(f"Sem dados para análise: {asset}")
+            continue
+        job.add_candles(len(df))
+        candles[asset] = df[["Open_Time", "Resultado"]]
+
+    if not candles:
+        print(f"Nenhum dado {provider} para análise.")
+        return None
+
+    # --- 2. Análise em paralelo (processos) ---
+    job.set_stage("analyzing", 50)
+    analises: Dict[str, pd.DataFrame] = {}
+    tempo_serial = 0.0
+    inicio = time.perf_counter()
+
+    for n, (asset, analise, segundos) in enumerate(job.map_cpu(_analisar_ativo, candles.items()), start=1):
+        tempo_serial += segundos
+        job.set_progress(50 + 40 * n / len(candles))
+        if not analise.empty:
+            analises[asset] = analise
+
+    tempo_paralelo = time.perf_counter() - inicio
+
+    if not analises:
+        print("Sem gatilhos encontrados.")
+        return None
+
+    # Mantém a ordem em que os ativos foram pedidos (não a de conclusão)
+    analisados = [a for a in assets if a in analises]
+    resultado = pd.concat(
+        [analises[a].assign(Ativo=a) for a in analisados],
+        ignore_index=True,
+    )
+    resultado = resultado[["Ativo"] + [c for c in resultado.columns if c != "Ativo"]]
+    stats = _estatisticas(resultado)
+
+    speedup = tempo_serial / tempo_paralelo if tempo_paralelo > 0 else 1.0
+    desempenho = pd.Series({
+        "Ativos analisados": len(candles),
+        "Tempo serial estimado (s)": round(tempo_serial, 3),
+        "Tempo paralelo (s)": round(tempo_paralelo, 3),
+        "Speedup": round(speedup, 2),
+    })
+
+    # --- 3. Relatório único ---
+    job.set_stage("writing", 90)
+    rotulo = assets[0] if len(assets) == 1 else f"{len(assets)}_ativos"
+    zip_filename = f"analise_4e9_{provider}_{rotulo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
+
+    if len(resultado) <= HTML_DETAIL_MAX_ROWS:
+        detalhe = resultado.to_html(index=False)
+    else:
+        detalhe = f"<p>{len(resultado)} gatilhos — detalhe completo em resultado.csv</p>"
+
+    html_output = (
+        f"<html><body><h1>Relatório 4e9 {provider} — {', '.join(analisados)}</h1>"
+        f"<h2>Estatísticas (%)</h2>{stats.to_html()}"
+        f"<pre>{desempenho.to_string()}</pre>"
+        f"{detalhe}</body></html>"
+    )
+
+    job.set_output(zip_filepath)
+    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
+        write_csv_to_zip(zipf, "resultado.csv", resultado)
+        zipf.writestr("estatisticas.csv", stats.to_csv())
+        zipf.writestr("relatorio.html", html_output)
+
+    register_report(
+        zip_filepath, "analysis", provider, analisados, [interval],
+        start_date, end_date, len(resultado),
+    )
+    print(
+        f"Análise {provider} concluída: {zip_filepath} "
+        f"({len(analisados)} ativos, speedup {speedup:.2f}x)"
+    )
+    return zip_filepath
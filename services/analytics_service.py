@@ -1,61 +1,143 @@
-import asyncpg
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
 from core.config import settings
+from models.storage import storage
+from services.presence_service import presence
+from utils.date_utils import alinhar_bucket
 
 
-async def get_conn():
-    return await asyncpg.connect(settings.NEON_DATABASE_URL)
+async def validate_user(email: str, password_hash: str, checkpw_fn):
+    row = await storage.get_user_by_email(email)
+    if not row:
+        return None
 
+    ok = checkpw_fn(password_hash.encode(), row["password_hash"].encode())
+    if not ok:
+        return None
 
-async def validate_user(email: str, password_hash: str, checkpw_fn):
-    conn = await get_conn()
-    try:
-        row = await conn.fetchrow(
-            "SELECT id, email, password_hash, role FROM users WHERE email = $1",
-            email
-        )
-        if not row:
-            return None
-
-        ok = checkpw_fn(password_hash.encode(), row["password_hash"].encode())
-        if not ok:
-            return None
-
-        return {
-            "id": str(row["id"]),
-            "email": row["email"],
-            "role": row["role"],
-        }
-    finally:
-        await conn.close()
-
-
-async def admin_stats():
-    conn = await get_conn()
-
-    try:
-        active = await conn.fetchval(
-            "SELECT count(*) FROM sessions WHERE last_active > (now() - interval '15 minutes')"
-        )
-        visits = await conn.fetchval(
-            "SELECT count(*) FROM events WHERE created_at >= date_trunc('day', now()) AND event_type LIKE 'page:%'"
-        )
-        total = await conn.fetchval("SELECT count(*) FROM events")
-        tool = await conn.fetchval("SELECT count(*) FROM events WHERE event_type = 'tool_used'")
-        users_total = await conn.fetchval("SELECT count(*) FROM users")
-
-        per_event_rows = await conn.fetch(
-            "SELECT event_type, count(*) AS cnt FROM events GROUP BY event_type ORDER BY cnt DESC"
-        )
-        per_event = [{"event_type": r["event_type"], "count": r["cnt"]} for r in per_event_rows]
-
-        return {
-            "active_sessions": active,
-            "visits_today": visits,
-            "total_events": total,
-            "tool_usage": tool,
-            "users_total": users_total,
-            "per_event": per_event,
+    return {
+        "id": row["id"],
+        "email": row["email"],
+        "role": row["role"],
+    }
+
+
+# ===========================
+# 🔹 Estatísticas do painel admin
+# ===========================
+# Contadores de eventos vêm dos rollups (mantidos na ingestão, ver
+# models/storage). Sessões ativas vêm do mapa de presença em memória.
+_stats_cache: tuple[float, dict] | None = None
+_stats_lock = asyncio.Lock()
+
+
+async def _query_admin_stats() -> dict:
+    row = await storage.admin_counts()
+    per_event = row["per_event"]
+    counts = {e["event_type"]: e["count"] for e in per_event}
+
+    return {
+        "visits_today": row["visits_today"],
+        "total_events": sum(counts.values()),
+        "tool_usage": counts.get("tool_used", 0),
+        "users_total": row["users_total"],
+        "per_event": per_event,
+    }
+
+
+async def _cached_db_stats() -> dict:
+    global _stats_cache
+
+    if _stats_cache and time.monotonic() - _stats_cache[0] < settings.ADMIN_STATS_CACHE_TTL:
+        return _stats_cache[1]
+
+    async with _stats_lock:
+        if _stats_cache and time.monotonic() - _stats_cache[0] < settings.ADMIN_STATS_CACHE_TTL:
+            return _stats_cache[1]
+
+        stats = await _query_admin_stats()
+
+        _stats_cache = (time.monotonic(), stats)
+        return stats
+
+
+async def admin_stats() -> dict:
+    """
+    Estatísticas do painel. A parte que vem do banco fica em cache por
+    ADMIN_STATS_CACHE_TTL segundos (refreshes concorrentes esperam uma
+    única consulta); sessões ativas são sempre lidas da memória.
+    """
+    stats = await _cached_db_stats()
+    return {"active_sessions": presence.active_count(), **stats}
+
+
+# ===========================
+# 🔹 Séries temporais (rollups horários/diários)
+# ===========================
+TIMESERIES_INTERVALS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+def choose_interval(start: datetime, end: datetime, interval: Optional[str]) -> str:
+    """
+    Menor intervalo >= o pedido que mantém a série em até
+    TIMESERIES_MAX_POINTS pontos (downsampling de períodos longos).
+    """
+    ordem = list(TIMESERIES_INTERVALS)
+    i = ordem.index(interval) if interval else 0
+    while i < len(ordem) - 1 and (end - start) / TIMESERIES_INTERVALS[ordem[i]] > settings.TIMESERIES_MAX_POINTS:
+        i += 1
+    return ordem[i]
+
+
+async def timeseries(
+    start: datetime,
+    end: datetime,
+    interval: Optional[str] = None,
+    event_types: Optional[List[str]] = None,
+    prefix: Optional[str] = None,
+    user_id: Optional[uuid.UUID] = None,
+) -> dict:
+    """
+    Contagem de eventos por bucket (UTC) e tipo, lida só dos rollups:
+    horário para "hour" e filtros por usuário, diário para "day"/"week".
+    Buckets sem eventos voltam com 0.
+    """
+    interval = choose_interval(start, end, interval)
+    passo = TIMESERIES_INTERVALS[interval]
+
+    inicio = alinhar_bucket(start, interval)
+    fim = alinhar_bucket(end, interval)
+    if fim < end.astimezone(timezone.utc):
+        fim += passo
+
+    rows = await storage.timeseries_counts(
+        interval, inicio, fim, event_types, prefix, user_id, timeout=settings.TIMESERIES_TIMEOUT
+    )
+
+    buckets = []
+    atual = inicio
+    while atual < fim:
+        buckets.append(atual)
+        atual += passo
+
+    por_tipo: Dict[str, Dict[datetime, int]] = {}
+    for bucket, event_type, count in rows:
+        por_tipo.setdefault(event_type, {})[bucket] = count
+
+    series = [
+        {
+            "event_type": event_type,
+            "total": sum(contagens.values()),
+            "points": [{"bucket": b, "count": contagens.get(b, 0)} for b in buckets],
         }
+        for event_type, contagens in sorted(por_tipo.items())
+    ]
 
-    finally:
-        await conn.close()
+    return {"interval": interval, "start": inicio, "end": fim, "series": series}
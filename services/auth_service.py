@@ -0,0 +1,82 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.security import HashBusy, create_access_token, hash_pending, verify_password
+from models.storage import storage
+
+
+LOGIN_STAGES = ("lookup", "verify", "sign")
+
+# Hash bcrypt (custo 12, o mesmo dos usuários) de uma senha aleatória
+# descartada: email desconhecido também paga um checkpw, para que o tempo
+# de resposta não revele quais emails estão cadastrados.
+DUMMY_PASSWORD_HASH = "$2b$12$3SrEg9spm8cJzk8XqZAaWud1IOA6pb0KxF1BPjmYuI2YsQHvQo41y"
+
+_login_counts = {"ok": 0, "invalid": 0, "busy": 0}
+_stage_total = {stage: 0.0 for stage in LOGIN_STAGES}
+_stage_max = {stage: 0.0 for stage in LOGIN_STAGES}
+_stage_count = {stage: 0 for stage in LOGIN_STAGES}
+
+
+def _registrar(timings: Dict[str, float]) -> None:
+    for stage, segundos in timings.items():
+        _stage_total[stage] += segundos
+        _stage_count[stage] += 1
+        _stage_max[stage] = max(_stage_max[stage], segundos)
+
+
+async def authenticate(email: str, password: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+    """
+    Login em três etapas cronometradas (lookup, verify, sign).
+    Devolve (usuário + token, tempos em segundos); usuário None = credenciais inválidas.
+    HashBusy sobe para a rota quando o executor do bcrypt está saturado.
+    """
+    timings: Dict[str, float] = {}
+
+    inicio = time.perf_counter()
+    row = await storage.get_user_by_email(email)
+    timings["lookup"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    try:
+        ok = await verify_password(password, row["password_hash"] if row else DUMMY_PASSWORD_HASH)
+    except HashBusy:
+        _login_counts["busy"] += 1
+        raise
+    timings["verify"] = time.perf_counter() - inicio
+    ok = ok and row is not None
+
+    if not ok:
+        _registrar(timings)
+        _login_counts["invalid"] += 1
+        return None, timings
+
+    inicio = time.perf_counter()
+    user = {"id": row["id"], "email": row["email"], "role": row["role"]}
+    token = create_access_token({"sub": user["id"], "email": user["email"], "role": user["role"]})
+    timings["sign"] = time.perf_counter() - inicio
+
+    _registrar(timings)
+    _login_counts["ok"] += 1
+    return {"user": user, "access_token": token}, timings
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """
+    Cabeçalho Server-Timing (ms por etapa), visível no DevTools do navegador.
+    """
+    return ", ".join(f"{stage};dur={segundos * 1000:.1f}" for stage, segundos in timings.items())
+
+
+def login_stats() -> Dict[str, Any]:
+    return {
+        **_login_counts,
+        "hash_pending": hash_pending(),
+        "stages_ms": {
+            stage: {
+                "avg": round(1000 * _stage_total[stage] / _stage_count[stage], 3) if _stage_count[stage] else 0.0,
+                "max": round(1000 * _stage_max[stage], 3),
+            }
+            for stage in LOGIN_STAGES
+        },
+    }
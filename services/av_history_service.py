@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+
+from core.config import settings
+from utils.candles import ohlcv_vazio
+
+
+# baixar(outputsize) -> candles normalizados ("full" = histórico todo,
+# "compact" = últimos 100). Deve lançar exceção em falha de rede/API.
+HistoryDownloader = Callable[[str], pd.DataFrame]
+
+# Duração de cada intervalo (só para saber se o histórico já cobre o fim pedido)
+AV_INTERVAL_DELTA = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "30m": timedelta(minutes=30),
+    "1h": timedelta(hours=1),
+    "D": timedelta(days=1),
+}
+
+
+def _mesclar(historico: pd.DataFrame, novos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Histórico + candles novos, ordenado por Open_Time (a API devolve do mais
+    recente para o mais antigo). Em timestamps repetidos vale o dado novo:
+    o último candle pode ter sido salvo ainda aberto.
+    """
+    return (
+        pd.concat([historico, novos], ignore_index=True)
+        .drop_duplicates("Open_Time", keep="last")
+        .sort_values("Open_Time", ignore_index=True)
+    )
+
+
+class AVHistory:
+    """
+    Histórico persistido por par × intervalo da Alpha Vantage, em Arrow IPC:
+    <root>/<PAR>/<interval>.arrow
+
+    A API não aceita intervalo de datas, só "full" (tudo) ou "compact"
+    (últimos 100 candles). O histórico é semeado uma vez com "full" e depois
+    atualizado com "compact" (merge por Open_Time); pedidos que o arquivo já
+    cobre viram leitura local, sem gastar a cota de chamadas por minuto.
+    """
+
+    def __init__(self, root: str, refresh_seconds: float):
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+
+        self.local = 0
+        self.seeds = 0
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def _caminho(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), f"{interval}.arrow")
+
+    def _lock_de(self, caminho: str) -> threading.Lock:
+        # Um lock por arquivo: dois workers no mesmo par não semeiam duas vezes
+        with self._lock:
+            return self._locks.setdefault(caminho, threading.Lock())
+
+    def _ler(self, caminho: str) -> Optional[pd.DataFrame]:
+        if not os.path.exists(caminho):
+            return None
+
+        try:
+            with pa.memory_map(caminho, "r") as fonte:
+                return pa.ipc.open_file(fonte).read_all().to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            print(f"[AV HISTORY] Histórico inválido {caminho}: {e}")
+            return None
+
+    def _gravar(self, caminho: str, df: pd.DataFrame) -> None:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        tabela = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+
+        tmp = f"{caminho}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as destino:
+            with pa.ipc.new_file(destino, tabela.schema) as writer:
+                writer.write_table(tabela)
+        os.replace(tmp, caminho)
+
+    def _atualizado(self, caminho: str, historico: pd.DataFrame, interval: str, fim: datetime) -> bool:
+        if historico.empty:
+            return False
+        # Já tem o último candle do intervalo pedido
+        if historico["Open_Time"].iloc[-1] + AV_INTERVAL_DELTA[interval] >= fim:
+            return True
+        # Atualizado há pouco: o candle seguinte ainda não existe
+        return time.time() - os.path.getmtime(caminho) < self.refresh_seconds
+
+    # -----------------------------------------------------
+    # API pública
+    # -----------------------------------------------------
+    def carregar(
+        self,
+        symbol: str,
+        interval: str,
+        inicio: datetime,
+        fim: datetime,
+        baixar: HistoryDownloader,
+    ) -> pd.DataFrame:
+        """
+        Retorna os candles em [inicio, fim) a partir do histórico local,
+        semeando ("full") ou atualizando ("compact") só quando necessário.
+        """
+        if fim <= inicio:
+            return ohlcv_vazio()
+
+        caminho = self._caminho(symbol, interval)
+
+        with self._lock_de(caminho):
+            historico = self._ler(caminho)
+
+            if historico is None:
+                historico = _mesclar(ohlcv_vazio(), baixar("full"))
+                self._gravar(caminho, historico)
+                with self._lock:
+                    self.seeds += 1
+
+            elif self._atualizado(caminho, historico, interval, fim):
+                with self._lock:
+                    self.local += 1
+
+            else:
+                novos = baixar("compact")
+                # O compact não alcança o fim do histórico (buraco no meio): semeia de novo
+                if (
+                    not historico.empty
+                    and not novos.empty
+                    and novos["Open_Time"].min() > historico["Open_Time"].max() + AV_INTERVAL_DELTA[interval]
+                ):
+                    novos = baixar("full")
+                    with self._lock:
+                        self.seeds += 1
+                else:
+                    with self._lock:
+                        self.refreshes += 1
+
+                historico = _mesclar(historico, novos)
+                self._gravar(caminho, historico)
+
+        df = historico[(historico["Open_Time"] >= inicio) & (historico["Open_Time"] < fim)]
+        return df.reset_index(drop=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.local + self.seeds + self.refreshes
+            return {
+                "local": self.local,
+                "seeds": self.seeds,
+                "refreshes": self.refreshes,
+                "local_rate": round(self.local / total, 4) if total else 0.0,
+            }
+
+
+av_history = AVHistory(
+    settings.AV_HISTORY_DIR,
+    settings.AV_HISTORY_REFRESH_SECONDS,
+)
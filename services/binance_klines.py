@@ -0,0 +1,295 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+import pandas as pd
+from binance.helpers import interval_to_milliseconds
+
+from core.metrics import track_upstream
+from utils.candles import juntar_colunas, klines_para_colunas
+from utils.concurrency import RateLimiter
+
+
+KLINES_PATH = "/api/v3/klines"
+
+# Peso de um GET /api/v3/klines com limit=1000
+KLINES_PAGE_WEIGHT = 2
+KLINES_PAGE_LIMIT = 1000
+
+# Respostas que valem nova tentativa (rate limit e falhas do servidor)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 418 = IP banido por insistir depois de 429: não se tenta de novo. Sem
+# Retry-After, assume esse tempo (s) de banimento
+BAN_STATUS = 418
+BAN_PADRAO = 120.0
+
+Shard = Tuple[int, int]
+
+
+class BinanceBanido(RuntimeError):
+    """
+    A Binance baniu o IP (HTTP 418). Até `restante` segundos passarem,
+    qualquer download falha na hora, sem mandar requisição.
+    """
+
+    def __init__(self, restante: float):
+        super().__init__(f"Binance baniu o IP (418); nova tentativa em {restante:.0f}s")
+        self.restante = restante
+
+
+def _em_ms(dt: datetime) -> int:
+    return int(pd.Timestamp(dt).value // 1_000_000)
+
+
+def dividir_em_shards(inicio_ms: int, fim_ms: int, interval: str, limit: int = KLINES_PAGE_LIMIT) -> List[Shard]:
+    """
+    [inicio, fim) em fatias de `limit` candles: cada shard é uma página
+    independente. Intervalos sem duração fixa (1M) viram um único shard
+    paginado em sequência.
+
+    Os shards partem de `inicio`, não de um múltiplo do intervalo contado
+    da época: nem todo candle abre assim (o 1w abre na segunda-feira, e
+    1970-01-01 foi uma quinta). Uma janela de `limit` × intervalo contém
+    no máximo `limit` candles em qualquer alinhamento.
+    """
+    if fim_ms <= inicio_ms:
+        return []
+
+    intervalo_ms = interval_to_milliseconds(interval)
+    if not intervalo_ms:
+        return [(inicio_ms, fim_ms)]
+
+    cursor = inicio_ms
+    passo = intervalo_ms * limit
+    shards = []
+    while cursor < fim_ms:
+        shards.append((cursor, min(cursor + passo, fim_ms)))
+        cursor += passo
+    return shards
+
+
+# ===========================
+# 🔹 Fetcher assíncrono (aiohttp)
+# ===========================
+class BinanceKlineFetcher:
+    """
+    Baixa klines de [inicio, fim) em shards paralelos: o intervalo é
+    conhecido de antemão, então cada página de 1000 candles vira uma
+    requisição independente em vez de esperar a anterior terminar.
+
+    Roda num event loop próprio (thread dedicada) com uma ClientSession
+    de longa duração: os jobs, que rodam em threads, chamam `baixar()`
+    de forma síncrona e todos compartilham o mesmo pool de conexões, o
+    limite de shards em voo e o orçamento de peso (`limiter`).
+
+    429 e 5xx são repetidos (respeitando Retry-After). 418 não: o fetcher
+    inteiro fica parado pelo Retry-After e todo download nesse período
+    levanta BinanceBanido sem chamar a API, porque insistir só prolonga o
+    banimento.
+    """
+
+    def __init__(self, base_url: str, limiter: RateLimiter, concurrency: int, timeout: float, max_retries: int):
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._banido_ate = 0.0
+
+        self.requests = 0
+        self.retries = 0
+        self.shards = 0
+        self.bans = 0
+
+    # --- ciclo de vida ---
+    def _garantir_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="binance-klines", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _abrir_sessao(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+            self._semaforo = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def fechar():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        asyncio.run_coroutine_threadsafe(fechar(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # --- download ---
+    def _conferir_banimento(self) -> None:
+        restante = self._banido_ate - time.monotonic()
+        if restante > 0:
+            raise BinanceBanido(restante)
+
+    def _banir(self, retry_after: Optional[str]) -> None:
+        try:
+            segundos = float(retry_after) if retry_after else BAN_PADRAO
+        except ValueError:
+            segundos = BAN_PADRAO
+        self._banido_ate = max(self._banido_ate, time.monotonic() + segundos)
+        self.bans += 1
+        print(f"[BINANCE ERROR] IP banido (418); downloads suspensos por {segundos:.0f}s")
+
+    async def _reservar_peso(self) -> None:
+        while True:
+            espera = self.limiter.reservar(KLINES_PAGE_WEIGHT)
+            if not espera:
+                return
+            await asyncio.sleep(espera)
+
+    async def _pagina(self, symbol: str, interval: str, inicio_ms: int, fim_ms: int) -> list:
+        session = await self._abrir_sessao()
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": inicio_ms,
+            "endTime": fim_ms - 1,
+            "limit": KLINES_PAGE_LIMIT,
+        }
+
+        for tentativa in range(self.max_retries + 1):
+            await self._reservar_peso()
+            self._conferir_banimento()
+            self.requests += 1
+            with track_upstream("binance", "klines"):
+                async with session.get(self.base_url + KLINES_PATH, params=params) as resp:
+                    retry_after = resp.headers.get("Retry-After")
+                    if resp.status == BAN_STATUS:
+                        self._banir(retry_after)
+                        self._conferir_banimento()
+                    if resp.status not in RETRY_STATUS:
+                        resp.raise_for_status()
+                        return await resp.json()
+
+            if tentativa == self.max_retries:
+                raise RuntimeError(f"Binance {resp.status} após {tentativa + 1} tentativas ({symbol} {interval})")
+            self.retries += 1
+            await asyncio.sleep(float(retry_after) if retry_after else 0.5 * 2 ** tentativa)
+
+    async def _shard(self, symbol: str, interval: str, shard: Shard) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalmente uma página; pagina em sequência só se o shard tiver
+        mais candles que o limite (intervalos sem duração fixa).
+        """
+        inicio_ms, fim_ms = shard
+        partes = []
+        async with self._semaforo:
+            while inicio_ms < fim_ms:
+                pagina = await self._pagina(symbol, interval, inicio_ms, fim_ms)
+                if not pagina:
+                    break
+                partes.append(klines_para_colunas(pagina))
+                if len(pagina) < KLINES_PAGE_LIMIT:
+                    break
+                inicio_ms = pagina[-1][6] + 1
+
+        self.shards += 1
+        if not partes:
+            return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+        if len(partes) == 1:
+            return partes[0]
+        return np.concatenate([ot for ot, _ in partes]), np.concatenate([v for _, v in partes])
+
+    async def baixar_async(self, symbol: str, interval: str, inicio: datetime, fim: datetime) -> pd.DataFrame:
+        self._conferir_banimento()
+        await self._abrir_sessao()
+        shards = dividir_em_shards(_em_ms(inicio), _em_ms(fim), interval)
+        tarefas = [asyncio.ensure_future(self._shard(symbol, interval, s)) for s in shards]
+        try:
+            paginas = await asyncio.gather(*tarefas)
+        except BaseException:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            raise
+        return juntar_colunas(paginas)
+
+    def baixar(self, symbol: str, interval: str, inicio: datetime, fim: datetime) -> pd.DataFrame:
+        """
+        Versão síncrona (threads dos jobs). Lança exceção em falha, como o
+        Downloader do cache de candles espera.
+        """
+        futuro: Future = asyncio.run_coroutine_threadsafe(
+            self.baixar_async(symbol, interval, inicio, fim), self._garantir_loop()
+        )
+        return futuro.result()
+
+    async def _shard_avulso(self, symbol: str, interval: str, shard: Shard) -> Tuple[np.ndarray, np.ndarray]:
+        await self._abrir_sessao()
+        return await self._shard(symbol, interval, shard)
+
+    def iterar(self, symbol: str, interval: str, inicio: datetime, fim: datetime) -> Iterator[pd.DataFrame]:
+        """
+        As páginas de [inicio, fim) já normalizadas (OHLCV), em ordem, à
+        medida que chegam. Os shards seguintes continuam baixando em
+        paralelo, no máximo 2 × `concurrency` à frente de quem consome; se
+        o consumidor parar no meio, os que faltam são cancelados.
+        """
+        loop = self._garantir_loop()
+        shards = iter(dividir_em_shards(_em_ms(inicio), _em_ms(fim), interval))
+        pendentes: Deque[Future] = deque()
+
+        def agendar() -> None:
+            while len(pendentes) < 2 * self.concurrency:
+                shard = next(shards, None)
+                if shard is None:
+                    return
+                pendentes.append(asyncio.run_coroutine_threadsafe(
+                    self._shard_avulso(symbol, interval, shard), loop
+                ))
+
+        try:
+            agendar()
+            while pendentes:
+                pagina = pendentes.popleft().result()
+                agendar()
+                if len(pagina[0]):
+                    yield juntar_colunas([pagina])
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._loop is not None,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "retries": self.retries,
+            "shards": self.shards,
+            "bans": self.bans,
+            "banned_for": round(max(0.0, self._banido_ate - time.monotonic()), 1),
+        }
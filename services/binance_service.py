@@ -1,47 +1,58 @@
-import io
 import os
 import zipfile
 from datetime import datetime, timedelta
+from typing import Iterator
 import pandas as pd
-from binance.client import Client
+from core.config import settings
 
 from models.forex_schemas import RequestData
-from utils.gatilho_4e9 import analisar_tecnica_gatilho_universal
+from services.candle_cache_service import candle_cache
+from services.analysis_service import run_multi_asset_analysis
+from services.binance_klines import BinanceKlineFetcher
+from services.jobs_service import NULL_JOB, JobCancelled, JobContext
+from services.reports_service import register_report, write_csv_pages_to_zip
+from utils.concurrency import RateLimiter
+from utils.date_utils import parse_date
 
 
-client_binance = Client()
 REPORTS_DIR = "reports"
 
+binance_limiter = RateLimiter(settings.BINANCE_WEIGHT_PER_MINUTE)
+
+binance_fetcher = BinanceKlineFetcher(
+    settings.BINANCE_BASE_URL,
+    binance_limiter,
+    settings.BINANCE_SHARD_CONCURRENCY,
+    settings.BINANCE_TIMEOUT,
+    settings.BINANCE_MAX_RETRIES,
+)
+
+
+# -----------------------------------------------------
+# Download bruto de [inicio, fim) — lança exceção em falha
+# -----------------------------------------------------
+def _baixar_klines(asset: str, interval: str, inicio: datetime, fim: datetime) -> pd.DataFrame:
+    # Páginas em paralelo (shards), dentro do mesmo orçamento de peso
+    return binance_fetcher.baixar(asset, interval, inicio, fim)
+
 
 # -----------------------------------------------------
 # FUNÇÃO ORIGINAL: buscar dados da Binance
 # -----------------------------------------------------
 def fetch_binance_data(asset: str, interval: str, start_date_str: str, end_date_str: str) -> pd.DataFrame:
     end_dt = datetime.strptime(end_date_str, '%Y-%m-%d')
-    end_date_inclusive = (end_dt + timedelta(days=1)).strftime('%Y-%m-%d')
+    end_date_inclusive = end_dt + timedelta(days=1)
 
     try:
-        klines = client_binance.get_historical_klines(asset, interval, start_date_str, end_date_inclusive)
-        if not klines:
+        df = candle_cache.carregar(
+            "binance", asset, interval,
+            parse_date(start_date_str), end_date_inclusive,
+            lambda inicio, fim: _baixar_klines(asset, interval, inicio, fim),
+        )
+        if df.empty:
             return pd.DataFrame()
 
-        columns = [
-            'Open_Time', 'Open', 'High', 'Low', 'Close', 'Volume',
-            'Close_Time', 'Quote_Asset_Volume', 'Number_of_Trades',
-            'Taker_Buy_Base_Asset_Volume', 'Taker_Buy_Quote_Asset_Volume',
-            'Ignore'
-        ]
-
-        df = pd.DataFrame(klines, columns=columns)
-        df['Open_Time'] = pd.to_datetime(df['Open_Time'], unit='ms')
-        df = df[df['Open_Time'] < pd.to_datetime(end_date_inclusive)]
-
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, axis=1)
-
-        df['Resultado'] = df.apply(lambda row: 'Call' if row['Close'] >= row['Open'] else 'Put', axis=1)
-
-        return df[['Open_Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Resultado']]
+        return df
 
     except Exception as e:
         print(f"Erro ao buscar dados Binance ({asset}, {interval}): {e}")
@@ -49,31 +60,72 @@ def fetch_binance_data(asset: str, interval: str, start_date_str: str, end_date_
 
 
 
+# -----------------------------------------------------
+# Mesmos candles de fetch_binance_data, página a página
+# -----------------------------------------------------
+def iterar_binance_data(asset: str, interval: str, start_date_str: str, end_date_str: str) -> Iterator[pd.DataFrame]:
+    """
+    Candles em ordem, à medida que chegam (dias do cache e páginas
+    baixadas), para gravar sem montar o período inteiro em memória.
+    Lança exceção em falha.
+    """
+    end_date_inclusive = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1)
+
+    return candle_cache.iterar(
+        "binance", asset, interval,
+        parse_date(start_date_str), end_date_inclusive,
+        lambda inicio, fim: binance_fetcher.iterar(asset, interval, inicio, fim),
+    )
+
+
 # -----------------------------------------------------
 # FUNÇÃO ORIGINAL: extrator com ZIP (background)
 # -----------------------------------------------------
-def run_extraction(data: RequestData):
+def run_extraction(data: RequestData, job: JobContext = NULL_JOB):
     os.makedirs(REPORTS_DIR, exist_ok=True)
 
     zip_filename = f"extrator_binance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
     zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
 
     found = False
+    rows = 0
+    tarefas = [(asset, interval) for asset in data.assets for interval in data.intervals]
+
+    def paginas(asset, interval):
+        try:
+            for df in iterar_binance_data(asset.upper(), interval, data.start_date, data.end_date):
+                job.check_cancelled()
+                job.add_candles(len(df))
+                yield df
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # O que já foi gravado (dias completos, em ordem) fica no CSV
+            print(f"Erro ao buscar dados Binance ({asset}, {interval}): {e}")
+
+    job.set_stage("fetching", 0)
+    job.set_output(zip_filepath)
 
     with zipfile.ZipFile(zip_filepath, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for asset in data.assets:
-            for interval in data.intervals:
-                df = fetch_binance_data(asset.upper(), interval, data.start_date, data.end_date)
-                if not df.empty:
-                    found = True
-                    buff = io.StringIO()
-                    df.to_csv(buff, index=False)
-                    zip_file.writestr(f"{asset}_{interval}.csv", buff.getvalue())
+        # Uma entrada por vez: cada página entra no CSV assim que chega (os
+        # shards de cada par continuam em paralelo dentro do fetcher)
+        for n, (asset, interval) in enumerate(tarefas, start=1):
+            job.check_cancelled()
+            gravadas = write_csv_pages_to_zip(zip_file, f"{asset}_{interval}.csv", paginas(asset, interval))
+            if gravadas:
+                found = True
+                rows += gravadas
+            job.set_progress(100 * n / len(tarefas))
 
     if not found:
         os.remove(zip_filepath)
+        job.set_output(None)
         print("Nenhum dado encontrado — arquivo removido.")
     else:
+        register_report(
+            zip_filepath, "extraction", "binance", data.assets, data.intervals,
+            data.start_date, data.end_date, rows,
+        )
         print(f"ZIP salvo em: {zip_filepath}")
 
 
@@ -81,34 +133,13 @@ def run_extraction(data: RequestData):
 # -----------------------------------------------------
 # FUNÇÃO ORIGINAL: análise 4e9
 # -----------------------------------------------------
-def run_analysis(data: RequestData):
-    os.makedirs(REPORTS_DIR, exist_ok=True)
-
-    asset = data.assets[0]
-    df = fetch_binance_data(asset, '1m', data.start_date, data.end_date)
-
-    if df.empty:
-        print(f"Sem dados para análise: {asset}")
-        return
-
-    df_analise = analisar_tecnica_gatilho_universal(df)
-    if df_analise.empty:
-        print("Sem gatilhos encontrados.")
-        return
-
-    zip_filename = f"analise_4e9_binance_{asset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
-
-    stats = df_analise["Resultado_Final"].value_counts(normalize=True).mul(100).round(2).to_dict()
-
-    html_output = (
-        f"<html><body><h1>Relatório para {asset}</h1>"
-        f"<pre>{pd.Series(stats).to_string()}</pre>"
-        f"{df_analise.to_html(index=False)}</body></html>"
+def run_analysis(data: RequestData, job: JobContext = NULL_JOB):
+    run_multi_asset_analysis(
+        "binance",
+        data.assets,
+        lambda asset, interval: fetch_binance_data(asset, interval, data.start_date, data.end_date),
+        settings.BINANCE_MAX_WORKERS,
+        job,
+        data.start_date,
+        data.end_date,
     )
-
-    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr("resultado.csv", df_analise.to_csv(index=False))
-        zip_file.writestr("relatorio.html", html_output)
-
-    print(f"Análise concluída: {zip_filepath}")
@@ -0,0 +1,276 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+
+from core.config import settings
+from utils.candles import ohlcv_vazio
+
+
+# baixar(inicio, fim) -> candles em [inicio, fim). Deve lançar exceção em falha
+# de rede/API, para que um dia com erro não seja salvo como "sem dados".
+Downloader = Callable[[datetime, datetime], pd.DataFrame]
+
+# Mesma coisa em páginas: baixar(inicio, fim) -> candles em ordem de Open_Time,
+# entregues à medida que chegam
+PageDownloader = Callable[[datetime, datetime], Iterable[pd.DataFrame]]
+
+
+class CandleCache:
+    """
+    Cache local de candles em Arrow IPC, uma partição por dia:
+    <root>/<provider>/<symbol>/<interval>/<YYYY-MM-DD>.arrow
+
+    Só dias completos (anteriores a hoje em UTC) são gravados. Os arquivos são
+    lidos via memory map e o diretório é limitado por tamanho com LRU.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+
+    # -----------------------------------------------------
+    # Índice LRU (caminho -> tamanho), carregado do disco no primeiro uso
+    # -----------------------------------------------------
+    def _carregar_index(self) -> "OrderedDict[str, int]":
+        if self._index is not None:
+            return self._index
+
+        arquivos = []
+        for pasta, _, nomes in os.walk(self.root):
+            for nome in nomes:
+                if nome.endswith(".arrow"):
+                    caminho = os.path.join(pasta, nome)
+                    st = os.stat(caminho)
+                    arquivos.append((st.st_mtime, caminho, st.st_size))
+
+        arquivos.sort()
+        self._index = OrderedDict((caminho, tamanho) for _, caminho, tamanho in arquivos)
+        self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _tocar(self, caminho: str) -> None:
+        index = self._carregar_index()
+        if caminho in index:
+            index.move_to_end(caminho)
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+
+    def _registrar(self, caminho: str, tamanho: int) -> None:
+        index = self._carregar_index()
+        self._total_bytes += tamanho - index.pop(caminho, 0)
+        index[caminho] = tamanho
+
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            antigo, tamanho_antigo = index.popitem(last=False)
+            self._total_bytes -= tamanho_antigo
+            self.evictions += 1
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+    # -----------------------------------------------------
+    # Partições
+    # -----------------------------------------------------
+    def _caminho(self, provider: str, symbol: str, interval: str, dia: date) -> str:
+        return os.path.join(self.root, provider, symbol.upper(), interval, f"{dia.isoformat()}.arrow")
+
+    def _ler(self, caminho: str) -> Optional[pd.DataFrame]:
+        if not os.path.exists(caminho):
+            return None
+
+        try:
+            with pa.memory_map(caminho, "r") as fonte:
+                tabela = pa.ipc.open_file(fonte).read_all()
+            df = tabela.to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            print(f"[CANDLE CACHE] Partição inválida {caminho}: {e}")
+            return None
+
+        with self._lock:
+            self._tocar(caminho)
+        return df
+
+    def _gravar(self, caminho: str, df: pd.DataFrame) -> None:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        tabela = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+
+        tmp = f"{caminho}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as destino:
+            with pa.ipc.new_file(destino, tabela.schema) as writer:
+                writer.write_table(tabela)
+        os.replace(tmp, caminho)
+
+        with self._lock:
+            self._registrar(caminho, os.path.getsize(caminho))
+
+    # -----------------------------------------------------
+    # API pública
+    # -----------------------------------------------------
+    def _fechar_dias(
+        self,
+        provider: str,
+        symbol: str,
+        interval: str,
+        bloco: pd.DataFrame,
+        primeiro: date,
+        ultimo: date,
+        hoje: date,
+    ) -> pd.DataFrame:
+        """
+        Grava as partições dos dias [primeiro, ultimo] (só os anteriores a
+        hoje; dia sem candle vira partição vazia) e devolve o bloco.
+        """
+        dia_candle = bloco["Open_Time"].dt.date
+        dia = primeiro
+        while dia <= ultimo and dia < hoje:
+            self._gravar(self._caminho(provider, symbol, interval, dia), bloco[dia_candle == dia])
+            dia += timedelta(days=1)
+        return bloco
+
+    def _baixar_dias(
+        self,
+        provider: str,
+        symbol: str,
+        interval: str,
+        dia_ini: date,
+        dia_fim: date,
+        baixar_paginas: PageDownloader,
+        hoje: date,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Baixa [dia_ini, dia_fim] página a página. Um dia é gravado e
+        entregue assim que chega uma página de um dia posterior (as páginas
+        vêm em ordem), então só o dia em aberto fica em memória.
+        """
+        pendente: List[pd.DataFrame] = []
+        dia = dia_ini
+
+        paginas = baixar_paginas(
+            datetime.combine(dia_ini, datetime.min.time()),
+            datetime.combine(dia_fim + timedelta(days=1), datetime.min.time()),
+        )
+        for pagina in paginas:
+            if pagina is None or pagina.empty:
+                continue
+            pendente.append(pagina)
+
+            dia_pagina = pagina["Open_Time"].max().date()
+            if dia_pagina > dia:
+                bloco = pd.concat(pendente, ignore_index=True)
+                completo = bloco["Open_Time"].dt.date < dia_pagina
+                yield self._fechar_dias(
+                    provider, symbol, interval, bloco[completo], dia, dia_pagina - timedelta(days=1), hoje
+                )
+                pendente = [bloco[~completo]]
+                dia = dia_pagina
+
+        bloco = pd.concat(pendente, ignore_index=True) if pendente else ohlcv_vazio()
+        yield self._fechar_dias(provider, symbol, interval, bloco, dia, dia_fim, hoje)
+
+    def iterar(
+        self,
+        provider: str,
+        symbol: str,
+        interval: str,
+        inicio: datetime,
+        fim: datetime,
+        baixar_paginas: PageDownloader,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Os candles de [inicio, fim) em pedaços, em ordem: dias do cache são
+        lidos um a um e os que faltam são baixados página a página, gravados
+        e entregues sem esperar o intervalo inteiro.
+        """
+        if fim <= inicio:
+            return
+
+        hoje = datetime.utcnow().date()
+        primeiro = inicio.date()
+        ultimo = (fim - timedelta(microseconds=1)).date()
+        dias = [primeiro + timedelta(days=n) for n in range((ultimo - primeiro).days + 1)]
+
+        def recortar(partes: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+            for df in partes:
+                df = df[(df["Open_Time"] >= inicio) & (df["Open_Time"] < fim)]
+                if not df.empty:
+                    yield df.reset_index(drop=True)
+
+        # Dias sem partição se acumulam até o próximo dia em cache (ou o fim)
+        # e são baixados como um intervalo contíguo
+        faltando: List[date] = []
+        for dia in dias + [None]:
+            df = None
+            if dia is not None:
+                if dia < hoje:
+                    df = self._ler(self._caminho(provider, symbol, interval, dia))
+                if df is None:
+                    faltando.append(dia)
+                    continue
+
+            if faltando:
+                with self._lock:
+                    self.misses += len(faltando)
+                yield from recortar(self._baixar_dias(
+                    provider, symbol, interval, faltando[0], faltando[-1], baixar_paginas, hoje
+                ))
+                faltando = []
+
+            if df is not None:
+                with self._lock:
+                    self.hits += 1
+                yield from recortar([df])
+
+    def carregar(
+        self,
+        provider: str,
+        symbol: str,
+        interval: str,
+        inicio: datetime,
+        fim: datetime,
+        baixar: Downloader,
+    ) -> pd.DataFrame:
+        """
+        Retorna os candles em [inicio, fim), lendo do cache os dias já salvos
+        e baixando apenas os intervalos de dias que faltam.
+        """
+        partes = list(self.iterar(provider, symbol, interval, inicio, fim, lambda i, f: [baixar(i, f)]))
+        if not partes:
+            return ohlcv_vazio()
+        return pd.concat(partes, ignore_index=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._carregar_index()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "partitions": len(self._index),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+candle_cache = CandleCache(
+    settings.CANDLE_CACHE_DIR,
+    settings.CANDLE_CACHE_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,275 @@
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import HTTPException
+
+from core.config import settings
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ===========================
+# 🔹 Contexto de execução
+# ===========================
+class JobContext:
+    """
+    Interface que os serviços usam para reportar progresso.
+    A implementação base não faz nada: chamadas diretas (sem job) continuam
+    funcionando igual.
+    """
+
+    def set_stage(self, stage: str, percent: Optional[float] = None) -> None:
+        pass
+
+    def set_progress(self, percent: float) -> None:
+        pass
+
+    def add_candles(self, n: int) -> None:
+        pass
+
+    def set_output(self, path: Optional[str]) -> None:
+        pass
+
+    def check_cancelled(self) -> None:
+        pass
+
+    def map_cpu(self, fn: Callable, items: Iterable) -> Iterator:
+        for item in items:
+            yield fn(item)
+
+
+NULL_JOB = JobContext()
+
+
+class Job(JobContext):
+    def __init__(self, manager: "JobManager", kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.stage = "queued"
+        self.percent = 0.0
+        self.candles_fetched = 0
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+        self._manager = manager
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+
+    # --- JobContext ---
+    def set_stage(self, stage: str, percent: Optional[float] = None) -> None:
+        with self._lock:
+            self.stage = stage
+            if percent is not None:
+                self.percent = round(float(percent), 2)
+
+    def set_progress(self, percent: float) -> None:
+        with self._lock:
+            self.percent = round(min(max(float(percent), 0.0), 100.0), 2)
+
+    def add_candles(self, n: int) -> None:
+        with self._lock:
+            self.candles_fetched += int(n)
+
+    def set_output(self, path: Optional[str]) -> None:
+        with self._lock:
+            self.output_path = path
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def map_cpu(self, fn: Callable, items: Iterable) -> Iterator:
+        """
+        Executa fn(item) no pool de processos e devolve os resultados na
+        ordem em que terminam.
+        """
+        self.check_cancelled()
+        futures = [self._manager.process_pool().submit(fn, item) for item in items]
+        try:
+            for future in as_completed(futures):
+                self.check_cancelled()
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    # --- estado ---
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "percent": self.percent,
+                "candles_fetched": self.candles_fetched,
+                "filename": os.path.basename(self.output_path) if self.output_path else None,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+# ===========================
+# 🔹 Gerenciador
+# ===========================
+class JobManager:
+    """
+    Executa jobs longos num pool limitado a JOBS_MAX_CONCURRENT (o excedente
+    fica na fila), com etapas pesadas de CPU num pool de processos.
+
+    A fila guarda no máximo JOBS_MAX_PENDING jobs esperando vaga; além
+    disso submit() responde 503 com Retry-After em vez de acumular jobs
+    (e os DataFrames que eles carregam) sem limite.
+    """
+
+    def __init__(self, max_concurrent: int, process_workers: int, history: int, max_pending: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.process_workers = max(1, process_workers)
+        self.history = history
+        self.max_pending = max(0, max_pending)
+        self.rejected = 0
+
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="job")
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._processes
+
+    def submit(self, kind: str, fn: Callable, *args) -> Job:
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Fila de jobs cheia ({pending} aguardando), tente novamente",
+                    headers={"Retry-After": str(settings.JOBS_RETRY_AFTER)},
+                )
+            job = Job(self, kind)
+            self._jobs[job.id] = job
+            self._prune()
+
+        job._future = self._threads.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args: tuple) -> None:
+        if job._cancel.is_set():
+            with job._lock:
+                job.status = "cancelled"
+                job.finished_at = datetime.utcnow()
+            return
+
+        with job._lock:
+            job.status = "running"
+            job.stage = "starting"
+            job.started_at = datetime.utcnow()
+
+        try:
+            fn(*args, job=job)
+            with job._lock:
+                job.status = "done"
+                job.stage = "done"
+                job.percent = 100.0
+
+        except JobCancelled:
+            self._discard_output(job)
+            with job._lock:
+                job.status = "cancelled"
+
+        except Exception as e:
+            print(f"[JOB ERROR] {job.kind} {job.id}: {e}")
+            self._discard_output(job)
+            with job._lock:
+                job.status = "failed"
+                job.error = str(e)
+
+        finally:
+            with job._lock:
+                job.finished_at = datetime.utcnow()
+
+    @staticmethod
+    def _discard_output(job: Job) -> None:
+        if job.output_path and os.path.exists(job.output_path):
+            try:
+                os.remove(job.output_path)
+            except OSError:
+                pass
+        job.set_output(None)
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(finished) - self.history
+        if excess > 0:
+            finished.sort(key=lambda j: j.finished_at or j.created_at)
+            for job in finished[:excess]:
+                self._jobs.pop(job.id, None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            # Ainda estava na fila
+            with job._lock:
+                job.status = "cancelled"
+                job.finished_at = datetime.utcnow()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            status = [j.status for j in self._jobs.values()]
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": status.count("running"),
+            "queued": status.count("queued"),
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        for job in self.list():
+            job._cancel.set()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+job_manager = JobManager(
+    settings.JOBS_MAX_CONCURRENT,
+    settings.JOBS_PROCESS_WORKERS or os.cpu_count() or 1,
+    settings.JOBS_HISTORY,
+    settings.JOBS_MAX_PENDING,
+)
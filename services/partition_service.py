@@ -0,0 +1,366 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.config import settings
+from models.db import acquire
+
+
+PARTITION_UNITS = ("month", "day")
+
+ARCHIVE_BATCH_ROWS = 50_000
+
+# Só uma instância da API faz a manutenção por vez
+MAINTENANCE_LOCK_KEY = 4_900_016
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("user_id", pa.string()),
+    ("event_type", pa.string()),
+    ("meta", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+
+# ===========================
+# 🔹 Períodos e nomes
+# ===========================
+def _inicio_periodo(dia: date, unit: str) -> date:
+    return dia.replace(day=1) if unit == "month" else dia
+
+
+def _proximo_periodo(inicio: date, unit: str) -> date:
+    if unit == "day":
+        return inicio + timedelta(days=1)
+    return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _nome_particao(inicio: date, unit: str) -> str:
+    return f"events_p{inicio:%Y_%m}" if unit == "month" else f"events_p{inicio:%Y_%m_%d}"
+
+
+def _limite_utc(dia: date) -> str:
+    return f"{dia.isoformat()} 00:00:00+00"
+
+
+def _em_utc(dia: date) -> datetime:
+    return datetime(dia.year, dia.month, dia.day, tzinfo=timezone.utc)
+
+
+# ===========================
+# 🔹 Criação de partições
+# ===========================
+async def events_is_partitioned(conn: asyncpg.Connection) -> bool:
+    relkind = await conn.fetchval("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('events')")
+    return relkind == "p"
+
+
+# Limites reais de cada partição, lidos do catálogo (não do nome).
+# MINVALUE/MAXVALUE viram NULL (sem limite); a DEFAULT vem com padrao = true
+PARTITION_BOUNDS_SQL = r"""
+WITH m AS (
+  SELECT c.relname AS nome,
+         pg_get_expr(c.relpartbound, c.oid) AS expr,
+         regexp_match(pg_get_expr(c.relpartbound, c.oid), 'FROM \((.+)\) TO \((.+)\)') AS r
+  FROM pg_inherits i
+  JOIN pg_class c ON c.oid = i.inhrelid
+  WHERE i.inhparent = 'events'::regclass
+)
+SELECT nome,
+       expr = 'DEFAULT' AS padrao,
+       CASE WHEN r[1] NOT IN ('MINVALUE', 'MAXVALUE') THEN btrim(r[1], '''')::timestamptz END AS inicio,
+       CASE WHEN r[2] NOT IN ('MINVALUE', 'MAXVALUE') THEN btrim(r[2], '''')::timestamptz END AS fim
+FROM m
+ORDER BY nome
+"""
+
+
+async def partition_bounds(conn: asyncpg.Connection) -> List[Dict[str, Any]]:
+    """
+    [{"nome", "padrao", "inicio", "fim"}] de cada partição de events;
+    inicio/fim None = sem limite daquele lado.
+    """
+    return [dict(r) for r in await conn.fetch(PARTITION_BOUNDS_SQL)]
+
+
+def _sobrepoe(inicio: datetime, fim: datetime, ocupados: List[Tuple[Optional[datetime], Optional[datetime]]]) -> bool:
+    return any((a is None or a < fim) and (b is None or b > inicio) for a, b in ocupados)
+
+
+def _periodos_livres(inicio: date, proximo: date, unit: str, ocupados) -> List[Tuple[date, date, str]]:
+    """
+    O período inteiro se nenhuma partição o cobre; se cobre em parte (troca
+    de EVENTS_PARTITION_UNIT), uma partição diária para cada dia que falta.
+    """
+    if not _sobrepoe(_em_utc(inicio), _em_utc(proximo), ocupados):
+        return [(inicio, proximo, unit)]
+    if unit == "day":
+        return []
+
+    livres = []
+    dia = inicio
+    while dia < proximo:
+        seguinte = dia + timedelta(days=1)
+        if not _sobrepoe(_em_utc(dia), _em_utc(seguinte), ocupados):
+            livres.append((dia, seguinte, "day"))
+        dia = seguinte
+    return livres
+
+
+async def _criar_particao(conn: asyncpg.Connection, nome: str, inicio: date, fim: date, padrao: Optional[str]) -> int:
+    """
+    Cria a partição [inicio, fim). Com uma partição DEFAULT, eventos dela
+    nesse intervalo fariam o CREATE ... PARTITION OF falhar: a tabela é
+    criada solta, recebe esses eventos e só então é anexada, numa única
+    transação. Devolve quantos eventos saíram da DEFAULT.
+    """
+    limites = f"FOR VALUES FROM ('{_limite_utc(inicio)}') TO ('{_limite_utc(fim)}')"
+    if padrao is None:
+        await conn.execute(f'CREATE TABLE "{nome}" PARTITION OF events {limites}')
+        return 0
+
+    async with conn.transaction():
+        # Nenhum evento novo entra na DEFAULT até o ATTACH
+        await conn.execute(f'LOCK TABLE "{padrao}" IN SHARE ROW EXCLUSIVE MODE')
+        await conn.execute(f'CREATE TABLE "{nome}" (LIKE events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        # Direto na tabela solta: o trigger do rollup (em events) não dispara
+        # de novo para eventos que já foram contados
+        status = await conn.execute(
+            f"""
+            WITH movidos AS (
+              DELETE FROM "{padrao}" WHERE created_at >= $1 AND created_at < $2 RETURNING *
+            )
+            INSERT INTO "{nome}" SELECT * FROM movidos
+            """,
+            _em_utc(inicio), _em_utc(fim),
+        )
+        await conn.execute(f'ALTER TABLE events ATTACH PARTITION "{nome}" {limites}')
+
+    movidos = int(status.split()[-1])
+    if movidos:
+        print(f"[PARTITIONS] {movidos} eventos movidos de {padrao} para {nome}")
+    return movidos
+
+
+async def ensure_partitions(
+    conn: asyncpg.Connection,
+    unit: str,
+    ahead: int,
+    desde: Optional[date] = None,
+) -> List[str]:
+    """
+    Garante partições de `desde` (padrão: hoje, UTC) até `ahead` períodos
+    à frente. Devolve os nomes das partições criadas.
+
+    Confere os limites das partições existentes, não os nomes: depois de
+    trocar EVENTS_PARTITION_UNIT, o que a unidade antiga já cobre fica
+    como está e só os dias descobertos ganham partição.
+    """
+    if unit not in PARTITION_UNITS:
+        raise ValueError(f"EVENTS_PARTITION_UNIT inválido: {unit} (use {', '.join(PARTITION_UNITS)})")
+
+    hoje = datetime.now(timezone.utc).date()
+    inicio = _inicio_periodo(min(desde or hoje, hoje), unit)
+    fim = _inicio_periodo(hoje, unit)
+    for _ in range(max(ahead, 0)):
+        fim = _proximo_periodo(fim, unit)
+
+    particoes = await partition_bounds(conn)
+    nomes = {p["nome"] for p in particoes}
+    padrao = next((p["nome"] for p in particoes if p["padrao"]), None)
+    ocupados = [(p["inicio"], p["fim"]) for p in particoes if not p["padrao"]]
+    criadas = []
+
+    while inicio <= fim:
+        proximo = _proximo_periodo(inicio, unit)
+        for a, b, unidade in _periodos_livres(inicio, proximo, unit, ocupados):
+            nome = _nome_particao(a, unidade)
+            if nome in nomes:
+                print(f"[PARTITIONS ERROR] {nome} já existe com outros limites; {a}..{b} segue na partição padrão")
+                continue
+            await _criar_particao(conn, nome, a, b, padrao)
+            ocupados.append((_em_utc(a), _em_utc(b)))
+            nomes.add(nome)
+            criadas.append(nome)
+        inicio = proximo
+
+    return criadas
+
+
+# ===========================
+# 🔹 Arquivamento (Parquet)
+# ===========================
+def _gravar_lote(writer: pq.ParquetWriter, rows: List[asyncpg.Record]) -> None:
+    """
+    Converte e grava um lote fora do event loop.
+    """
+    colunas = list(zip(*rows))
+    writer.write_batch(pa.RecordBatch.from_arrays(
+        [pa.array(col, type=campo.type) for col, campo in zip(colunas, ARCHIVE_SCHEMA)],
+        schema=ARCHIVE_SCHEMA,
+    ))
+
+
+async def archive_partition(conn: asyncpg.Connection, nome: str, archive_dir: str) -> int:
+    """
+    Exporta a partição para <archive_dir>/<nome>.parquet (zstd) e só então
+    a remove (DETACH + DROP), conferindo antes que nenhuma linha chegou
+    depois da exportação. Devolve o nº de linhas arquivadas.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    parquet_path = os.path.join(archive_dir, f"{nome}.parquet")
+    tmp_path = parquet_path + ".tmp"
+    linhas = 0
+
+    try:
+        # Cursor no servidor em vez de COPY: o copy_out do asyncpg falha sobre SSL
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            cursor = await conn.cursor(
+                f'SELECT id::text, user_id::text, event_type, meta::text, created_at FROM "{nome}"'
+            )
+            with pq.ParquetWriter(tmp_path, ARCHIVE_SCHEMA, compression="zstd") as writer:
+                while True:
+                    rows = await cursor.fetch(ARCHIVE_BATCH_ROWS)
+                    if not rows:
+                        break
+                    await asyncio.to_thread(_gravar_lote, writer, rows)
+                    linhas += len(rows)
+
+        os.replace(tmp_path, parquet_path)
+
+        async with conn.transaction():
+            await conn.execute(f'LOCK TABLE "{nome}" IN ACCESS EXCLUSIVE MODE')
+            atual = await conn.fetchval(f'SELECT count(*) FROM "{nome}"')
+            if atual != linhas:
+                raise RuntimeError(f"{nome}: {linhas} linhas exportadas, {atual} na partição")
+            await conn.execute(f'ALTER TABLE events DETACH PARTITION "{nome}"')
+            await conn.execute(f'DROP TABLE "{nome}"')
+        return linhas
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def archive_expired(
+    conn: asyncpg.Connection,
+    retention_days: int,
+    archive_dir: str,
+) -> Dict[str, int]:
+    """
+    Arquiva as partições que terminam antes de hoje - retention_days.
+    O rollup event_counts_daily não muda: os totais do painel continuam
+    contando o histórico arquivado.
+    """
+    if retention_days <= 0:
+        return {}
+
+    corte = _em_utc(datetime.now(timezone.utc).date() - timedelta(days=retention_days))
+    arquivadas = {}
+
+    # Pelo limite real, não pelo nome: vale para partições mensais e diárias
+    for particao in await partition_bounds(conn):
+        if particao["padrao"] or particao["fim"] is None or particao["fim"] > corte:
+            continue
+        nome = particao["nome"]
+        arquivadas[nome] = await archive_partition(conn, nome, archive_dir)
+        print(f"[PARTITIONS] {nome} arquivada ({arquivadas[nome]} eventos)")
+
+    return arquivadas
+
+
+# ===========================
+# 🔹 Manutenção periódica
+# ===========================
+class EventPartitionManager:
+    """
+    No startup e a cada `interval` segundos: cria as partições futuras e
+    arquiva as que saíram da retenção. Um advisory lock garante que só
+    uma instância da API faça isso por vez.
+    """
+
+    def __init__(self, unit: str, ahead: int, retention_days: int, archive_dir: str, interval: float):
+        self.unit = unit
+        self.ahead = ahead
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.interval = interval
+
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.created = 0
+        self.archived_partitions = 0
+        self.archived_rows = 0
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> None:
+        try:
+            async with acquire() as conn:
+                if not await events_is_partitioned(conn):
+                    print("[PARTITIONS] events não é particionada — rode db_init.py")
+                    return
+                if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MAINTENANCE_LOCK_KEY):
+                    return
+                try:
+                    criadas = await ensure_partitions(conn, self.unit, self.ahead)
+                    arquivadas = await archive_expired(conn, self.retention_days, self.archive_dir)
+                finally:
+                    await conn.execute("SELECT pg_advisory_unlock($1)", MAINTENANCE_LOCK_KEY)
+
+            self.runs += 1
+            self.created += len(criadas)
+            self.archived_partitions += len(arquivadas)
+            self.archived_rows += sum(arquivadas.values())
+            self.last_run = datetime.now(timezone.utc)
+            self.last_error = None
+
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[PARTITIONS ERROR] {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "retention_days": self.retention_days,
+            "runs": self.runs,
+            "created": self.created,
+            "archived_partitions": self.archived_partitions,
+            "archived_rows": self.archived_rows,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+        }
+
+
+event_partitions = EventPartitionManager(
+    settings.EVENTS_PARTITION_UNIT,
+    settings.EVENTS_PARTITIONS_AHEAD,
+    settings.EVENTS_RETENTION_DAYS,
+    settings.EVENTS_ARCHIVE_DIR,
+    settings.EVENTS_MAINTENANCE_INTERVAL,
+)
@@ -1,111 +1,187 @@
-import io
+import json
 import os
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Tuple
+import numpy as np
 import pandas as pd
 from polygon import RESTClient
 from core.config import settings
+from core.metrics import track_upstream
 
 from models.forex_schemas import RequestData
-from utils.gatilho_4e9 import analisar_tecnica_gatilho_universal
+from services.candle_cache_service import candle_cache
+from services.analysis_service import run_multi_asset_analysis
+from services.jobs_service import NULL_JOB, JobContext
+from services.provider_clients import provider_clients
+from services.reports_service import register_report, write_csv_to_zip
+from utils.candles import aggs_para_colunas, juntar_colunas
+from utils.concurrency import RateLimiter, executar_em_paralelo
+from utils.date_utils import parse_date
 
 
-POLYGON_API_KEY = settings.POLYGON_API_KEY
 REPORTS_DIR = "reports"
 
 POLYGON_TIMESPAN_MAP = {"1m": "minute", "5m": "minute", "15m": "minute", "30m": "minute", "1h": "hour", "D": "day"}
 POLYGON_MULTIPLIER_MAP = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 1, "D": 1}
+# Candles por dia (forex negocia 24h)
+POLYGON_BARS_PER_DAY = {"1m": 1440, "5m": 288, "15m": 96, "30m": 48, "1h": 24, "D": 1}
 
+POLYGON_PAGE_LIMIT = 50_000
 
-# ------------------------------------------------
-def fetch_polygon(asset: str, interval: str, start: str, end: str) -> pd.DataFrame:
-    if not POLYGON_API_KEY:
-        raise Exception("POLYGON_API_KEY não configurada.")
+polygon_limiter = RateLimiter(settings.POLYGON_CALLS_PER_MINUTE)
 
-    ticker = f"C:{asset.upper()}"
-    client = RESTClient(POLYGON_API_KEY)
-
-    try:
-        multiplier = POLYGON_MULTIPLIER_MAP[interval]
-        timespan = POLYGON_TIMESPAN_MAP[interval]
 
-        aggs = client.get_aggs(
+# ------------------------------------------------
+# Janelas de dias inteiros (shards), baixadas em paralelo
+# ------------------------------------------------
+def _janelas(inicio: datetime, fim: datetime, interval: str) -> List[Tuple[datetime, datetime]]:
+    """
+    [inicio, fim) em janelas que cabem numa página (POLYGON_SHARD_BARS
+    candles): semanas inteiras quando cabe mais de uma, senão um dia.
+    Janelas maiores = menos chamadas no limite por minuto do plano.
+    """
+    dias = max(1, settings.POLYGON_SHARD_BARS // POLYGON_BARS_PER_DAY[interval])
+    if dias >= 7:
+        dias -= dias % 7
+    passo = timedelta(days=dias)
+
+    janelas = []
+    cursor = inicio
+    while cursor < fim:
+        janelas.append((cursor, min(cursor + passo, fim)))
+        cursor += passo
+    return janelas
+
+
+def _baixar_janela(
+    client: RESTClient, ticker: str, interval: str, inicio: datetime, fim: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uma janela, seguindo o next_url enquanto houver mais páginas. Cada
+    página vira colunas assim que chega (a resposta crua é descartada),
+    então a memória fica limitada ao tamanho da janela.
+    """
+    inicio_ms = int(pd.Timestamp(inicio).value // 1_000_000)
+    fim_ms = int(pd.Timestamp(fim).value // 1_000_000)
+
+    polygon_limiter.acquire()
+    with track_upstream("polygon", "aggs"):
+        resp = client.get_aggs(
             ticker=ticker,
-            multiplier=multiplier,
-            timespan=timespan,
-            from_=start,
-            to=end,
-            limit=50000
+            multiplier=POLYGON_MULTIPLIER_MAP[interval],
+            timespan=POLYGON_TIMESPAN_MAP[interval],
+            from_=inicio_ms,
+            to=fim_ms - 1,
+            sort="asc",
+            limit=POLYGON_PAGE_LIMIT,
+            raw=True,
         )
 
-        if not aggs:
-            return pd.DataFrame()
+    partes = []
+    while True:
+        corpo = json.loads(resp.data)
+        resultados = corpo.get("results") or []
+        if resultados:
+            partes.append(aggs_para_colunas(resultados))
 
-        df = pd.DataFrame(aggs)
-        df.rename(columns={
-            "open": "Open",
-            "high": "High",
-            "low": "Low",
-            "close": "Close",
-            "volume": "Volume",
-            "timestamp": "Open_Time",
-        }, inplace=True)
+        next_url = corpo.get("next_url")
+        if not next_url or not resultados:
+            break
 
-        df["Open_Time"] = pd.to_datetime(df["Open_Time"], unit="ms")
-        df["Resultado"] = df.apply(lambda r: "Call" if r["Close"] >= r["Open"] else "Put", axis=1)
+        polygon_limiter.acquire()
+        with track_upstream("polygon", "aggs_next"):
+            resp = client.client.request("GET", next_url, headers=client.headers, timeout=client.timeout)
+        if resp.status != 200:
+            raise Exception(f"Polygon {resp.status} na paginação de {ticker}: {resp.data[:200]!r}")
 
-        return df[["Open_Time", "Open", "High", "Low", "Close", "Volume", "Resultado"]]
+    if not partes:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+    return np.concatenate([t for t, _ in partes]), np.concatenate([v for _, v in partes])
 
-    except Exception as e:
-        print("Erro POLYGON:", e)
-        return pd.DataFrame()
+
+def _baixar_aggs(client: RESTClient, ticker: str, interval: str, inicio: datetime, fim: datetime) -> pd.DataFrame:
+    janelas = list(enumerate(_janelas(inicio, fim, interval)))
+    paginas: List[Tuple[np.ndarray, np.ndarray]] = [None] * len(janelas)
+
+    for (i, _), colunas in executar_em_paralelo(
+        janelas,
+        lambda tarefa: _baixar_janela(client, ticker, interval, *tarefa[1]),
+        settings.POLYGON_SHARD_WORKERS,
+    ):
+        paginas[i] = colunas
+
+    return juntar_colunas(paginas)
 
 
 # ------------------------------------------------
-def run_extraction(data: RequestData):
-    os.makedirs(REPORTS_DIR, exist_ok=True)
+def fetch_polygon(asset: str, interval: str, start: str, end: str) -> pd.DataFrame:
+    ticker = f"C:{asset.upper()}"
+    client = provider_clients.polygon()
 
-    zip_filename = f"extrator_polygon_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
+    try:
+        inicio = parse_date(start)
+        fim = datetime.combine(parse_date(end).date() + timedelta(days=1), datetime.min.time())
 
-    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for asset in data.assets:
-            for interval in data.intervals:
-                df = fetch_polygon(asset, interval, data.start_date, data.end_date)
-                if df.empty:
-                    continue
-                buff = io.StringIO()
-                df.to_csv(buff, index=False)
-                zipf.writestr(f"{asset}_{interval}.csv", buff.getvalue())
+        df = candle_cache.carregar(
+            "polygon", asset, interval, inicio, fim,
+            lambda ini, f: _baixar_aggs(client, ticker, interval, ini, f),
+        )
+        if df.empty:
+            return pd.DataFrame()
 
-    print("Extração Polygon concluída:", zip_filepath)
+        return df
+
+    except Exception as e:
+        print("Erro POLYGON:", e)
+        return pd.DataFrame()
 
 
 # ------------------------------------------------
-def run_analysis(data: RequestData):
+def run_extraction(data: RequestData, job: JobContext = NULL_JOB):
     os.makedirs(REPORTS_DIR, exist_ok=True)
-    asset = data.assets[0]
 
-    df = fetch_polygon(asset, "1m", data.start_date, data.end_date)
-    if df.empty:
-        print("Nenhum dado Polygon para análise.")
-        return
+    zip_filename = f"extrator_polygon_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
 
-    df_analise = analisar_tecnica_gatilho_universal(df)
+    tarefas = [(asset, interval) for asset in data.assets for interval in data.intervals]
 
-    zip_filename = f"analise_4e9_polygon_{asset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    zip_filepath = os.path.join(REPORTS_DIR, zip_filename)
+    def baixar(tarefa):
+        asset, interval = tarefa
+        job.check_cancelled()
+        return fetch_polygon(asset, interval, data.start_date, data.end_date)
 
-    stats = df_analise["Resultado_Final"].value_counts(normalize=True).mul(100).round(2).to_dict()
+    rows = 0
+    job.set_stage("fetching", 0)
+    job.set_output(zip_filepath)
 
-    html_output = (
-        f"<html><body><h1>Relatório {asset}</h1>"
-        f"<pre>{pd.Series(stats).to_string()}</pre>"
-        f"{df_analise.to_html(index=False)}</body></html>"
+    with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for n, ((asset, interval), df) in enumerate(
+            executar_em_paralelo(tarefas, baixar, settings.POLYGON_MAX_WORKERS), start=1
+        ):
+            job.check_cancelled()
+            job.set_progress(100 * n / len(tarefas))
+            if df.empty:
+                continue
+            rows += len(df)
+            job.add_candles(len(df))
+            write_csv_to_zip(zipf, f"{asset}_{interval}.csv", df)
+
+    register_report(
+        zip_filepath, "extraction", "polygon", data.assets, data.intervals,
+        data.start_date, data.end_date, rows,
     )
+    print("Extração Polygon concluída:", zip_filepath)
 
-    with zipfile.ZipFile(zip_filepath, "w") as zipf:
-        zipf.writestr("resultado.csv", df_analise.to_csv(index=False))
-        zipf.writestr("relatorio.html", html_output)
 
-    print("Análise Polygon concluída:", zip_filepath)
+# ------------------------------------------------
+def run_analysis(data: RequestData, job: JobContext = NULL_JOB):
+    run_multi_asset_analysis(
+        "polygon",
+        data.assets,
+        lambda asset, interval: fetch_polygon(asset, interval, data.start_date, data.end_date),
+        settings.POLYGON_MAX_WORKERS,
+        job,
+        data.start_date,
+        data.end_date,
+    )
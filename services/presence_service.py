@@ -0,0 +1,174 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from models.storage import storage
+
+
+# ===========================
+# 🔹 Presença em memória
+# ===========================
+class PresenceMap:
+    """
+    Sessões vistas nos últimos `window` segundos, em ordem de último
+    heartbeat (OrderedDict): expirar é tirar do começo, contar é len().
+
+    Os heartbeats só marcam a sessão como "suja"; a cada flush_interval
+    segundos um único UPDATE grava o último last_active de cada sessão.
+    A contagem é por processo — com vários workers, cada um vê as
+    sessões que passaram por ele.
+
+    Heartbeat só vale para sessão conhecida (aberta por track_session ou
+    carregada do banco no startup) e ainda na janela: o endpoint não tem
+    autenticação, e ids inventados não podem inflar a contagem. Sessões
+    em memória e pendentes de flush têm teto de `max_sessions`.
+    """
+
+    def __init__(self, window: float, flush_interval: float, max_sessions: int):
+        self.window = window
+        self.flush_interval = flush_interval
+        self.max_sessions = max(1, max_sessions)
+
+        self._seen: "OrderedDict[uuid.UUID, float]" = OrderedDict()
+        self._dirty: Dict[uuid.UUID, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.heartbeats = 0
+        self.rows_flushed = 0
+        self.flushes = 0
+        self.failed = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.dropped = 0
+
+    # --- heartbeats ---
+    def _lembrar(self, session_id: uuid.UUID, visto: float) -> None:
+        if session_id not in self._seen:
+            while len(self._seen) >= self.max_sessions:
+                self._seen.popitem(last=False)
+                self.evicted += 1
+        self._seen[session_id] = visto
+        self._seen.move_to_end(session_id)
+
+    def _marcar_sujo(self, session_id: uuid.UUID, visto: datetime) -> None:
+        if session_id in self._dirty or len(self._dirty) < self.max_sessions:
+            self._dirty[session_id] = visto
+        else:
+            self.dropped += 1
+
+    def open(self, session_id: uuid.UUID) -> None:
+        """
+        Sessão nova (track_session): passa a aceitar heartbeats.
+        """
+        self._expire()
+        self._lembrar(session_id, time.monotonic())
+        self._marcar_sujo(session_id, datetime.now(timezone.utc))
+        self.heartbeats += 1
+
+    def touch(self, session_id: uuid.UUID) -> bool:
+        """
+        Heartbeat de uma sessão conhecida. Id desconhecido (ou expirado)
+        é ignorado e devolve False.
+        """
+        self._expire()
+        if session_id not in self._seen:
+            self.rejected += 1
+            return False
+
+        self._lembrar(session_id, time.monotonic())
+        self._marcar_sujo(session_id, datetime.now(timezone.utc))
+        self.heartbeats += 1
+        return True
+
+    def _expire(self) -> None:
+        limite = time.monotonic() - self.window
+        while self._seen:
+            if next(iter(self._seen.values())) > limite:
+                break
+            self._seen.popitem(last=False)
+
+    def active_count(self) -> int:
+        self._expire()
+        return len(self._seen)
+
+    # --- ciclo de vida ---
+    async def start(self) -> None:
+        """
+        Recarrega do banco as sessões ativas (índice em last_active) para
+        a contagem não zerar a cada deploy, e inicia o flush periódico.
+        """
+        if self._task is not None:
+            return
+
+        try:
+            rows = await storage.active_sessions(self.window)
+            agora_wall = datetime.now(timezone.utc)
+            agora = time.monotonic()
+            # Da mais antiga para a mais recente: acima do teto, ficam as recentes
+            for session_id, last_active in rows[-self.max_sessions:]:
+                idade = (agora_wall - last_active).total_seconds()
+                self._lembrar(session_id, agora - max(idade, 0.0))
+        except Exception as e:
+            print(f"[PRESENCE] Sessões ativas não carregadas: {e}")
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+
+        lote, self._dirty = self._dirty, {}
+        try:
+            await storage.update_last_active(lote)
+            self.rows_flushed += len(lote)
+            self.flushes += 1
+
+        except Exception as e:
+            self.failed += len(lote)
+            print(f"[PRESENCE ERROR] Falha ao gravar last_active de {len(lote)} sessões: {e}")
+            # Volta para o próximo flush, sem sobrescrever heartbeats mais novos
+            for session_id, visto in lote.items():
+                if session_id not in self._dirty:
+                    self._marcar_sujo(session_id, visto)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": self.active_count(),
+            "pending": len(self._dirty),
+            "heartbeats": self.heartbeats,
+            "rows_flushed": self.rows_flushed,
+            "flushes": self.flushes,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "dropped": self.dropped,
+            "max_sessions": self.max_sessions,
+        }
+
+
+presence = PresenceMap(
+    settings.ACTIVE_SESSION_WINDOW,
+    settings.PRESENCE_FLUSH_INTERVAL,
+    settings.PRESENCE_MAX_SESSIONS,
+)
+
@@ -0,0 +1,134 @@
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from alpha_vantage.foreignexchange import ForeignExchange
+from binance.client import Client
+from polygon import RESTClient
+from requests.adapters import HTTPAdapter
+
+from core.config import settings
+
+
+def _sessao(pool_size: int) -> requests.Session:
+    """
+    Session com pool de conexões keep-alive (uma por worker em paralelo).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class _ForeignExchangeSessao(ForeignExchange):
+    """
+    ForeignExchange que faz as chamadas por uma Session compartilhada
+    (a biblioteca usa requests.get direto: nova conexão TLS a cada chamada).
+    """
+
+    def __init__(self, session: requests.Session, timeout: float, **kwargs):
+        super().__init__(**kwargs)
+        self._session = session
+        self._timeout = timeout
+
+    def _handle_api_call(self, url):
+        response = self._session.get(url, proxies=self.proxy, headers=self.headers, timeout=self._timeout)
+        json_response = response.json()
+        if not json_response:
+            raise ValueError("Error getting data from the api, no return was given.")
+        for chave in ("Error Message", "Information", "Note"):
+            if chave in json_response and (chave == "Error Message" or self.treat_info_as_error):
+                raise ValueError(json_response[chave])
+        return json_response
+
+
+# ===========================
+# 🔹 Clientes dos provedores (um por processo)
+# ===========================
+class ProviderClients:
+    """
+    Clientes HTTP de longa duração, compartilhados pelos workers dos
+    downloads: cada provedor mantém um pool de conexões keep-alive em vez
+    de abrir TCP + TLS por ativo × intervalo. Criados sob demanda (os jobs
+    rodam em threads) e fechados no shutdown da aplicação.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._binance: Optional[Client] = None
+        self._polygon: Optional[RESTClient] = None
+        self._alphavantage: Optional[_ForeignExchangeSessao] = None
+        self._tradingview: Optional[requests.Session] = None
+
+    def binance(self) -> Client:
+        with self._lock:
+            if self._binance is None:
+                client = Client(
+                    settings.BINANCE_API_KEY,
+                    settings.BINANCE_API_SECRET,
+                    requests_params={"timeout": settings.BINANCE_TIMEOUT},
+                    ping=False,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, settings.BINANCE_POOL_SIZE))
+                client.session.mount("https://", adapter)
+                self._binance = client
+            return self._binance
+
+    def polygon(self) -> RESTClient:
+        with self._lock:
+            if self._polygon is None:
+                if not settings.POLYGON_API_KEY:
+                    raise Exception("POLYGON_API_KEY não configurada.")
+                client = RESTClient(
+                    settings.POLYGON_API_KEY,
+                    connect_timeout=settings.POLYGON_TIMEOUT,
+                    read_timeout=settings.POLYGON_TIMEOUT,
+                )
+                # urllib3 guarda só 1 conexão por host por padrão: com N workers,
+                # as outras seriam descartadas (e refeitas) a cada chamada
+                client.client.connection_pool_kw["maxsize"] = max(1, settings.POLYGON_POOL_SIZE)
+                self._polygon = client
+            return self._polygon
+
+    def alphavantage(self) -> ForeignExchange:
+        with self._lock:
+            if self._alphavantage is None:
+                if not settings.ALPHA_VANTAGE_API_KEY:
+                    raise Exception("ALPHA_VANTAGE_API_KEY não configurada.")
+                self._alphavantage = _ForeignExchangeSessao(
+                    _sessao(settings.ALPHA_VANTAGE_POOL_SIZE),
+                    settings.ALPHA_VANTAGE_TIMEOUT,
+                    key=settings.ALPHA_VANTAGE_API_KEY,
+                    output_format="pandas",
+                )
+            return self._alphavantage
+
+    def tradingview(self) -> requests.Session:
+        with self._lock:
+            if self._tradingview is None:
+                self._tradingview = _sessao(settings.TV_POOL_SIZE)
+            return self._tradingview
+
+    def close(self) -> None:
+        with self._lock:
+            if self._binance is not None:
+                self._binance.close_connection()
+            if self._polygon is not None:
+                self._polygon.client.clear()
+            if self._alphavantage is not None:
+                self._alphavantage._session.close()
+            if self._tradingview is not None:
+                self._tradingview.close()
+            self._binance = self._polygon = self._alphavantage = self._tradingview = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "binance": self._binance is not None,
+            "polygon": self._polygon is not None,
+            "alphavantage": self._alphavantage is not None,
+            "tradingview": self._tradingview is not None,
+        }
+
+
+provider_clients = ProviderClients()
@@ -1,19 +1,251 @@
+import hashlib
+import io
 import os
-from typing import List
+import sqlite3
+import threading
+import zipfile
+from contextlib import closing
+from typing import Iterable, List
+
+import pandas as pd
 
 
 REPORTS_DIR = "reports"
+CSV_BATCH_ROWS = 50_000
+
+
+def write_csv_to_zip(zipf: zipfile.ZipFile, name: str, df: pd.DataFrame, batch_rows: int = CSV_BATCH_ROWS) -> None:
+    """
+    Grava o DataFrame como CSV direto na entrada do ZIP, em lotes de linhas,
+    sem montar o arquivo inteiro em memória.
+    """
+    with zipf.open(name, "w", force_zip64=True) as entry:
+        text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+        for start in range(0, max(len(df), 1), batch_rows):
+            df.iloc[start:start + batch_rows].to_csv(text, index=False, header=(start == 0))
+        text.flush()
+        text.detach()
+
+
+def write_csv_pages_to_zip(
+    zipf: zipfile.ZipFile,
+    name: str,
+    paginas: Iterable[pd.DataFrame],
+    batch_rows: int = CSV_BATCH_ROWS,
+) -> int:
+    """
+    Grava páginas (mesmas colunas, em ordem) numa única entrada CSV do ZIP
+    à medida que chegam. A entrada só é criada na primeira página não
+    vazia. Retorna o total de linhas gravadas (0 = entrada não criada).
+    """
+    rows = 0
+    entry = text = None
+    try:
+        for df in paginas:
+            if df.empty:
+                continue
+            if text is None:
+                entry = zipf.open(name, "w", force_zip64=True)
+                text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+            for start in range(0, len(df), batch_rows):
+                df.iloc[start:start + batch_rows].to_csv(text, index=False, header=(rows == 0 and start == 0))
+            rows += len(df)
+    finally:
+        if text is not None:
+            text.flush()
+            text.detach()
+            entry.close()
+    return rows
+
+
+# ===========================
+# 🔹 Catálogo (SQLite em reports/catalog.sqlite3)
+# ===========================
+CATALOG_PATH = os.path.join(REPORTS_DIR, "catalog.sqlite3")
+
+CATALOG_SQL = """
+CREATE TABLE IF NOT EXISTS reports (
+  filename text PRIMARY KEY,
+  kind text,
+  provider text,
+  assets text,
+  intervals text,
+  start_date text,
+  end_date text,
+  rows integer,
+  size integer NOT NULL,
+  sha256 text NOT NULL,
+  created_at real NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports(created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_provider ON reports(provider);
+"""
+
+_catalog_lock = threading.Lock()
+
+
+def _catalog_conn() -> sqlite3.Connection:
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(CATALOG_SQL)
+    return conn
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _infer_from_filename(filename: str) -> dict:
+    """
+    Metadados mínimos para ZIPs antigos, a partir do nome:
+    extrator_<provider>_<ts>.zip / analise_4e9_<provider>_<ativo>_<ts>.zip
+    """
+    parts = filename[:-len(".zip")].split("_")
+    if parts[0] == "extrator" and len(parts) >= 2:
+        return {"kind": "extraction", "provider": parts[1]}
+    if parts[:2] == ["analise", "4e9"] and len(parts) >= 4:
+        return {"kind": "analysis", "provider": parts[2], "assets": [parts[3]]}
+    return {}
+
+
+def register_report(
+    path: str,
+    kind: str | None = None,
+    provider: str | None = None,
+    assets: List[str] | None = None,
+    intervals: List[str] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    rows: int | None = None,
+) -> None:
+    """
+    Registra (ou atualiza) um relatório recém-gravado no catálogo.
+    """
+    try:
+        st = os.stat(path)
+        with _catalog_lock, closing(_catalog_conn()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO reports
+                  (filename, kind, provider, assets, intervals, start_date, end_date, rows, size, sha256, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    os.path.basename(path), kind, provider,
+                    ",".join(a.upper() for a in assets) if assets else None,
+                    ",".join(intervals) if intervals else None,
+                    start_date, end_date, rows,
+                    st.st_size, _sha256(path), st.st_mtime,
+                ),
+            )
+    except Exception as e:
+        print("Erro register_report:", e)
+
+
+def _sync_catalog() -> None:
+    """
+    Confere o catálogo com a pasta a cada listagem (um listdir contra os
+    nomes do índice): cataloga ZIPs que ainda não estão nele (gerados antes
+    do catálogo existir) e remove entradas cujo arquivo foi apagado.
+    """
+    on_disk = {f for f in os.listdir(REPORTS_DIR) if f.endswith(".zip")}
+    with _catalog_lock, closing(_catalog_conn()) as conn:
+        known = {r["filename"] for r in conn.execute("SELECT filename FROM reports")}
+        if known - on_disk:
+            with conn:
+                conn.executemany("DELETE FROM reports WHERE filename = ?", [(f,) for f in known - on_disk])
+
+    for filename in sorted(on_disk - known):
+        register_report(os.path.join(REPORTS_DIR, filename), **_infer_from_filename(filename))
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    item = dict(row)
+    item["assets"] = item["assets"].split(",") if item["assets"] else []
+    item["intervals"] = item["intervals"].split(",") if item["intervals"] else []
+    return item
+
+
+def query_reports(
+    page: int = 1,
+    page_size: int = 50,
+    provider: str | None = None,
+    kind: str | None = None,
+    asset: str | None = None,
+) -> dict:
+    """
+    Lista o catálogo, mais recentes primeiro, com paginação e filtros.
+    """
+    try:
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        _sync_catalog()
+
+        where, params = [], []
+        if provider:
+            where.append("provider = ?")
+            params.append(provider.lower())
+        if kind:
+            where.append("kind = ?")
+            params.append(kind)
+        if asset:
+            where.append("(',' || assets || ',') LIKE ?")
+            params.append(f"%,{asset.upper()},%")
+
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), 500)
+
+        with closing(_catalog_conn()) as conn:
+            total = conn.execute(f"SELECT count(*) FROM reports {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM reports {clause} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+        return {
+            "items": [_row_to_dict(r) for r in rows],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }
+    except Exception as e:
+        print("Erro query_reports:", e)
+        return {"items": [], "total": 0, "page": page, "page_size": page_size}
+
+
+def get_report(filename: str) -> dict | None:
+    path = os.path.join(REPORTS_DIR, filename)
+    if not os.path.exists(path):
+        return None
+
+    with closing(_catalog_conn()) as conn:
+        row = conn.execute("SELECT * FROM reports WHERE filename = ?", (filename,)).fetchone()
+
+    if row is None or row["size"] != os.path.getsize(path):
+        register_report(path, **_infer_from_filename(filename))
+        with closing(_catalog_conn()) as conn:
+            row = conn.execute("SELECT * FROM reports WHERE filename = ?", (filename,)).fetchone()
+
+    return _row_to_dict(row) if row else None
 
 
 def list_reports() -> List[str]:
     """
-    Lista relatórios ZIP da pasta /reports
+    Lista relatórios ZIP da pasta /reports (mais recentes primeiro)
     """
     try:
         os.makedirs(REPORTS_DIR, exist_ok=True)
-        files = [f for f in os.listdir(REPORTS_DIR) if f.endswith(".zip")]
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(REPORTS_DIR, x)), reverse=True)
-        return files
+        _sync_catalog()
+        with closing(_catalog_conn()) as conn:
+            rows = conn.execute("SELECT filename FROM reports ORDER BY created_at DESC").fetchall()
+        return [r["filename"] for r in rows]
     except Exception as e:
         print("Erro list_reports:", e)
         return []
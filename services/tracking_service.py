@@ -1,31 +1,230 @@
 # services/tracking_service.py
 
-from models.db import get_sync_conn
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
+from core.config import settings
+from models.storage import storage
+from services.presence_service import presence
 
-def track_session(email: str, ip: str):
-    conn = get_sync_conn()
-    cur = conn.cursor()
 
-    cur.execute("""
-        INSERT INTO sessions (user_email, ip)
-        VALUES (%s, %s)
-    """, (email, ip))
+OVERFLOW_POLICIES = ("drop", "drop_oldest", "block")
 
-    conn.commit()
-    cur.close()
-    conn.close()
+_STOP = object()
 
 
-def track_event(email: str, event: str):
-    conn = get_sync_conn()
-    cur = conn.cursor()
+def _user_ref(user: Optional[str]) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+    if not user:
+        return None, None
+    try:
+        return uuid.UUID(user), None
+    except ValueError:
+        return None, user
 
-    cur.execute("""
-        INSERT INTO events (user_email, event)
-        VALUES (%s, %s)
-    """, (email, event))
 
-    conn.commit()
-    cur.close()
-    conn.close()
+# ===========================
+# 🔹 Buffer de ingestão
+# ===========================
+class TrackingBuffer:
+    """
+    Fila em memória (limitada a max_size) esvaziada por uma task que grava
+    no storage em lotes: a cada batch_size registros ou flush_interval
+    segundos, o que vier primeiro. Cada lote é uma única transação.
+
+    Com a fila cheia, `overflow` decide: "drop" descarta o novo registro,
+    "drop_oldest" descarta o mais antigo e "block" faz a requisição esperar.
+
+    Um lote que falha é regravado até `retries` vezes, esperando
+    retry_backoff, 2x, 4x... entre as tentativas. Enquanto isso a fila
+    continua recebendo (e aplicando `overflow`); esgotadas as tentativas o
+    lote é descartado e contado em `failed`. A gravação é uma transação só,
+    então repetir não duplica linhas.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow: str,
+        retries: int = 0,
+        retry_backoff: float = 0.5,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"TRACKING_OVERFLOW inválido: {overflow} (use {', '.join(OVERFLOW_POLICIES)})")
+
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = True
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+
+    # --- ciclo de vida ---
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Para de aceitar registros e grava tudo o que ainda está na fila.
+        """
+        if self._task is None:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        restantes = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                restantes.append(item)
+        if restantes:
+            await self._flush(restantes)
+
+    # --- produtores ---
+    async def put(self, kind: str, record: tuple) -> bool:
+        if self._closed:
+            self.dropped += 1
+            return False
+
+        item = (kind, record)
+        if self.overflow == "block":
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                if self.overflow == "drop":
+                    return False
+                self._queue.get_nowait()
+                self._queue.put_nowait(item)
+
+        self.enqueued += 1
+        return True
+
+    # --- consumidor ---
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            parar = False
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    parar = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if parar:
+                return
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        events = [r for kind, r in batch if kind == "event"]
+        sessions = [r for kind, r in batch if kind == "session"]
+
+        for tentativa in range(self.retries + 1):
+            try:
+                await storage.insert_batch(events, sessions)
+                self.written += len(batch)
+                self.batches += 1
+                return
+
+            except Exception as e:
+                if tentativa == self.retries:
+                    self.failed += len(batch)
+                    print(f"[TRACKING ERROR] Lote de {len(batch)} registros descartado após "
+                          f"{tentativa + 1} tentativas: {e}")
+                    return
+                espera = self.retry_backoff * 2 ** tentativa
+                self.retried += 1
+                print(f"[TRACKING ERROR] Falha ao gravar lote de {len(batch)} registros "
+                      f"(nova tentativa em {espera:.1f}s): {e}")
+                await asyncio.sleep(espera)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "overflow": self.overflow,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+        }
+
+
+tracking_buffer = TrackingBuffer(
+    settings.TRACKING_QUEUE_MAX,
+    settings.TRACKING_BATCH_SIZE,
+    settings.TRACKING_FLUSH_INTERVAL,
+    settings.TRACKING_OVERFLOW,
+    settings.TRACKING_FLUSH_RETRIES,
+    settings.TRACKING_RETRY_BACKOFF,
+)
+
+
+async def track_session(
+    user: Optional[str], ip: Optional[str], user_agent: Optional[str]
+) -> Tuple[uuid.UUID, bool]:
+    """
+    Abre uma sessão: o id é gerado aqui para o cliente já mandar
+    heartbeats antes do lote chegar ao banco.
+    """
+    session_id = uuid.uuid4()
+    user_uuid, user_email = _user_ref(user)
+    accepted = await tracking_buffer.put(
+        "session", (session_id, user_uuid, user_email, ip, user_agent, datetime.now(timezone.utc))
+    )
+    if accepted:
+        presence.open(session_id)
+    return session_id, accepted
+
+
+async def track_event(user: Optional[str], event_type: str, meta: Optional[Dict[str, Any]] = None) -> bool:
+    user_uuid, user_email = _user_ref(user)
+    return await tracking_buffer.put(
+        "event",
+        (user_uuid, user_email, event_type, json.dumps(meta) if meta is not None else None,
+         datetime.now(timezone.utc)),
+    )
@@ -1,8 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from typing import Any, Dict, List, Tuple
 from fastapi import HTTPException
-from tradingview_ta import TA_Handler, Interval
+from tradingview_ta import Interval, TradingView, __version__ as TV_TA_VERSION
+from tradingview_ta.main import calculate
 
-from models.forex_schemas import TVForexQuery
+from core.config import settings
+from core.metrics import track_upstream
+from models.forex_schemas import TVForexBatchQuery, TVForexQuery
+from services.provider_clients import provider_clients
+from utils.concurrency import TTLCache, executar_em_paralelo
 
 
 COMMON_FOREX = [
@@ -11,41 +18,237 @@ COMMON_FOREX = [
 ]
 
 
+TV_SCREENER = "forex"
+TV_INTERVAL = Interval.INTERVAL_1_MINUTE
+TV_EXCHANGES = ["FX_IDC", "OANDA"]
+
+tv_cache = TTLCache(settings.TV_CACHE_TTL)
+_tv_pool = ThreadPoolExecutor(max_workers=settings.TV_POOL_SIZE, thread_name_prefix="tradingview")
+
+
+def _analisar_lote(tickers: List[str], interval: str) -> Dict[str, Any]:
+    """
+    Mesma consulta do get_multiple_analysis (um POST para vários
+    "EXCHANGE:SYMBOL"), mas pela Session compartilhada (keep-alive).
+    Tickers que o TradingView não conhece voltam como None.
+    """
+    indicators = TradingView.indicators
+    response = provider_clients.tradingview().post(
+        f"{TradingView.scan_url}{TV_SCREENER}/scan",
+        json=TradingView.data(tickers, interval, indicators),
+        headers={"User-Agent": f"tradingview_ta/{TV_TA_VERSION}"},
+        timeout=settings.TV_TIMEOUT,
+    )
+    if response.status_code != 200:
+        raise Exception(f"Can't access TradingView's API. HTTP status code: {response.status_code}.")
+
+    analises: Dict[str, Any] = {ticker.upper(): None for ticker in tickers}
+    for item in response.json()["data"]:
+        exchange, symbol = item["s"].split(":", 1)
+        analises[item["s"].upper()] = calculate(
+            indicators=dict(zip(indicators, item["d"])),
+            indicators_key=indicators,
+            screener=TV_SCREENER,
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+        )
+    return analises
+
+
+def _analisar(symbol: str, exchange: str):
+    analysis = _analisar_lote([f"{exchange}:{symbol}"], TV_INTERVAL)[f"{exchange}:{symbol}".upper()]
+    if analysis is None:
+        raise Exception("Exchange or symbol not found.")
+    return analysis
+
+
+def _payload(analysis) -> dict:
+    return {
+        "symbol": analysis.symbol,
+        "exchange": analysis.exchange,
+        "time": datetime.utcnow().isoformat() + "Z",
+        "summary": analysis.summary,
+        "oscillators": analysis.oscillators,
+        "moving_averages": analysis.moving_averages,
+        "indicators": analysis.indicators,
+    }
+
+
 def search_forex(query: str):
     q = query.replace("/", "").upper().strip()
     return [x for x in COMMON_FOREX if q in x]
 
 
+def _resumo(symbol: str, exchange: str) -> dict:
+    """
+    Resumo de um par numa exchange, em cache por TV_CACHE_TTL segundos
+    (pedidos iguais em paralelo esperam uma única chamada ao TradingView).
+    """
+    def consultar():
+        with track_upstream("tradingview", "analysis"):
+            return _payload(_analisar(symbol, exchange))
+
+    return tv_cache.obter((symbol, exchange, TV_INTERVAL), consultar)
+
+
 def get_forex_summary(data: TVForexQuery):
     symbol = data.symbol.replace("/", "").upper()
-    exchanges = [data.exchange] if data.exchange else ["FX_IDC", "OANDA"]
+    exchanges = [data.exchange] if data.exchange else TV_EXCHANGES
+
+    # Sem exchange: o que já estiver em cache (na ordem de preferência) serve
+    for ex in exchanges:
+        cached = tv_cache.consultar((symbol, ex, TV_INTERVAL))
+        if cached is not None:
+            return cached
 
     last_error = None
 
-    for ex in exchanges:
+    if len(exchanges) == 1:
         try:
-            handler = TA_Handler(
-                symbol=symbol,
-                exchange=ex,
-                screener="forex",
-                interval=Interval.INTERVAL_1_MINUTE
-            )
-            analysis = handler.get_analysis()
-
-            return {
-                "symbol": symbol,
-                "exchange": ex,
-                "time": datetime.utcnow().isoformat() + "Z",
-                "summary": analysis.summary,
-                "oscillators": analysis.oscillators,
-                "moving_averages": analysis.moving_averages,
-                "indicators": analysis.indicators,
-            }
-
+            return _resumo(symbol, exchanges[0])
         except Exception as e:
             last_error = str(e)
-            continue
+
+    else:
+        # Exchanges em paralelo: vale a primeira que responder com sucesso
+        # (a outra termina em segundo plano e só alimenta o cache)
+        futuros = [_tv_pool.submit(_resumo, symbol, ex) for ex in exchanges]
+        for futuro in as_completed(futuros):
+            try:
+                return futuro.result()
+            except Exception as e:
+                last_error = str(e)
 
     raise HTTPException(status_code=400,
         detail=f"Erro ao obter dados TradingView ({symbol}): {last_error}"
     )
+
+
+# ===========================
+# 🔹 Lote: símbolos × intervalos
+# ===========================
+TV_INTERVALS = [v for k, v in vars(Interval).items() if k.startswith("INTERVAL_")]
+
+# Colunas da resposta em lote (uma lista por coluna, uma posição por linha)
+TV_BATCH_COLUMNS = [
+    "symbol", "exchange", "interval", "time", "recommendation", "buy", "neutral", "sell",
+    "oscillators", "moving_averages",
+]
+
+
+def _resolver_intervalo(
+    pedidos: List[Tuple[str, List[str]]], interval: str
+) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """
+    Resumos de vários símbolos num intervalo. `pedidos` é (symbol, exchanges
+    em ordem de preferência). Primeiro o cache; o que faltar vai num POST
+    por exchange, e quem não for encontrado passa para a próxima exchange.
+    """
+    resultados: Dict[str, dict] = {}
+    erros: Dict[str, str] = {}
+
+    pendentes = []
+    for symbol, exchanges in pedidos:
+        cached = next(
+            (c for c in (tv_cache.consultar((symbol, ex, interval)) for ex in exchanges) if c is not None),
+            None,
+        )
+        if cached is not None:
+            resultados[symbol] = cached
+        else:
+            pendentes.append((symbol, exchanges))
+
+    rodada = 0
+    while pendentes:
+        por_exchange: Dict[str, List[str]] = {}
+        proximos = []
+        for symbol, exchanges in pendentes:
+            if rodada < len(exchanges):
+                por_exchange.setdefault(exchanges[rodada], []).append(symbol)
+                proximos.append((symbol, exchanges))
+            else:
+                erros.setdefault(symbol, "Exchange or symbol not found.")
+
+        for exchange, symbols in por_exchange.items():
+            try:
+                with track_upstream("tradingview", "analysis_batch"):
+                    analises = _analisar_lote([f"{exchange}:{s}" for s in symbols], interval)
+            except Exception as e:
+                for symbol in symbols:
+                    erros[symbol] = str(e)
+                continue
+
+            for symbol in symbols:
+                analysis = analises.get(f"{exchange}:{symbol}".upper())
+                if analysis is not None:
+                    payload = _payload(analysis)
+                    tv_cache.guardar((symbol, exchange, interval), payload)
+                    resultados[symbol] = payload
+                    erros.pop(symbol, None)
+
+        pendentes = [(s, exs) for s, exs in proximos if s not in resultados]
+        rodada += 1
+
+    return resultados, erros
+
+
+def get_forex_batch(data: TVForexBatchQuery):
+    """
+    Resumo técnico de vários pares × intervalos. Um POST ao TradingView
+    por intervalo × exchange (intervalos em paralelo, limitados a
+    TV_POOL_SIZE), resposta colunar e erros por símbolo sem derrubar o lote.
+    """
+    invalidos = [i for i in data.intervals if i not in TV_INTERVALS]
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Intervalos inválidos: {invalidos}. Use {TV_INTERVALS}.")
+
+    # "OANDA:EURUSD" fixa a exchange daquele símbolo
+    pedidos: List[Tuple[str, List[str]]] = []
+    vistos = set()
+    for item in data.symbols:
+        exchange, _, symbol = item.rpartition(":")
+        symbol = symbol.replace("/", "").upper().strip()
+        if not symbol or symbol in vistos:
+            continue
+        vistos.add(symbol)
+        exchange = exchange.upper() or data.exchange
+        pedidos.append((symbol, [exchange] if exchange else TV_EXCHANGES))
+
+    intervals = list(dict.fromkeys(data.intervals))
+    por_intervalo = dict(executar_em_paralelo(
+        intervals,
+        lambda interval: _resolver_intervalo(pedidos, interval),
+        settings.TV_POOL_SIZE,
+    ))
+
+    colunas: Dict[str, list] = {c: [] for c in TV_BATCH_COLUMNS}
+    errors = []
+    for interval in intervals:
+        resultados, erros = por_intervalo[interval]
+        for symbol, _ in pedidos:
+            payload = resultados.get(symbol)
+            if payload is None:
+                errors.append({"symbol": symbol, "interval": interval, "error": erros.get(symbol)})
+                continue
+
+            summary = payload["summary"]
+            for coluna, valor in (
+                ("symbol", symbol),
+                ("exchange", payload["exchange"]),
+                ("interval", interval),
+                ("time", payload["time"]),
+                ("recommendation", summary["RECOMMENDATION"]),
+                ("buy", summary["BUY"]),
+                ("neutral", summary["NEUTRAL"]),
+                ("sell", summary["SELL"]),
+                ("oscillators", payload["oscillators"]["RECOMMENDATION"]),
+                ("moving_averages", payload["moving_averages"]["RECOMMENDATION"]),
+            ):
+                colunas[coluna].append(valor)
+
+    return {
+        "rows": len(colunas["symbol"]),
+        "columns": colunas,
+        "errors": errors,
+    }
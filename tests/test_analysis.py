@@ -0,0 +1,41 @@
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import services.analysis_service as analysis_service
+
+
+def _candles(n: int = 600, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Open_Time": pd.date_range("2024-01-01", periods=n, freq="min"),
+        "Resultado": rng.choice(["Call", "Put"], n),
+    })
+
+
+def test_ativos_repetidos_e_intervalo_no_catalogo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registrados = []
+    monkeypatch.setattr(analysis_service, "register_report", lambda *a, **k: registrados.append(a))
+
+    pedidos = []
+
+    def fetch(asset, interval):
+        pedidos.append((asset, interval))
+        return _candles(seed=len(pedidos))
+
+    caminho = analysis_service.run_multi_asset_analysis(
+        "teste", ["EURUSD", "eurusd", "GBPUSD", " EURUSD "], fetch, max_workers=2, interval="5m",
+    )
+
+    assert caminho is not None
+    assert sorted(pedidos) == [("EURUSD", "5m"), ("GBPUSD", "5m")]
+
+    resultado = pd.read_csv(zipfile.ZipFile(caminho).open("resultado.csv"))
+    assert list(resultado["Ativo"].unique()) == ["EURUSD", "GBPUSD"]
+    assert not resultado.duplicated().any()
+
+    ((_, kind, provider, assets, intervals, _, _, rows),) = registrados
+    assert (kind, provider, assets, intervals) == ("analysis", "teste", ["EURUSD", "GBPUSD"], ["5m"])
+    assert rows == len(resultado)
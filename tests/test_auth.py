@@ -0,0 +1,66 @@
+import bcrypt
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import services.auth_service as auth_service
+from core.config import settings
+from core.exceptions import add_exception_handlers
+from routers import auth_router
+
+
+SENHA = "s3nha-forte"
+USUARIO = {
+    "id": "0b7c5a8e-2f43-4a47-9a53-6c7f1d1f5e10",
+    "email": "ana@example.com",
+    "password_hash": bcrypt.hashpw(SENHA.encode(), bcrypt.gensalt(4)).decode(),
+    "role": "user",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_user_by_email(email):
+        return USUARIO if email == USUARIO["email"] else None
+
+    monkeypatch.setattr(auth_service.storage, "get_user_by_email", get_user_by_email)
+    monkeypatch.setattr(settings, "SECRET_KEY", "teste")
+
+    app = FastAPI()
+    add_exception_handlers(app)
+    app.include_router(auth_router.router)
+    return TestClient(app)
+
+
+def test_login_ok(client):
+    r = client.post("/auth/login", json={"email": USUARIO["email"], "password": SENHA})
+    assert r.status_code == 200
+    assert r.json()["user"]["email"] == USUARIO["email"]
+    assert "verify" in r.headers["Server-Timing"]
+
+
+@pytest.mark.parametrize("email, senha", [(USUARIO["email"], "errada"), ("ninguem@example.com", SENHA)])
+def test_401_nao_revela_se_o_email_existe(client, monkeypatch, email, senha):
+    verificados = []
+    verify_password = auth_service.verify_password
+
+    async def contar(password, password_hash):
+        verificados.append(password_hash)
+        return await verify_password(password, password_hash)
+
+    monkeypatch.setattr(auth_service, "verify_password", contar)
+
+    r = client.post("/auth/login", json={"email": email, "password": senha})
+    assert r.status_code == 401
+    assert "Server-Timing" not in r.headers
+    # Email desconhecido também paga um bcrypt (hash falso)
+    assert len(verificados) == 1
+
+
+def test_503_leva_retry_after(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_HASH_MAX_PENDING", 0)
+
+    r = client.post("/auth/login", json={"email": USUARIO["email"], "password": SENHA})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert r.json()["status_code"] == 503
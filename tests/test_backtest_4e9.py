@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.backtest_4e9 import backtest_gatilho
+from utils.candles import montar_ohlcv
+from utils.gatilho_4e9 import ROTULOS_RESULTADO, analisar_tecnica_gatilho_universal
+
+
+def _candles(n: int, seed: int) -> pd.DataFrame:
+    """
+    n candles de 1m com cores aleatórias, a partir de um minuto "quebrado".
+    """
+    rng = np.random.default_rng(seed)
+    open_time = pd.date_range("2024-03-01 23:41", periods=n, freq="1min").to_numpy()
+    open_ = rng.normal(1.1, 0.01, n)
+    close = open_ + rng.normal(0, 0.001, n)
+    return montar_ohlcv(open_time, open_, np.maximum(open_, close), np.minimum(open_, close), close, np.ones(n))
+
+
+@pytest.mark.parametrize("n, seed", [(60, 1), (1000, 2), (20_000, 3)])
+def test_padrao_reproduz_o_motor_4e9(n, seed):
+    df = _candles(n, seed)
+    motor = analisar_tecnica_gatilho_universal(df)
+    (linha,) = backtest_gatilho(df).to_dict("records")
+
+    assert linha["operacoes"] == len(motor)
+    distribuicao = motor["Resultado_Final"].value_counts()
+    for rotulo in ROTULOS_RESULTADO:
+        assert linha[rotulo] == round(100 * distribuicao.get(rotulo, 0) / len(motor), 2), rotulo
+    assert linha["win_rate"] == pytest.approx(100 * (motor["Resultado_Final"] != "LOSS").mean(), abs=0.05)
+
+
+def test_gale_menor_e_prefixo_do_maior():
+    df = _candles(5000, 4)
+    motor = analisar_tecnica_gatilho_universal(df)
+    tabela = backtest_gatilho(df, gales=(0, 1, 2, 3)).set_index("gale")
+
+    # WIN direto não depende da profundidade do gale; só perde as últimas velas
+    assert tabela.loc[0, "WIN"] == pytest.approx(tabela.loc[3, "WIN"], abs=0.05)
+    assert tabela.loc[3, "operacoes"] == len(motor)
+    assert list(tabela.loc[0, ["WIN GALE 1", "WIN GALE 2", "WIN GALE 3"]].isna()) == [True] * 3
+
+
+def test_timeframes_maiores_sem_gatilho_nao_viram_linha_nan():
+    df = _candles(3000, 5)
+
+    # 4, 9, ..., 59 nunca é o minuto de abertura de uma vela de 5m ou 1h
+    tabela = backtest_gatilho(df, timeframes=("1m", "5m", "1h"))
+    assert list(tabela["timeframe"]) == ["1m"]
+    assert not tabela.isna().any().any()
+
+    # Com minutos que existem no timeframe, há operações; no 1h, só o 0 dispara
+    multiplos_de_5 = ",".join(map(str, range(0, 60, 5)))
+    tabela = backtest_gatilho(df, gatilhos=(range(0, 60, 5), (0,)), timeframes=("5m", "1h")).set_index(
+        ["timeframe", "gatilhos"]
+    )
+    assert set(tabela.index) == {("5m", multiplos_de_5), ("5m", "0"), ("1h", multiplos_de_5), ("1h", "0")}
+    # 601 velas de 5m (23:40 … ), todas gatilho menos as 4 últimas
+    assert tabela.loc[("5m", multiplos_de_5), "operacoes"] == 601 - 4
+    assert tabela.loc[("1h", multiplos_de_5), "operacoes"] == tabela.loc[("1h", "0"), "operacoes"]
@@ -0,0 +1,237 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+from binance.helpers import interval_to_milliseconds
+
+from services.binance_klines import BinanceBanido, BinanceKlineFetcher, dividir_em_shards
+from utils.concurrency import RateLimiter
+
+
+DIA_MS = 86_400_000
+
+# Os candles 1w da Binance abrem na segunda-feira (época + 4 dias)
+OFFSET_MS = {"1w": 4 * DIA_MS}
+
+
+def _em_ms(dt: datetime) -> int:
+    return int((dt - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def _candles(interval: str, inicio_ms: int, fim_ms: int, limit: int = 1000) -> list:
+    """
+    Klines que a Binance devolveria para startTime/endTime (fim inclusivo).
+    """
+    intervalo = interval_to_milliseconds(interval)
+    offset = OFFSET_MS.get(interval, 0)
+    ot = offset + -(-(inicio_ms - offset) // intervalo) * intervalo
+
+    linhas = []
+    while ot <= fim_ms and len(linhas) < limit:
+        preco = 1 + (ot // intervalo % 97) / 1000
+        linhas.append([ot, str(preco), str(preco + 0.01), str(preco - 0.01), str(preco), "10",
+                       ot + intervalo - 1, "0", 1, "0", "0", "0"])
+        ot += intervalo
+    return linhas
+
+
+# ===========================
+# 🔹 Stub de /api/v3/klines
+# ===========================
+@pytest.fixture(scope="module")
+def stub():
+    estado = {"requests": 0, "falhar": 0, "banir": None}
+
+    async def klines(request):
+        estado["requests"] += 1
+        if estado["banir"] is not None:
+            return web.Response(status=418, headers={"Retry-After": estado["banir"]})
+        if estado["falhar"]:
+            estado["falhar"] -= 1
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        q = request.query
+        return web.json_response(_candles(
+            q["interval"], int(q["startTime"]), int(q["endTime"]), int(q["limit"])
+        ))
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_get("/api/v3/klines", klines)
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    porta = site._server.sockets[0].getsockname()[1]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    estado["url"] = f"http://127.0.0.1:{porta}"
+    yield estado
+
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def fetcher(stub):
+    f = BinanceKlineFetcher(stub["url"], RateLimiter(100_000), concurrency=4, timeout=10, max_retries=3)
+    yield f
+    f.close()
+
+
+def _esperado(interval: str, inicio: datetime, fim: datetime) -> list:
+    return [linha[0] for linha in _candles(interval, _em_ms(inicio), _em_ms(fim) - 1, limit=10**9)]
+
+
+@pytest.mark.parametrize("interval, inicio, fim", [
+    ("1m", datetime(2024, 1, 1), datetime(2024, 1, 3, 7, 13)),   # vários shards, último parcial
+    ("1h", datetime(2024, 1, 1, 0, 30), datetime(2024, 3, 1)),   # inicio fora do alinhamento
+    ("1d", datetime(2024, 1, 1), datetime(2024, 1, 2)),          # lacuna de um dia do cache
+    ("1w", datetime(2024, 1, 1), datetime(2024, 1, 8)),          # segunda-feira
+    ("1w", datetime(2024, 1, 3), datetime(2024, 2, 1)),          # meio da semana
+    ("1w", datetime(2005, 1, 1), datetime(2024, 6, 1)),          # mais de 1000 semanas
+])
+def test_baixar_igual_ao_sequencial(fetcher, interval, inicio, fim):
+    df = fetcher.baixar("BTCUSDT", interval, inicio, fim)
+
+    esperado = _esperado(interval, inicio, fim)
+    obtido = (df["Open_Time"].astype("int64") // 1_000_000).tolist()
+    assert obtido == esperado
+    assert len(esperado) > 0
+
+
+def test_semana_de_segunda_nao_perde_o_candle(fetcher):
+    df = fetcher.baixar("BTCUSDT", "1w", datetime(2024, 1, 1), datetime(2024, 1, 8))
+    assert list(df["Open_Time"]) == [datetime(2024, 1, 1)]
+
+
+def test_retry_em_429(stub, fetcher):
+    stub["falhar"] = 2
+    df = fetcher.baixar("BTCUSDT", "1m", datetime(2024, 1, 1), datetime(2024, 1, 1, 2))
+    assert len(df) == 120
+    assert fetcher.retries == 2
+
+
+def test_418_nao_repete_e_suspende_os_proximos(stub, fetcher):
+    antes = stub["requests"]
+    stub["banir"] = "60"
+    try:
+        with pytest.raises(BinanceBanido):
+            fetcher.baixar("BTCUSDT", "1m", datetime(2024, 1, 1), datetime(2024, 1, 3))
+        # Só o que já estava em voo (um shard por vaga) chegou a sair
+        assert stub["requests"] - antes <= fetcher.concurrency
+        assert fetcher.retries == 0
+
+        # Banido: falha sem chamar a API, mesmo depois que a Binance libera
+        stub["banir"] = None
+        antes = stub["requests"]
+        with pytest.raises(BinanceBanido) as exc:
+            fetcher.baixar("ETHUSDT", "1h", datetime(2024, 1, 1), datetime(2024, 1, 2))
+        with pytest.raises(BinanceBanido):
+            next(fetcher.iterar("ETHUSDT", "1m", datetime(2024, 1, 1), datetime(2024, 1, 2)))
+        assert stub["requests"] == antes
+        assert 55 < exc.value.restante <= 60
+        assert fetcher.stats()["bans"] >= 1
+    finally:
+        stub["banir"] = None
+
+
+def test_418_sem_retry_after_usa_o_padrao(stub, fetcher):
+    import services.binance_klines as binance_klines
+
+    stub["banir"] = ""
+    try:
+        with pytest.raises(BinanceBanido) as exc:
+            fetcher.baixar("BTCUSDT", "1h", datetime(2024, 1, 1), datetime(2024, 1, 2))
+    finally:
+        stub["banir"] = None
+    assert binance_klines.BAN_PADRAO - 5 < exc.value.restante <= binance_klines.BAN_PADRAO
+
+
+def test_dividir_em_shards_parte_do_inicio():
+    inicio, fim = _em_ms(datetime(2024, 1, 1)), _em_ms(datetime(2024, 1, 8))
+    assert dividir_em_shards(inicio, fim, "1w") == [(inicio, fim)]
+    assert dividir_em_shards(inicio, inicio + DIA_MS, "1d") == [(inicio, inicio + DIA_MS)]
+
+    shards = dividir_em_shards(inicio, fim, "1h", limit=24)
+    assert len(shards) == 7
+    assert shards[0][0] == inicio and shards[-1][1] == fim
+    assert all(a[1] == b[0] for a, b in zip(shards, shards[1:]))
+
+
+# ===========================
+# 🔹 Páginas à medida que chegam
+# ===========================
+def test_iterar_entrega_as_paginas_em_ordem(fetcher):
+    inicio, fim = datetime(2024, 1, 1), datetime(2024, 1, 5, 3)
+    paginas = list(fetcher.iterar("BTCUSDT", "1m", inicio, fim))
+
+    assert len(paginas) == len(dividir_em_shards(_em_ms(inicio), _em_ms(fim), "1m"))
+    assert all(len(p) <= 1000 for p in paginas)
+    obtido = [ms for p in paginas for ms in (p["Open_Time"].astype("int64") // 1_000_000)]
+    assert obtido == _esperado("1m", inicio, fim)
+    assert list(paginas[0].columns) == list(fetcher.baixar("BTCUSDT", "1m", inicio, fim).columns)
+
+
+def test_iterar_parar_no_meio_cancela_o_resto(stub, fetcher):
+    antes = stub["requests"]
+    paginas = fetcher.iterar("BTCUSDT", "1m", datetime(2024, 1, 1), datetime(2024, 3, 1))
+    assert len(next(paginas)) == 1000
+    paginas.close()
+
+    # 86 shards no total; só os agendados à frente chegaram a sair
+    assert stub["requests"] - antes <= 1 + 2 * fetcher.concurrency
+
+
+def test_cache_iterar_grava_e_depois_le_do_disco(fetcher, tmp_path):
+    from services.candle_cache_service import CandleCache
+
+    cache = CandleCache(str(tmp_path), 10**9)
+    inicio, fim = datetime(2024, 1, 1, 12), datetime(2024, 1, 4)
+    baixar = lambda i, f: fetcher.iterar("BTCUSDT", "1m", i, f)
+
+    primeira = list(cache.iterar("binance", "BTCUSDT", "1m", inicio, fim, baixar))
+    assert len(primeira) > 1
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert len(list((tmp_path / "binance" / "BTCUSDT" / "1m").iterdir())) == 3
+
+    segunda = cache.carregar("binance", "BTCUSDT", "1m", inicio, fim, lambda i, f: pytest.fail("baixou de novo"))
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    obtido = [ms for p in primeira for ms in (p["Open_Time"].astype("int64") // 1_000_000)]
+    assert obtido == _esperado("1m", inicio, fim)
+    assert (segunda["Open_Time"].astype("int64") // 1_000_000).tolist() == obtido
+
+
+def test_extracao_grava_o_zip_pagina_a_pagina(fetcher, tmp_path, monkeypatch):
+    import io
+    import zipfile
+
+    import pandas as pd
+
+    import services.binance_service as binance_service
+    from models.forex_schemas import RequestData
+    from services.candle_cache_service import CandleCache
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(binance_service, "binance_fetcher", fetcher)
+    monkeypatch.setattr(binance_service, "candle_cache", CandleCache(str(tmp_path / "cache"), 10**9))
+    monkeypatch.setattr(binance_service, "register_report", lambda *a, **k: None)
+
+    binance_service.run_extraction(RequestData(
+        assets=["btcusdt"], intervals=["1m", "1h"], start_date="2024-01-01", end_date="2024-01-02",
+    ))
+
+    (zip_path,) = (tmp_path / "reports").iterdir()
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert sorted(zipf.namelist()) == ["btcusdt_1h.csv", "btcusdt_1m.csv"]
+        df = pd.read_csv(io.BytesIO(zipf.read("btcusdt_1m.csv")), parse_dates=["Open_Time"])
+
+    assert (df["Open_Time"].astype("int64") // 1_000_000).tolist() == _esperado(
+        "1m", datetime(2024, 1, 1), datetime(2024, 1, 3)
+    )
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import models.db as db
+from core.config import settings
+
+
+TEST_PG_URL = os.getenv("TEST_NEON_DATABASE_URL")
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/duas-consultas")
+    async def duas_consultas(conn=Depends(db.get_db)):
+        # Quem usa acquire() dentro da rota (o storage) recebe a mesma conexão
+        async with db.acquire() as a, db.acquire() as b:
+            mesma = a is conn and b is conn
+            valor = await a.fetchval("SELECT 1") + await b.fetchval("SELECT 1")
+        return {"mesma": mesma, "valor": valor}
+
+    @app.get("/sem-banco")
+    async def sem_banco(conn=Depends(db.get_db)):
+        return {"conn": conn is not None}
+
+    return app
+
+
+def test_sem_pool_entrega_none():
+    with TestClient(_app()) as client:
+        assert client.get("/sem-banco").json() == {"conn": False}
+
+
+@pytest.mark.skipif(not TEST_PG_URL, reason="TEST_NEON_DATABASE_URL não definido")
+def test_uma_conexao_por_requisicao(monkeypatch):
+    monkeypatch.setattr(settings, "NEON_DATABASE_URL", TEST_PG_URL)
+    app = _app()
+    app.router.on_startup.append(db.init_async_pool)
+    app.router.on_shutdown.append(db.close_async_pool)
+
+    with TestClient(app) as client:
+        antes = db.pool_stats()["acquires"]
+        for _ in range(3):
+            assert client.get("/duas-consultas").json() == {"mesma": True, "valor": 2}
+        stats = db.pool_stats()
+
+    # Um empréstimo por requisição, e todos devolvidos
+    assert stats["acquires"] - antes == 3
+    assert stats["in_use"] == 0
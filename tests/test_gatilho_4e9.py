@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.candles import montar_ohlcv
+from utils.gatilho_4e9 import analisar_tecnica_gatilho_universal
+
+
+def _referencia(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Loop original (iloc linha a linha), mantido como referência da lógica.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.sort_values(by='Open_Time').reset_index(drop=True)
+    minutos_gatilho = {4, 9, 14, 19, 24, 29, 34, 39, 44, 49, 54, 59}
+    resultados = []
+    i = 0
+
+    while i < len(df):
+        vela_atual = df.iloc[i]
+        minuto_atual = pd.to_datetime(vela_atual['Open_Time']).minute
+
+        if minuto_atual in minutos_gatilho:
+            if i + 4 >= len(df):
+                i += 1
+                continue
+
+            vela_gatilho = vela_atual
+            cor_gatilho = vela_gatilho['Resultado']
+
+            sequencia_operacoes = (
+                ['Put', 'Put', 'Call', 'Call']
+                if cor_gatilho == 'Call'
+                else ['Call', 'Call', 'Put', 'Put']
+            )
+
+            resultado_final_sequencia = "LOSS"
+
+            if df.iloc[i+1]['Resultado'] == sequencia_operacoes[0]:
+                resultado_final_sequencia = "WIN"
+            elif df.iloc[i+2]['Resultado'] == sequencia_operacoes[1]:
+                resultado_final_sequencia = "WIN GALE 1"
+            elif df.iloc[i+3]['Resultado'] == sequencia_operacoes[2]:
+                resultado_final_sequencia = "WIN GALE 2"
+            elif df.iloc[i+4]['Resultado'] == sequencia_operacoes[3]:
+                resultado_final_sequencia = "WIN GALE 3"
+
+            resultados.append({
+                'Horario_Gatilho': vela_gatilho['Open_Time'],
+                'Cor_Gatilho': cor_gatilho,
+                'Sequencia_Esperada': ' → '.join(sequencia_operacoes),
+                'Resultado_Final': resultado_final_sequencia
+            })
+
+        i += 1
+
+    return pd.DataFrame(resultados)
+
+
+def _candles(n: int, seed: int, embaralhar: bool = True) -> pd.DataFrame:
+    """
+    n candles de 1m com cores aleatórias, fora de ordem (a análise ordena).
+    """
+    rng = np.random.default_rng(seed)
+    open_time = pd.date_range("2024-03-01 23:41", periods=n, freq="1min").to_numpy()
+    open_ = rng.normal(1.1, 0.01, n)
+    close = open_ + rng.normal(0, 0.001, n)
+    df = montar_ohlcv(open_time, open_, np.maximum(open_, close), np.minimum(open_, close), close, np.ones(n))
+    if embaralhar:
+        df = df.sample(frac=1, random_state=seed)
+    return df
+
+
+@pytest.mark.parametrize("n, seed", [(0, 0), (1, 1), (4, 2), (5, 3), (9, 4), (60, 5), (1000, 6), (5000, 7)])
+def test_igual_ao_loop_original(n, seed):
+    df = _candles(n, seed)
+    pd.testing.assert_frame_equal(analisar_tecnica_gatilho_universal(df), _referencia(df))
+
+
+def test_igual_com_resultado_em_texto_e_horario_em_string():
+    df = _candles(500, 8)
+    df["Resultado"] = df["Resultado"].astype(object)
+    df["Open_Time"] = df["Open_Time"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    pd.testing.assert_frame_equal(analisar_tecnica_gatilho_universal(df), _referencia(df))
+
+
+def test_gatilho_sem_4_velas_seguintes_fica_de_fora():
+    # 12:04 é gatilho, mas só há 3 velas depois dele
+    df = _candles(8, 9, embaralhar=False)
+    df["Open_Time"] = pd.date_range("2024-03-01 12:00", periods=8, freq="1min")
+    assert analisar_tecnica_gatilho_universal(df).empty
+    assert _referencia(df).empty
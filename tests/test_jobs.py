@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from core.exceptions import add_exception_handlers
+from routers import binance_router
+from services.jobs_service import JobManager
+
+
+def _esperar(liberar: threading.Event, job=None):
+    liberar.wait(5)
+
+
+def _ocupar(manager, liberar: threading.Event):
+    """
+    Um job rodando (a única vaga) e a fila cheia.
+    """
+    rodando = manager.submit("teste", _esperar, liberar)
+    while rodando.status != "running":
+        time.sleep(0.01)
+    return rodando, [manager.submit("teste", _esperar, liberar) for _ in range(manager.max_pending)]
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_concurrent=1, process_workers=1, history=10, max_pending=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_fila_cheia_responde_503(manager):
+    liberar = threading.Event()
+    rodando, na_fila = _ocupar(manager, liberar)
+
+    with pytest.raises(HTTPException) as exc:
+        manager.submit("teste", _esperar, liberar)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"]
+    assert manager.stats()["rejected"] == 1
+    assert len(manager.list()) == 3
+
+    # Cancelar um da fila libera a vaga
+    manager.cancel(na_fila[0].id)
+    manager.submit("teste", _esperar, liberar)
+
+    liberar.set()
+    rodando._future.result(5)
+    assert manager.stats()["queued"] <= 2
+
+
+def test_rota_devolve_503_com_retry_after(manager, monkeypatch):
+    liberar = threading.Event()
+    monkeypatch.setattr(binance_router, "job_manager", manager)
+    _ocupar(manager, liberar)
+
+    app = FastAPI()
+    add_exception_handlers(app)
+    app.include_router(binance_router.router)
+    r = TestClient(app).post("/api/v1/binance/download-data", json={
+        "assets": ["BTCUSDT"], "intervals": ["1m"], "start_date": "2024-01-01", "end_date": "2024-01-02",
+    })
+    liberar.set()
+
+    assert r.status_code == 503
+    assert "Retry-After" in r.headers
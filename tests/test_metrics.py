@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+import pytest
+
+from core.config import settings
+from core.metrics import render_metrics
+import models.db as db
+
+
+TEST_PG_URL = os.getenv("TEST_NEON_DATABASE_URL")
+
+
+def _amostras(texto: str) -> dict:
+    return {
+        nome: float(valor)
+        for nome, valor in (linha.rsplit(" ", 1) for linha in texto.splitlines() if linha and linha[0] != "#")
+    }
+
+
+def test_pool_desligado_sai_zerado():
+    amostras = _amostras(render_metrics())
+    for nome in ("db_pool_connections", "db_pool_connections_in_use", "db_pool_connections_idle"):
+        assert amostras[nome] == 0
+
+
+@pytest.mark.skipif(not TEST_PG_URL, reason="TEST_NEON_DATABASE_URL não definido")
+def test_pool_em_uso_e_espera(monkeypatch):
+    monkeypatch.setattr(settings, "NEON_DATABASE_URL", TEST_PG_URL)
+
+    async def main():
+        await db.init_async_pool()
+        try:
+            antes = _amostras(render_metrics()).get("db_pool_acquire_wait_seconds_count", 0)
+            async with db.acquire(), db.acquire():
+                durante = _amostras(render_metrics())
+            return antes, durante, _amostras(render_metrics())
+        finally:
+            await db.close_async_pool()
+
+    antes, durante, depois = asyncio.run(main())
+    assert durante["db_pool_connections_in_use"] == 2
+    assert durante["db_pool_max_connections"] == settings.DB_POOL_MAX_SIZE
+    assert depois["db_pool_connections_in_use"] == 0
+    assert depois["db_pool_acquire_wait_seconds_count"] == antes + 2
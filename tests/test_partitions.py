@@ -0,0 +1,145 @@
+"""
+Manutenção das partições de events. Roda quando TEST_NEON_DATABASE_URL
+está definido, num schema descartável com uma tabela events particionada
+(e a partição DEFAULT), sem tocar nas tabelas do banco de teste.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import pytest
+
+from services.partition_service import (
+    _inicio_periodo,
+    _proximo_periodo,
+    archive_expired,
+    ensure_partitions,
+    partition_bounds,
+)
+
+
+TEST_PG_URL = os.getenv("TEST_NEON_DATABASE_URL")
+
+SCHEMA = "teste_particoes"
+
+pytestmark = pytest.mark.skipif(not TEST_PG_URL, reason="TEST_NEON_DATABASE_URL não definido")
+
+
+def rodar(cenario):
+    async def main():
+        conn = await asyncpg.connect(TEST_PG_URL)
+        try:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+            await conn.execute(f"SET search_path TO {SCHEMA}")
+            await conn.execute(
+                """
+                CREATE TABLE events (
+                  id UUID NOT NULL DEFAULT gen_random_uuid(),
+                  user_id UUID NULL,
+                  event_type TEXT NOT NULL,
+                  meta JSONB NULL,
+                  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                  PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at)
+                """
+            )
+            await conn.execute("CREATE INDEX idx_events_created_at ON events (created_at)")
+            await conn.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+            return await cenario(conn)
+        finally:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            await conn.close()
+
+    return asyncio.run(main())
+
+
+def _mes(n: int):
+    inicio = _inicio_periodo(datetime.now(timezone.utc).date(), "month")
+    for _ in range(n):
+        inicio = _proximo_periodo(inicio, "month")
+    return inicio
+
+
+def _cobertura(particoes):
+    """
+    Intervalos [inicio, fim) ordenados, sem a DEFAULT; falha se houver
+    sobreposição ou buraco entre eles.
+    """
+    intervalos = sorted((p["inicio"], p["fim"]) for p in particoes if not p["padrao"])
+    for (_, fim), (inicio, _) in zip(intervalos, intervalos[1:]):
+        assert fim == inicio, (fim, inicio)
+    return intervalos[0][0], intervalos[-1][1]
+
+
+def test_eventos_da_default_vao_para_a_nova_particao():
+    async def cenario(conn):
+        await ensure_partitions(conn, "month", 0)
+        futuro = datetime.combine(_mes(2), datetime.min.time(), timezone.utc) + timedelta(days=3)
+        await conn.executemany(
+            "INSERT INTO events (event_type, created_at) VALUES ($1, $2)",
+            [("login", futuro), ("login", futuro + timedelta(hours=5)), ("logout", futuro + timedelta(days=60))],
+        )
+
+        criadas = await ensure_partitions(conn, "month", 2)
+        contagens = {
+            nome: await conn.fetchval(f'SELECT count(*) FROM "{nome}"')
+            for nome in ("events_default", f"events_p{_mes(2):%Y_%m}")
+        }
+        indices = await conn.fetchval(
+            "SELECT count(*) FROM pg_indexes WHERE schemaname = $1 AND tablename = $2",
+            SCHEMA, f"events_p{_mes(2):%Y_%m}",
+        )
+        return criadas, contagens, indices, await conn.fetchval("SELECT count(*) FROM events")
+
+    criadas, contagens, indices, total = rodar(cenario)
+    assert criadas == [f"events_p{_mes(1):%Y_%m}", f"events_p{_mes(2):%Y_%m}"]
+    assert contagens == {"events_default": 1, f"events_p{_mes(2):%Y_%m}": 2}
+    # PK e índice de created_at herdados no ATTACH
+    assert indices == 2
+    assert total == 3
+
+
+def test_trocar_de_mes_para_dia_nao_sobrepoe():
+    async def cenario(conn):
+        await ensure_partitions(conn, "month", 1)
+        criadas = await ensure_partitions(conn, "day", 70)
+        return criadas, await partition_bounds(conn)
+
+    criadas, particoes = rodar(cenario)
+    # Os dois meses já cobertos ficam de fora; o resto vira partição diária
+    assert criadas[0] == f"events_p{_mes(2):%Y_%m}_01"
+    assert all(len(nome) == len("events_p2026_10_01") for nome in criadas)
+    inicio, _ = _cobertura(particoes)
+    assert inicio.date() == _mes(0)
+
+
+def test_trocar_de_dia_para_mes_preenche_so_os_buracos():
+    async def cenario(conn):
+        await ensure_partitions(conn, "day", 3)
+        criadas = await ensure_partitions(conn, "month", 2)
+        return criadas, await partition_bounds(conn)
+
+    criadas, particoes = rodar(cenario)
+    inicio, fim = _cobertura(particoes)
+    assert inicio.date() == _mes(0)
+    assert fim.date() == _mes(3)
+    assert criadas[-2:] == [f"events_p{_mes(1):%Y_%m}", f"events_p{_mes(2):%Y_%m}"]
+
+
+def test_arquiva_pelo_limite_e_nao_pelo_nome(tmp_path):
+    async def cenario(conn):
+        await conn.execute(
+            "CREATE TABLE antiga PARTITION OF events "
+            "FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2001-01-02 00:00:00+00')"
+        )
+        await conn.execute("INSERT INTO events (event_type, created_at) VALUES ('login', '2001-01-01 12:00:00+00')")
+        await ensure_partitions(conn, "month", 0)
+        arquivadas = await archive_expired(conn, 30, str(tmp_path))
+        return arquivadas, {p["nome"] for p in await partition_bounds(conn)}
+
+    arquivadas, restantes = rodar(cenario)
+    assert arquivadas == {"antiga": 1}
+    assert (tmp_path / "antiga.parquet").exists()
+    assert restantes == {"events_default", f"events_p{_mes(0):%Y_%m}"}
@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import services.presence_service as presence_service
+from services.presence_service import PresenceMap
+
+
+def test_heartbeat_de_sessao_desconhecida_e_ignorado():
+    presence = PresenceMap(window=900, flush_interval=30, max_sessions=100)
+
+    for _ in range(1000):
+        assert presence.touch(uuid.uuid4()) is False
+    assert presence.active_count() == 0
+    assert presence.stats()["pending"] == 0
+    assert presence.rejected == 1000
+
+    sessao = uuid.uuid4()
+    presence.open(sessao)
+    assert presence.touch(sessao) is True
+    assert presence.active_count() == 1
+
+
+def test_sessao_expirada_deixa_de_aceitar_heartbeat():
+    presence = PresenceMap(window=0.05, flush_interval=30, max_sessions=100)
+    sessao = uuid.uuid4()
+    presence.open(sessao)
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert presence.touch(sessao) is False
+    assert presence.active_count() == 0
+
+
+def test_teto_de_sessoes_e_pendentes():
+    presence = PresenceMap(window=900, flush_interval=30, max_sessions=10)
+    sessoes = [uuid.uuid4() for _ in range(25)]
+    for sessao in sessoes:
+        presence.open(sessao)
+
+    # Pendentes de flush também param no teto até o próximo flush
+    assert len(presence._dirty) == 10
+    assert presence.dropped == 15
+
+    # Ficam as 10 mais recentes; as mais antigas saem
+    assert presence.active_count() == 10
+    assert presence.evicted == 15
+    assert presence.touch(sessoes[0]) is False
+    assert presence.touch(sessoes[-1]) is True
+
+
+def test_sessoes_carregadas_no_startup_sao_conhecidas(monkeypatch):
+    agora = datetime.now(timezone.utc)
+    carregadas = [(uuid.uuid4(), agora - timedelta(seconds=s)) for s in (300, 200, 100)]
+
+    async def active_sessions(window):
+        return carregadas
+
+    async def update_last_active(lote):
+        pass
+
+    monkeypatch.setattr(presence_service.storage, "active_sessions", active_sessions)
+    monkeypatch.setattr(presence_service.storage, "update_last_active", update_last_active)
+    presence = PresenceMap(window=900, flush_interval=30, max_sessions=2)
+
+    async def main():
+        await presence.start()
+        try:
+            # Acima do teto ficam as mais recentes
+            assert presence.touch(carregadas[0][0]) is False
+            assert presence.touch(carregadas[2][0]) is True
+            assert presence.active_count() == 2
+        finally:
+            await presence.stop()
+
+    asyncio.run(main())
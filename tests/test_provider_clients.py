@@ -0,0 +1,131 @@
+"""
+Os clientes dos provedores são criados uma vez por processo e reaproveitam
+as conexões: contra um servidor HTTP local (keep-alive) que conta as
+conexões aceitas, N chamadas abrem no máximo uma conexão por worker.
+"""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from alpha_vantage.foreignexchange import ForeignExchange
+
+from core.config import settings
+from services.provider_clients import ProviderClients
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo num write só (sem o atraso de Nagle + ACK atrasado)
+    wbufsize = 1 << 16
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.conexoes += 1
+
+    def _responder(self):
+        if self.headers.get("Content-Length"):
+            self.rfile.read(int(self.headers["Content-Length"]))
+        corpo = json.dumps({"status": "OK", "results": [], "data": [], "ok": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    do_GET = do_POST = _responder
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.conexoes = 0
+    srv.lock = threading.Lock()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.setattr(settings, "POLYGON_API_KEY", "teste")
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_API_KEY", "teste")
+    clients = ProviderClients()
+    yield clients
+    clients.close()
+
+
+def _url(srv) -> str:
+    return f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def _em_paralelo(workers: int, chamadas: int, fn) -> None:
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda _: fn(), range(chamadas)))
+
+
+def test_uma_instancia_por_processo(clients):
+    for nome in ("binance", "polygon", "alphavantage", "tradingview"):
+        acessor = getattr(clients, nome)
+        with ThreadPoolExecutor(8) as pool:
+            instancias = set(map(id, pool.map(lambda _: acessor(), range(32))))
+        assert instancias == {id(acessor())}, nome
+
+    assert all(clients.stats().values())
+    clients.close()
+    assert not any(clients.stats().values())
+
+
+def test_tradingview_reaproveita_conexoes(clients, servidor, monkeypatch):
+    monkeypatch.setattr(settings, "TV_POOL_SIZE", 4)
+    session = clients.tradingview()
+    url = f"{_url(servidor)}/forex/scan"
+
+    for _ in range(20):
+        assert session.post(url, json={"symbols": {}}).status_code == 200
+    assert servidor.conexoes == 1
+
+    _em_paralelo(4, 200, lambda: session.post(url, json={"symbols": {}}))
+    assert servidor.conexoes <= 4
+
+
+def test_polygon_reaproveita_conexoes(clients, servidor, monkeypatch):
+    monkeypatch.setattr(settings, "POLYGON_POOL_SIZE", 4)
+    client = clients.polygon()
+    client.BASE = _url(servidor)
+
+    def aggs():
+        return client.get_aggs("C:EURUSD", 1, "minute", 0, 60_000, raw=True)
+
+    for _ in range(20):
+        assert aggs().status == 200
+    assert servidor.conexoes == 1
+
+    _em_paralelo(4, 200, aggs)
+    assert servidor.conexoes <= 4
+
+
+def test_alphavantage_reaproveita_conexoes(clients, servidor, monkeypatch):
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_POOL_SIZE", 4)
+    fx = clients.alphavantage()
+    url = f"{_url(servidor)}/query?function=FX_INTRADAY"
+
+    for _ in range(20):
+        assert fx._handle_api_call(url) == {"status": "OK", "results": [], "data": [], "ok": 1}
+    assert servidor.conexoes == 1
+
+    _em_paralelo(4, 200, lambda: fx._handle_api_call(url))
+    assert servidor.conexoes <= 4
+
+    # Controle: a biblioteca sem a Session abre uma conexão por chamada
+    antes = servidor.conexoes
+    for _ in range(5):
+        ForeignExchange._handle_api_call(fx, url)
+    assert servidor.conexoes == antes + 5
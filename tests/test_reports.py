@@ -0,0 +1,95 @@
+import os
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import services.reports_service as reports_service
+from routers import reports_router
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # REPORTS_DIR / CATALOG_PATH são relativos: cada teste usa uma pasta nova
+    monkeypatch.chdir(tmp_path)
+
+    os.makedirs(reports_service.REPORTS_DIR)
+    for i in range(60):
+        path = os.path.join(reports_service.REPORTS_DIR, f"extrator_{'binance' if i % 2 else 'polygon'}_{i:03d}.zip")
+        with zipfile.ZipFile(path, "w") as zipf:
+            zipf.writestr("dados.csv", f"linha {i}\n")
+        os.utime(path, (1_700_000_000 + i, 1_700_000_000 + i))
+
+    app = FastAPI()
+    app.include_router(reports_router.router)
+    return TestClient(app)
+
+
+def test_files_traz_a_pagina_e_all_files_a_lista_completa(client):
+    body = client.get("/api/v1/reports/").json()
+
+    assert body["total"] == 60
+    assert len(body["items"]) == 50
+    assert body["files"] == [item["filename"] for item in body["items"]]
+    assert body["files"][0] == "extrator_binance_059.zip"  # mais recente primeiro
+
+    completa = client.get("/api/v1/reports/", params={"all_files": True}).json()
+    assert len(completa["files"]) == 60
+    assert completa["files"][:50] == body["files"]
+
+
+def test_paginacao_e_filtros(client):
+    body = client.get("/api/v1/reports/", params={"page": 2, "page_size": 10, "provider": "binance"}).json()
+
+    assert body["total"] == 30
+    assert body["files"] == [f"extrator_binance_{i:03d}.zip" for i in range(39, 19, -2)]
+    assert [item["filename"] for item in body["items"]] == body["files"]
+
+
+def test_zip_apagado_some_da_listagem(client):
+    client.get("/api/v1/reports/")
+    os.remove(os.path.join(reports_service.REPORTS_DIR, "extrator_binance_059.zip"))
+
+    body = client.get("/api/v1/reports/", params={"all_files": True}).json()
+    assert body["total"] == 59
+    assert "extrator_binance_059.zip" not in body["files"]
+    assert "extrator_binance_059.zip" not in [item["filename"] for item in body["items"]]
+    assert client.get("/api/v1/reports/extrator_binance_059.zip").status_code == 404
+
+
+# ===========================
+# 🔹 Download: ETag e Range
+# ===========================
+def test_etag_e_if_none_match(client):
+    url = "/api/v1/reports/extrator_polygon_000.zip"
+    r = client.get(url)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert etag == f'"{reports_service.get_report("extrator_polygon_000.zip")["sha256"]}"'
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": f'"outro", {etag}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"outro"'}).status_code == 200
+
+
+def test_range_devolve_206(client):
+    url = "/api/v1/reports/extrator_polygon_000.zip"
+    completo = client.get(url).content
+
+    r = client.get(url, headers={"Range": "bytes=10-29"})
+    assert r.status_code == 206
+    assert r.content == completo[10:30]
+    assert r.headers["Content-Range"] == f"bytes 10-29/{len(completo)}"
+
+    # If-Range com o ETag atual: parcial; com outro: arquivo inteiro
+    etag = r.headers["ETag"]
+    assert client.get(url, headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+    r = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"velho"'})
+    assert r.status_code == 200 and r.content == completo
+
+
+def test_nome_com_caminho_e_rejeitado(client):
+    assert client.get("/api/v1/reports/..%2Fcatalog.sqlite3").status_code == 404
+    assert client.get("/api/v1/reports/catalog.sqlite3").status_code == 404
@@ -0,0 +1,186 @@
+"""
+Conformidade dos backends de Storage: as mesmas operações, com as mesmas
+entradas, precisam devolver o mesmo resultado em todos eles.
+
+SQLite roda sempre (arquivo temporário). Postgres roda quando
+TEST_NEON_DATABASE_URL aponta para um banco criado pelo db_init.py; as
+tabelas são esvaziadas no início de cada teste.
+"""
+import asyncio
+import json
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.config import settings
+from models.storage import PostgresStorage, SQLiteStorage
+from models.storage.base import Storage
+from utils.date_utils import alinhar_bucket
+
+
+TEST_PG_URL = os.getenv("TEST_NEON_DATABASE_URL")
+
+TABELAS_PG = "events, sessions, users, event_counts_daily, event_counts_hourly, event_counts_user_hourly"
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def criar_storage(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return lambda: SQLiteStorage(str(tmp_path / "analytics.sqlite3"))
+
+    if not TEST_PG_URL:
+        pytest.skip("TEST_NEON_DATABASE_URL não definido")
+    monkeypatch.setattr(settings, "NEON_DATABASE_URL", TEST_PG_URL)
+    return PostgresStorage
+
+
+def rodar(criar_storage, cenario):
+    async def main():
+        storage = criar_storage()
+        await storage.start()
+        try:
+            if storage.name == "postgres":
+                from models.db import acquire
+                async with acquire() as conn:
+                    await conn.execute(f"TRUNCATE {TABELAS_PG}")
+            return await cenario(storage)
+        finally:
+            await storage.close()
+
+    return asyncio.run(main())
+
+
+def test_backend_incompleto_falha_ao_instanciar():
+    # Todas as operações menos timeseries_counts
+    Incompleto = type("Incompleto", (Storage,), {
+        nome: getattr(SQLiteStorage, nome)
+        for nome in Storage.__abstractmethods__ - {"timeseries_counts"}
+    })
+    with pytest.raises(TypeError, match="timeseries_counts"):
+        Incompleto()
+
+    SQLiteStorage(":memory:")
+    PostgresStorage()
+
+
+# ===========================
+# 🔹 Usuários
+# ===========================
+def test_usuarios(criar_storage):
+    async def cenario(storage):
+        await storage.create_user("ana@example.com", "hash", "admin")
+
+        user = await storage.get_user_by_email("ana@example.com")
+        assert set(user) == {"id", "email", "password_hash", "role"}
+        assert uuid.UUID(user["id"])
+        assert (user["email"], user["password_hash"], user["role"]) == ("ana@example.com", "hash", "admin")
+
+        await storage.create_user("bia@example.com", "hash")
+        assert (await storage.get_user_by_email("bia@example.com"))["role"] == "user"
+        assert await storage.get_user_by_email("ninguem@example.com") is None
+
+    rodar(criar_storage, cenario)
+
+
+# ===========================
+# 🔹 Ingestão + analytics
+# ===========================
+def _eventos(uid: uuid.UUID, email: str, base: datetime):
+    """
+    200 eventos de hora em hora (metade por uuid, metade por email) + um de
+    usuário desconhecido agora. Devolve (linhas, [(created_at, tipo, é_do_usuário)]).
+    """
+    linhas, esperado = [], []
+    for i in range(200):
+        t = base + timedelta(hours=i, minutes=7)
+        tipo = "page:home" if i % 3 else "click"
+        linhas.append((uid if i % 2 else None, None if i % 2 else email, tipo, None, t))
+        esperado.append((t, tipo, True))
+
+    agora = datetime.now(timezone.utc)
+    linhas.append((uuid.uuid4(), None, "page:x", json.dumps({"a": 1}), agora))
+    esperado.append((agora, "page:x", False))
+    return linhas, esperado
+
+
+def _contar(esperado, interval, inicio, fim, event_types=None, prefix=None, so_usuario=False):
+    contagem = Counter(
+        (alinhar_bucket(t, interval), tipo)
+        for t, tipo, do_usuario in esperado
+        if inicio <= t < fim
+        and (not event_types or tipo in event_types)
+        and (not prefix or tipo.startswith(prefix))
+        and (not so_usuario or do_usuario)
+    )
+    return sorted((b, tipo, n) for (b, tipo), n in contagem.items())
+
+
+def test_ingestao_e_analytics(criar_storage):
+    base = alinhar_bucket(datetime.now(timezone.utc) - timedelta(days=12), "hour")
+
+    async def cenario(storage):
+        await storage.create_user("ana@example.com", "hash")
+        uid = uuid.UUID((await storage.get_user_by_email("ana@example.com"))["id"])
+
+        linhas, esperado = _eventos(uid, "ana@example.com", base)
+        await storage.insert_batch(linhas[:120], [])
+        await storage.insert_batch(linhas[120:], [])
+
+        # admin_counts
+        counts = await storage.admin_counts()
+        hoje = datetime.now(timezone.utc).date()
+        por_tipo = Counter(tipo for _, tipo, _ in esperado)
+        assert counts["users_total"] == 1
+        assert counts["visits_today"] == sum(
+            1 for t, tipo, _ in esperado if tipo.startswith("page:") and t.date() == hoje
+        )
+        assert {e["event_type"]: e["count"] for e in counts["per_event"]} == dict(por_tipo)
+        assert [e["count"] for e in counts["per_event"]] == sorted(por_tipo.values(), reverse=True)
+
+        # timeseries: hora, dia e semana, com e sem filtros. Limites em dias
+        # inteiros: aí rollup horário, diário e por usuário cobrem o mesmo período
+        inicio = alinhar_bucket(base, "day") + timedelta(days=1)
+        fim = inicio + timedelta(days=6)
+        filtros = [{}, {"prefix": "page:"}, {"event_types": ["click"]}, {"so_usuario": True}]
+        for interval in ("hour", "day", "week"):
+            for f in filtros:
+                rows = await storage.timeseries_counts(
+                    interval, inicio, fim, f.get("event_types"), f.get("prefix"),
+                    uid if f.get("so_usuario") else None, timeout=5,
+                )
+                obtido = sorted((b.astimezone(timezone.utc), tipo, int(n)) for b, tipo, n in rows)
+                assert obtido == _contar(esperado, interval, inicio, fim, **f), (interval, f)
+                assert obtido
+
+    rodar(criar_storage, cenario)
+
+
+# ===========================
+# 🔹 Sessões / presença
+# ===========================
+def test_sessoes_e_presenca(criar_storage):
+    async def cenario(storage):
+        await storage.create_user("ana@example.com", "hash")
+        agora = datetime.now(timezone.utc)
+
+        recente, antiga, anonima = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        await storage.insert_batch([], [
+            (recente, None, "ana@example.com", "1.1.1.1", "ua", agora - timedelta(seconds=30)),
+            (antiga, None, None, None, None, agora - timedelta(hours=2)),
+            (anonima, uuid.uuid4(), None, "2.2.2.2", "ua", agora - timedelta(seconds=60)),
+        ])
+
+        ativas = await storage.active_sessions(900)
+        assert [sid for sid, _ in ativas] == [anonima, recente]
+
+        # last_active só avança
+        await storage.update_last_active({anonima: agora, recente: agora - timedelta(days=1)})
+        ativas = dict(await storage.active_sessions(900))
+        assert abs((ativas[anonima] - agora).total_seconds()) < 1e-3
+        assert abs((ativas[recente] - (agora - timedelta(seconds=30))).total_seconds()) < 1e-3
+        assert list(dict(await storage.active_sessions(900))) == [recente, anonima]
+
+    rodar(criar_storage, cenario)
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timezone
+
+import services.tracking_service as tracking_service
+from services.tracking_service import TrackingBuffer
+
+
+class _StorageInstavel:
+    """
+    insert_batch falha nas primeiras `falhas` chamadas.
+    """
+
+    def __init__(self, falhas: int):
+        self.falhas = falhas
+        self.chamadas = 0
+        self.gravados = []
+
+    async def insert_batch(self, events, sessions):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            raise ConnectionError("conexão caiu")
+        self.gravados.extend(events)
+
+
+def _evento(i: int) -> tuple:
+    return (None, None, f"evento_{i}", None, datetime.now(timezone.utc))
+
+
+def _rodar(buffer: TrackingBuffer, n: int) -> None:
+    async def main():
+        await buffer.start()
+        for i in range(n):
+            assert await buffer.put("event", _evento(i))
+        await buffer.stop()
+
+    asyncio.run(main())
+
+
+def test_lote_que_falha_e_regravado(monkeypatch):
+    storage = _StorageInstavel(falhas=2)
+    monkeypatch.setattr(tracking_service, "storage", storage)
+    buffer = TrackingBuffer(100, batch_size=10, flush_interval=0.01, overflow="drop", retries=3, retry_backoff=0.001)
+
+    _rodar(buffer, 10)
+
+    assert [e[2] for e in storage.gravados] == [f"evento_{i}" for i in range(10)]
+    assert storage.chamadas == 3
+    assert buffer.stats()["written"] == 10
+    assert buffer.stats()["retried"] == 2
+    assert buffer.stats()["failed"] == 0
+
+
+def test_lote_descartado_depois_das_tentativas(monkeypatch):
+    storage = _StorageInstavel(falhas=100)
+    monkeypatch.setattr(tracking_service, "storage", storage)
+    buffer = TrackingBuffer(100, batch_size=10, flush_interval=0.01, overflow="drop", retries=2, retry_backoff=0.001)
+
+    _rodar(buffer, 10)
+
+    assert storage.chamadas == 3
+    assert storage.gravados == []
+    assert buffer.stats()["failed"] == 10
+    assert buffer.stats()["written"] == 0
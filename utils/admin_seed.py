@@ -1,11 +1,12 @@
+import asyncio
+
 import bcrypt
-from psycopg2.extras import RealDictCursor
 
 from core.config import settings
-from models.db import get_sync_conn
+from models.storage import storage
 
 
-def seed_admin():
+async def seed_admin():
     admin_email = settings.ADMIN_EMAIL
     admin_password = settings.ADMIN_PASSWORD
 
@@ -13,39 +14,19 @@ def seed_admin():
         print("[ADMIN SEED] ADMIN_EMAIL ou ADMIN_PASSWORD não definidos")
         return
 
-    conn = get_sync_conn()
-
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        cursor.execute(
-            "SELECT id FROM users WHERE email = %s",
-            (admin_email,)
-        )
-
-        if cursor.fetchone():
+        if await storage.get_user_by_email(admin_email):
             print("[ADMIN SEED] Admin já existe")
             return
 
-        password_hash = bcrypt.hashpw(
+        password_hash = (await asyncio.to_thread(
+            bcrypt.hashpw,
             admin_password.encode(),
             bcrypt.gensalt(12)
-        ).decode()
-
-        cursor.execute(
-            """
-            INSERT INTO users (email, password_hash, role)
-            VALUES (%s, %s, %s)
-            """,
-            (admin_email, password_hash, "admin")
-        )
+        )).decode()
 
-        conn.commit()
+        await storage.create_user(admin_email, password_hash, "admin")
         print("[ADMIN SEED] Admin criado com sucesso")
 
     except Exception as e:
-        conn.rollback()
         print(f"[ADMIN SEED ERROR] {e}")
-
-    finally:
-        conn.close()
@@ -0,0 +1,158 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.gatilho_4e9 import MINUTOS_GATILHO
+
+
+# Padrão de entradas relativo à cor da vela de gatilho:
+# 'S' = mesma cor, 'O' = cor oposta. O 4e9 original (Call -> Put, Put, Call, Call)
+# é "OOSS".
+PADRAO_4E9 = "OOSS"
+GALES_4E9 = 3
+
+
+def _offset_pandas(timeframe: str) -> str:
+    """
+    '1m' / '5m' / '1h' / 'D' (formato usado nos serviços) -> offset do pandas.
+    """
+    tf = timeframe.strip()
+    if tf.endswith("m") and tf[:-1].isdigit():
+        return f"{tf[:-1]}min"
+    if tf.upper() == "D":
+        return "1D"
+    return tf
+
+
+def _cores(df_1m: pd.DataFrame, timeframe: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reamostra os candles de 1m para o timeframe e devolve
+    (cor: True=Call, minuto da hora) de cada vela, em ordem.
+    """
+    df = df_1m.sort_values("Open_Time")
+    offset = _offset_pandas(timeframe)
+
+    if offset == "1min" and "Resultado" in df.columns:
+        open_time = pd.DatetimeIndex(df["Open_Time"])
+        call = (df["Resultado"] == "Call").to_numpy()
+        return call, open_time.minute.to_numpy()
+
+    velas = (
+        df.set_index("Open_Time")[["Open", "Close"]]
+        .resample(offset, label="left", closed="left")
+        .agg({"Open": "first", "Close": "last"})
+        .dropna()
+    )
+    call = (velas["Close"].to_numpy() >= velas["Open"].to_numpy())
+    return call, velas.index.minute.to_numpy()
+
+
+def _histograma(call: np.ndarray, minutos: np.ndarray, padrao: str, passos: int) -> np.ndarray:
+    """
+    Conta, para cada vela tomada como gatilho, em qual entrada veio o
+    primeiro acerto do padrão. Resultado indexado por
+    [minuto da hora, entrada do 1º acerto (passos = nenhum), velas futuras disponíveis].
+    """
+    n = len(call)
+    idx = np.arange(n)
+    disponiveis = np.minimum(n - 1 - idx, passos)
+
+    primeiro = np.full(n, passos, dtype=np.int64)
+    for k in range(passos - 1, -1, -1):
+        futuro = np.zeros(n, dtype=bool)
+        if k + 1 < n:
+            mesma = call[k + 1:] == call[:n - k - 1]
+            futuro[:n - k - 1] = mesma if padrao[k] == "S" else ~mesma
+        acerto = futuro & (disponiveis > k)
+        primeiro[acerto] = k
+
+    chave = (minutos * (passos + 1) + primeiro) * (passos + 1) + disponiveis
+    contagem = np.bincount(chave, minlength=60 * (passos + 1) * (passos + 1))
+    return contagem.reshape(60, passos + 1, passos + 1)
+
+
+def backtest_gatilho(
+    df: pd.DataFrame,
+    gatilhos: Sequence[Iterable[int]] = (MINUTOS_GATILHO,),
+    gales: Sequence[int] = (GALES_4E9,),
+    padroes: Sequence[str] = (PADRAO_4E9,),
+    timeframes: Sequence[str] = ("1m",),
+) -> pd.DataFrame:
+    """
+    Avalia uma grade de variações da técnica de gatilho sobre um único
+    conjunto de candles de 1m (Open_Time, Open, Close e/ou Resultado).
+
+    Cada combinação (timeframe, minutos de gatilho, profundidade de gale,
+    padrão) vira uma linha com o total de operações e o percentual de
+    acerto em cada entrada. A tabela volta ordenada por win_rate.
+
+    Para cada (timeframe, padrão) os candles são percorridos uma única vez
+    (histograma por minuto da hora); todas as combinações de gatilhos e
+    gales saem desse histograma com somas de matrizes.
+
+    Os gatilhos são minutos de abertura da vela no timeframe: em "5m" só
+    existem os múltiplos de 5 e de "1h" para cima só o minuto 0. Por isso
+    os gatilhos padrão (4, 9, ..., 59) não disparam fora do 1m. Combinações
+    sem nenhuma operação ficam fora da tabela, em vez de virarem linhas NaN.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    conjuntos = [tuple(sorted({int(m) % 60 for m in g})) for g in gatilhos]
+    mascaras = np.zeros((len(conjuntos), 60), dtype=np.int64)
+    for i, conjunto in enumerate(conjuntos):
+        mascaras[i, list(conjunto)] = 1
+
+    gales = sorted({int(g) for g in gales if g >= 0})
+    if not gales or not conjuntos:
+        return pd.DataFrame()
+    max_gale = gales[-1]
+
+    linhas = []
+    for timeframe in timeframes:
+        call, minutos = _cores(df, timeframe)
+        if len(call) == 0:
+            continue
+
+        for padrao in padroes:
+            padrao = padrao.upper()
+            passos = min(len(padrao), max_gale + 1)
+            hist = _histograma(call, minutos, padrao, passos)
+
+            for gale in gales:
+                entradas = gale + 1
+                if entradas > passos:
+                    continue
+
+                # Gatilho só conta se existirem `entradas` velas depois dele
+                por_minuto = hist[:, :, entradas:].sum(axis=2)
+                por_conjunto = mascaras @ por_minuto
+                total = por_conjunto.sum(axis=1)
+                acertos = por_conjunto[:, :entradas]
+
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    pct = np.where(total[:, None] > 0, acertos * 100.0 / total[:, None], np.nan)
+
+                for i, conjunto in enumerate(conjuntos):
+                    if not total[i]:
+                        continue
+                    linha = {
+                        "timeframe": timeframe,
+                        "gatilhos": ",".join(map(str, conjunto)),
+                        "gale": gale,
+                        "padrao": padrao[:entradas],
+                        "operacoes": int(total[i]),
+                        "win_rate": round(float(np.nansum(pct[i])), 2),
+                    }
+                    for k in range(max_gale + 1):
+                        rotulo = "WIN" if k == 0 else f"WIN GALE {k}"
+                        linha[rotulo] = round(float(pct[i, k]), 2) if k < entradas else np.nan
+                    linhas.append(linha)
+
+    if not linhas:
+        return pd.DataFrame()
+
+    # Padrões com o mesmo prefixo repetem linhas nos gales mais curtos
+    tabela = pd.DataFrame(linhas).drop_duplicates(["timeframe", "gatilhos", "gale", "padrao"])
+    return tabela.sort_values(["win_rate", "operacoes"], ascending=False, na_position="last").reset_index(drop=True)
@@ -0,0 +1,130 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLUMNS = ['Open_Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Resultado']
+
+RESULTADO_CATEGORIAS = ['Call', 'Put']
+
+
+def _resultado(open_: np.ndarray, close: np.ndarray) -> pd.Categorical:
+    """
+    'Call' quando Close >= Open, senão 'Put' (NaN também cai em 'Put').
+    """
+    codes = np.where(close >= open_, 0, 1).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=RESULTADO_CATEGORIAS)
+
+
+def montar_ohlcv(
+    open_time: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Monta o DataFrame OHLCV padrão a partir de colunas já tipadas.
+    """
+    return pd.DataFrame({
+        'Open_Time': open_time,
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume,
+        'Resultado': _resultado(open_, close),
+    }, columns=OHLCV_COLUMNS)
+
+
+def ohlcv_vazio() -> pd.DataFrame:
+    vazio = np.array([], dtype=np.float64)
+    return montar_ohlcv(np.array([], dtype='datetime64[ns]'), vazio, vazio, vazio, vazio, vazio)
+
+
+def juntar_colunas(paginas: List[Tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """
+    Concatena páginas (open_time em ms, [open, high, low, close, volume])
+    na ordem recebida e remove open_times repetidos (bordas sobrepostas ou
+    páginas reenviadas numa nova tentativa).
+    """
+    paginas = [p for p in paginas if len(p[0])]
+    if not paginas:
+        return ohlcv_vazio()
+
+    open_time = np.concatenate([ot for ot, _ in paginas])
+    valores = np.concatenate([v for _, v in paginas])
+
+    if len(open_time) > 1 and not np.all(np.diff(open_time) > 0):
+        open_time, unicos = np.unique(open_time, return_index=True)
+        valores = valores[unicos]
+
+    return ohlcv_de_colunas(open_time, valores)
+
+
+# -----------------------------------------------------
+# BINANCE: lista de klines [open_time, "open", "high", "low", "close", "volume", ...]
+# -----------------------------------------------------
+def klines_para_colunas(pagina: list) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte uma página de klines em colunas pré-alocadas, lendo só os 6
+    campos usados: (open_time em ms int64, [open, high, low, close, volume] float64).
+    """
+    n = len(pagina)
+    open_time = np.fromiter((k[0] for k in pagina), dtype=np.int64, count=n)
+
+    valores = np.empty((n, 5), dtype=np.float64)
+    for j in range(5):
+        valores[:, j] = np.fromiter((k[j + 1] for k in pagina), dtype=np.float64, count=n)
+
+    return open_time, valores
+
+
+def ohlcv_de_colunas(open_time_ms: np.ndarray, valores: np.ndarray) -> pd.DataFrame:
+    return montar_ohlcv(
+        pd.to_datetime(open_time_ms, unit='ms'),
+        valores[:, 0], valores[:, 1], valores[:, 2], valores[:, 3], valores[:, 4],
+    )
+
+
+# -----------------------------------------------------
+# POLYGON: páginas cruas de /v2/aggs ({"t", "o", "h", "l", "c", "v"})
+# -----------------------------------------------------
+def aggs_para_colunas(resultados: list) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uma página crua de /v2/aggs ({"t", "o", "h", "l", "c", "v"}) em colunas,
+    sem criar um objeto Agg por candle. Campos ausentes viram NaN.
+    """
+    n = len(resultados)
+    timestamps = np.fromiter((r["t"] for r in resultados), dtype=np.int64, count=n)
+
+    valores = np.empty((n, 5), dtype=np.float64)
+    for j, campo in enumerate(("o", "h", "l", "c", "v")):
+        valores[:, j] = np.array([r.get(campo) for r in resultados], dtype=np.float64)
+
+    return timestamps, valores
+
+
+# -----------------------------------------------------
+# ALPHA VANTAGE: DataFrame indexado por data com colunas "1. open", ...
+# -----------------------------------------------------
+def normalizar_alphavantage(data: pd.DataFrame) -> pd.DataFrame:
+    if data is None or data.empty:
+        return ohlcv_vazio()
+
+    def coluna(nome: str) -> np.ndarray:
+        if nome not in data.columns:
+            # Forex na Alpha Vantage não traz volume
+            return np.full(len(data), np.nan)
+        return pd.to_numeric(data[nome], errors='coerce').to_numpy(dtype=np.float64)
+
+    return montar_ohlcv(
+        pd.to_datetime(data.index).to_numpy(),
+        coluna('1. open'),
+        coluna('2. high'),
+        coluna('3. low'),
+        coluna('4. close'),
+        coluna('5. volume'),
+    )
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class RateLimiter:
+    """
+    Limite por janela deslizante: no máximo `capacidade` unidades de peso
+    a cada `periodo` segundos. Thread-safe; acquire() bloqueia até caber.
+    """
+
+    def __init__(self, capacidade: int, periodo: float = 60.0):
+        self.capacidade = max(int(capacidade), 1)
+        self.periodo = periodo
+
+        self._lock = threading.Lock()
+        self._janela: deque = deque()
+        self._usado = 0
+
+    def _liberar_expirados(self, agora: float) -> None:
+        while self._janela and agora - self._janela[0][0] >= self.periodo:
+            _, peso = self._janela.popleft()
+            self._usado -= peso
+
+    def reservar(self, peso: int = 1) -> float:
+        """
+        Reserva `peso` se couber e devolve 0; senão não reserva nada e
+        devolve quantos segundos esperar antes de tentar de novo (para
+        quem não pode bloquear a thread, como o event loop).
+        """
+        peso = min(max(int(peso), 1), self.capacidade)
+
+        with self._lock:
+            agora = time.monotonic()
+            self._liberar_expirados(agora)
+
+            if self._usado + peso <= self.capacidade:
+                self._janela.append((agora, peso))
+                self._usado += peso
+                return 0.0
+
+            return max(self.periodo - (agora - self._janela[0][0]), 0.01)
+
+    def acquire(self, peso: int = 1) -> None:
+        while True:
+            espera = self.reservar(peso)
+            if not espera:
+                return
+            time.sleep(espera)
+
+
+def executar_em_paralelo(
+    tarefas: Iterable[T],
+    fn: Callable[[T], R],
+    max_workers: int,
+) -> Iterator[Tuple[T, R]]:
+    """
+    Executa fn(tarefa) num pool limitado e devolve (tarefa, resultado)
+    na ordem em que cada execução termina.
+    """
+    tarefas = list(tarefas)
+    if not tarefas:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tarefas))))
+    try:
+        futuros = {pool.submit(fn, tarefa): tarefa for tarefa in tarefas}
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
+    finally:
+        # Se o consumidor parar no meio (erro/cancelamento), descarta o que não começou
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class TTLCache:
+    """
+    Cache com validade de `ttl` segundos e single-flight: chamadas
+    concorrentes para a mesma chave esperam uma única execução de fn e
+    recebem o mesmo resultado (ou a mesma exceção). Erros não ficam em
+    cache. Thread-safe; no máximo `max_itens` chaves (sai a mais antiga).
+    """
+
+    def __init__(self, ttl: float, max_itens: int = 1024):
+        self.ttl = ttl
+        self.max_itens = max(int(max_itens), 1)
+
+        self._lock = threading.Lock()
+        self._itens: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._em_voo: Dict[Hashable, Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _fresco(self, chave: Hashable) -> Optional[Tuple[float, Any]]:
+        item = self._itens.get(chave)
+        if item is not None and time.monotonic() - item[0] >= self.ttl:
+            del self._itens[chave]
+            return None
+        return item
+
+    def consultar(self, chave: Hashable) -> Any:
+        """
+        Valor em cache ainda válido, ou None (não dispara fn nem conta hit).
+        """
+        with self._lock:
+            item = self._fresco(chave)
+        return item[1] if item is not None else None
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._guardar(chave, valor)
+
+    def _guardar(self, chave: Hashable, valor: Any) -> None:
+        self._itens[chave] = (time.monotonic(), valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def obter(self, chave: Hashable, fn: Callable[[], R]) -> R:
+        with self._lock:
+            item = self._fresco(chave)
+            if item is not None:
+                self.hits += 1
+                return item[1]
+
+            futuro = self._em_voo.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = self._em_voo[chave] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not dono:
+            return futuro.result()
+
+        try:
+            valor = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._em_voo[chave]
+            futuro.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._em_voo[chave]
+            self._guardar(chave, valor)
+        futuro.set_result(valor)
+        return valor
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / total, 4) if total else 0.0,
+                "size": len(self._itens),
+                "in_flight": len(self._em_voo),
+            }
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 
 
@@ -16,3 +16,17 @@ def parse_date(s: str) -> datetime:
         status_code=400,
         detail=f"Formato de data inválido: '{s}'. Use 'YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM'."
     )
+
+
+def alinhar_bucket(instante: datetime, interval: str) -> datetime:
+    """
+    Início do bucket (UTC) de `interval` ("hour" | "day" | "week") que contém
+    `instante`; semanas começam na segunda, como o date_trunc do Postgres.
+    """
+    instante = instante.astimezone(timezone.utc)
+    if interval == "hour":
+        return instante.replace(minute=0, second=0, microsecond=0)
+    dia = instante.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        dia -= timedelta(days=dia.weekday())
+    return dia
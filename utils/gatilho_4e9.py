@@ -1,55 +1,60 @@
+import numpy as np
 import pandas as pd
 
 
+MINUTOS_GATILHO = (4, 9, 14, 19, 24, 29, 34, 39, 44, 49, 54, 59)
+
+SEQUENCIA_APOS_CALL = ('Put', 'Put', 'Call', 'Call')
+SEQUENCIA_APOS_PUT = ('Call', 'Call', 'Put', 'Put')
+
+ROTULOS_RESULTADO = ('WIN', 'WIN GALE 1', 'WIN GALE 2', 'WIN GALE 3')
+
+
 def analisar_tecnica_gatilho_universal(df: pd.DataFrame) -> pd.DataFrame:
     """
     Técnica de análise 4e9 aplicada tanto na Binance quanto na Polygon.
-    Mantém a lógica EXATA do seu código original.
+    Mantém a lógica EXATA do seu código original, agora vetorizada:
+    máscara de minuto para os gatilhos e arrays deslocados sobre 'Resultado'
+    para as 4 entradas (entrada + 3 gales).
     """
     if df.empty:
         return pd.DataFrame()
-        
+
     df = df.sort_values(by='Open_Time').reset_index(drop=True)
-    minutos_gatilho = {4, 9, 14, 19, 24, 29, 34, 39, 44, 49, 54, 59}
-    resultados = []
-    i = 0
-
-    while i < len(df):
-        vela_atual = df.iloc[i]
-        minuto_atual = pd.to_datetime(vela_atual['Open_Time']).minute
-
-        if minuto_atual in minutos_gatilho:
-            if i + 4 >= len(df):
-                i += 1
-                continue
-
-            vela_gatilho = vela_atual
-            cor_gatilho = vela_gatilho['Resultado']
-
-            sequencia_operacoes = (
-                ['Put', 'Put', 'Call', 'Call']
-                if cor_gatilho == 'Call'
-                else ['Call', 'Call', 'Put', 'Put']
-            )
-            
-            resultado_final_sequencia = "LOSS"
-
-            if df.iloc[i+1]['Resultado'] == sequencia_operacoes[0]:
-                resultado_final_sequencia = "WIN"
-            elif df.iloc[i+2]['Resultado'] == sequencia_operacoes[1]:
-                resultado_final_sequencia = "WIN GALE 1"
-            elif df.iloc[i+3]['Resultado'] == sequencia_operacoes[2]:
-                resultado_final_sequencia = "WIN GALE 2"
-            elif df.iloc[i+4]['Resultado'] == sequencia_operacoes[3]:
-                resultado_final_sequencia = "WIN GALE 3"
-
-            resultados.append({
-                'Horario_Gatilho': vela_gatilho['Open_Time'],
-                'Cor_Gatilho': cor_gatilho,
-                'Sequencia_Esperada': ' → '.join(sequencia_operacoes),
-                'Resultado_Final': resultado_final_sequencia
-            })
-
-        i += 1
-
-    return pd.DataFrame(resultados)
+
+    total = len(df)
+    passos = len(ROTULOS_RESULTADO)
+
+    open_time = df['Open_Time'].to_numpy()
+    resultado = df['Resultado'].to_numpy(dtype=object)
+    minutos = pd.to_datetime(df['Open_Time']).dt.minute.to_numpy()
+
+    # Gatilho só conta se existirem as 4 velas seguintes
+    mascara = np.isin(minutos, MINUTOS_GATILHO)
+    mascara[max(total - passos, 0):] = False
+    idx = np.flatnonzero(mascara)
+
+    if idx.size == 0:
+        return pd.DataFrame()
+
+    cor_gatilho = resultado[idx]
+    apos_call = cor_gatilho == 'Call'
+
+    acertos = []
+    for passo in range(passos):
+        esperado = np.where(apos_call, SEQUENCIA_APOS_CALL[passo], SEQUENCIA_APOS_PUT[passo])
+        acertos.append(resultado[idx + passo + 1] == esperado)
+
+    resultado_final = np.select(acertos, ROTULOS_RESULTADO, default='LOSS').astype(object)
+    sequencia = np.where(
+        apos_call,
+        ' → '.join(SEQUENCIA_APOS_CALL),
+        ' → '.join(SEQUENCIA_APOS_PUT),
+    ).astype(object)
+
+    return pd.DataFrame({
+        'Horario_Gatilho': open_time[idx],
+        'Cor_Gatilho': cor_gatilho,
+        'Sequencia_Esperada': sequencia,
+        'Resultado_Final': resultado_final,
+    })